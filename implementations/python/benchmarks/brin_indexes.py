@@ -0,0 +1,248 @@
+"""
+Result timestamp index benchmark.
+
+Seeds results with a ``bench-`` prefix whose dateLastModified and scoreDate
+grow with insertion order, then compares the B-tree indexes from schema.sql
+with the BRIN indexes of migrations/013_brin_timestamp_indexes.sql: index
+size, single-row update and insert throughput (and the share of HOT
+updates), and the delta sync and scoreDate range queries under EXPLAIN
+ANALYZE. Delta sync is measured from a recent watermark and from the start
+of the seeded rows: under BRIN a page reads and sorts every row after the
+watermark, so the second grows with the table. Each layout is measured inside a rolled-back transaction; the
+seeded rows are removed afterwards.
+
+Usage: python -m benchmarks.brin_indexes [--results N] [--writes N]
+"""
+
+import argparse
+import statistics
+import time
+from typing import Dict, List
+
+from sqlalchemy import text
+
+from src.config.database import SessionLocal, engine
+
+PREFIX = "bench-brin-"
+RESULTS_PER_ITEM = 50
+
+LAYOUTS = {
+    "btree": {
+        "indexes": ["idx_results_modified", "idx_results_score_date"],
+        "ddl": [],
+    },
+    "brin": {
+        "indexes": ["idx_results_modified_brin", "idx_results_score_date_brin"],
+        "ddl": [
+            "DROP INDEX idx_results_modified",
+            "DROP INDEX idx_results_score_date",
+            "CREATE INDEX idx_results_modified_brin ON results USING brin (date_last_modified) "
+            "WITH (pages_per_range = 32)",
+            "CREATE INDEX idx_results_score_date_brin ON results USING brin (score_date) "
+            "WITH (pages_per_range = 32)",
+            "ANALYZE results",
+        ],
+    },
+}
+
+# As built by apply_changes_window
+DELTA_SYNC_PAGE = (
+    "SELECT * FROM results "
+    "WHERE (date_last_modified, sourced_id) > (CAST(:{since} AS timestamptz), '') "
+    "AND date_last_modified >= CAST(:{since} AS timestamptz) "
+    "ORDER BY date_last_modified, sourced_id LIMIT 100"
+)
+
+QUERIES = {
+    # From a watermark 10 minutes before the newest row, as a client in step
+    "delta sync recent": DELTA_SYNC_PAGE.format(since="since"),
+    # From the oldest seeded row, as a full resync or a long-idle client
+    "delta sync old": DELTA_SYNC_PAGE.format(since="old_since"),
+    "score date week": (
+        "SELECT COUNT(*) FROM results "
+        "WHERE score_date >= CAST(:week_start AS date) "
+        "AND score_date < CAST(:week_start AS date) + 7"
+    ),
+}
+
+
+def _seed(db, results: int) -> None:
+    line_items = max(results // RESULTS_PER_ITEM, 1)
+    db.execute(
+        text(
+            "INSERT INTO line_items (sourced_id, title, assign_date, due_date, class_sourced_id) "
+            "SELECT :prefix || 'li-' || i, 'Benchmark', NOW(), NOW(), :prefix || 'class' "
+            "FROM generate_series(1, :line_items) AS i"
+        ),
+        {"prefix": PREFIX, "line_items": line_items},
+    )
+    # One result per second, about 500 a day, oldest first
+    db.execute(
+        text(
+            "INSERT INTO results (sourced_id, date_last_modified, line_item_sourced_id, "
+            "student_sourced_id, score_status, score, score_date) "
+            "SELECT :prefix || 'r-' || n, NOW() - (:results - n) * INTERVAL '1 second', "
+            ":prefix || 'li-' || (n % :line_items + 1), :prefix || 'student-' || n, "
+            "'earnedFull', n % 101, CURRENT_DATE - (:results - n) / 500 "
+            "FROM generate_series(1, :results) AS n"
+        ),
+        {"prefix": PREFIX, "results": results, "line_items": line_items},
+    )
+    # Every tenth row purged, as after compaction, so pages have the free
+    # space a HOT update needs
+    db.execute(
+        text("DELETE FROM results WHERE sourced_id LIKE :pattern"),
+        {"pattern": f"{PREFIX}r-%0"},
+    )
+    db.commit()
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text("VACUUM ANALYZE results"))
+
+
+def _index_sizes(db, indexes: List[str]) -> Dict[str, int]:
+    return {
+        name: db.execute(
+            text("SELECT pg_relation_size(CAST(:name AS regclass))"), {"name": name}
+        ).scalar()
+        // 1024
+        for name in indexes
+    }
+
+
+def _writes(db, first: int, rows: int, writes: int) -> Dict:
+    def counters():
+        return db.execute(
+            text(
+                "SELECT n_tup_upd, n_tup_hot_upd FROM pg_stat_xact_user_tables "
+                "WHERE relid = 'results'::regclass"
+            )
+        ).one()
+
+    before = counters()
+    start = time.perf_counter()
+    for i in range(writes):
+        # Spread over the rows; only date_last_modified (by trigger) and an
+        # unindexed flag change
+        n = first + i * rows // writes
+        db.execute(
+            text("UPDATE results SET late = NOT late WHERE sourced_id = :id"),
+            {"id": f"{PREFIX}r-{n + 1 if n % 10 == 0 else n}"},
+        )
+    updates = time.perf_counter() - start
+    after = counters()
+
+    start = time.perf_counter()
+    for i in range(writes):
+        db.execute(
+            text(
+                "INSERT INTO results (sourced_id, line_item_sourced_id, student_sourced_id, "
+                "score_status, score, score_date) "
+                "VALUES (:id, :line_item, :id, 'earnedFull', 50, CURRENT_DATE)"
+            ),
+            {"id": f"{PREFIX}new-{first}-{i}", "line_item": f"{PREFIX}li-1"},
+        )
+    inserts = time.perf_counter() - start
+
+    updated = after[0] - before[0]
+    return {
+        "updatesPerSecond": round(writes / updates),
+        "hotUpdateShare": round((after[1] - before[1]) / updated, 3) if updated else 0.0,
+        "insertsPerSecond": round(writes / inserts),
+    }
+
+
+def _explain(db, sql: str, params: Dict, runs: int) -> Dict:
+    times: List[float] = []
+    plan = None
+    for _ in range(runs):
+        plan = db.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}"), params).scalar()[
+            0
+        ]
+        times.append(plan["Execution Time"])
+
+    nodes = []
+
+    def walk(node: Dict) -> None:
+        if "Index Name" in node or node["Node Type"] == "Seq Scan":
+            target = node.get("Index Name", node.get("Relation Name"))
+            nodes.append(f"{node['Node Type']} ({target})")
+        for child in node.get("Plans", []):
+            walk(child)
+
+    walk(plan["Plan"])
+    return {
+        "medianMs": round(statistics.median(times), 3),
+        "sharedBuffers": plan["Plan"].get("Shared Hit Blocks", 0)
+        + plan["Plan"].get("Shared Read Blocks", 0),
+        "scans": nodes,
+    }
+
+
+def run(results: int, writes: int, runs: int) -> Dict[str, Dict]:
+    """Run the benchmark and return sizes, write rates and query timings per layout."""
+    db = SessionLocal()
+    report = {}
+    try:
+        _seed(db, results)
+        params = (
+            db.execute(
+                text(
+                    "SELECT MAX(date_last_modified) - INTERVAL '10 minutes' AS since, "
+                    "MIN(date_last_modified) AS old_since, MAX(score_date) - 30 AS week_start "
+                    "FROM results WHERE sourced_id LIKE :prefix"
+                ),
+                {"prefix": f"{PREFIX}%"},
+            )
+            .one()
+            ._asdict()
+        )
+
+        # Each layout updates its own share of the rows, so neither finds
+        # heap space freed after the other's rolled-back writes
+        share = results // len(LAYOUTS)
+        for number, (name, layout) in enumerate(LAYOUTS.items()):
+            for statement in layout["ddl"]:
+                db.execute(text(statement))
+            report[name] = {
+                "indexKb": _index_sizes(db, layout["indexes"]),
+                "queries": {
+                    query: _explain(db, sql, params, runs) for query, sql in QUERIES.items()
+                },
+                "writes": _writes(db, number * share + 1, share, writes),
+            }
+            db.rollback()
+    finally:
+        db.rollback()
+        for table in ("results", "line_items"):
+            db.execute(
+                text(f"DELETE FROM {table} WHERE sourced_id LIKE :prefix"), {"prefix": f"{PREFIX}%"}
+            )
+        db.commit()
+        db.close()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--results", type=int, default=200000)
+    parser.add_argument("--writes", type=int, default=2000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    report = run(args.results, args.writes, args.runs)
+    for name, numbers in report.items():
+        sizes = ", ".join(f"{index} {size} kB" for index, size in numbers["indexKb"].items())
+        writes = numbers["writes"]
+        print(f"{name:>5}: {sizes}")
+        print(
+            f"{'':>5}  {writes['updatesPerSecond']} updates/s "
+            f"({writes['hotUpdateShare']:.0%} HOT), {writes['insertsPerSecond']} inserts/s"
+        )
+        for query, plan in numbers["queries"].items():
+            print(
+                f"{'':>5}  {query:>16}: {plan['medianMs']:>8} ms, "
+                f"{plan['sharedBuffers']:>5} buffers, {', '.join(plan['scans'])}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Write coalescing benchmark.
+
+Upserts the same burst of result PUTs twice: one transaction per write
+through ResultService, then through ResultWriteCoalescer with all writes
+in flight at once. Reports wall time and the number of commits.
+Rows are created with a ``bench-`` prefix and removed afterwards.
+
+Usage: python -m benchmarks.coalesced_writes [--writes N]
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Dict, List, Tuple
+
+from sqlalchemy import event, text
+
+from src.config.database import SessionLocal, engine
+from src.services.result_service import ResultService
+from src.services.write_coalescer import ResultWriteCoalescer
+
+PREFIX = "bench-coalesce-"
+LINE_ITEM_ID = f"{PREFIX}line-item"
+
+
+def _writes(count: int, score: float) -> List[Tuple[str, Dict]]:
+    return [
+        (
+            f"{PREFIX}{i}",
+            {
+                "lineItemSourcedId": LINE_ITEM_ID,
+                "studentSourcedId": f"bench-student-{i}",
+                "scoreStatus": "earnedPartial",
+                "score": score,
+            },
+        )
+        for i in range(count)
+    ]
+
+
+def _timed(label: str, func, commits: List[int]) -> Dict:
+    commits[0] = 0
+    start = time.perf_counter()
+    func()
+    return {
+        "mode": label,
+        "totalMs": round((time.perf_counter() - start) * 1000, 1),
+        "commits": commits[0],
+    }
+
+
+def run(count: int) -> List[Dict]:
+    """Run the benchmark and return one report per mode."""
+    db = SessionLocal()
+    db.execute(
+        text(
+            "INSERT INTO line_items (sourced_id, title, assign_date, due_date, class_sourced_id) "
+            "VALUES (:id, 'Benchmark', NOW(), NOW(), 'bench-class')"
+        ),
+        {"id": LINE_ITEM_ID},
+    )
+    db.commit()
+
+    commits = [0]
+
+    def count_commit(*args) -> None:
+        commits[0] += 1
+
+    def sequential() -> None:
+        service = ResultService(db)
+        for sourced_id, body in _writes(count, 60):
+            service.upsert(sourced_id, body)
+
+    def coalesced() -> None:
+        coalescer = ResultWriteCoalescer(delay_ms=5, max_batch=500)
+
+        async def burst():
+            await asyncio.gather(
+                *(coalescer.upsert(sourced_id, body) for sourced_id, body in _writes(count, 70))
+            )
+
+        asyncio.run(burst())
+
+    event.listen(engine, "commit", count_commit)
+    try:
+        return [_timed("sequential", sequential, commits), _timed("coalesced", coalesced, commits)]
+    finally:
+        event.remove(engine, "commit", count_commit)
+        db.execute(text("DELETE FROM line_items WHERE sourced_id = :id"), {"id": LINE_ITEM_ID})
+        db.commit()
+        db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--writes", type=int, default=2000)
+    args = parser.parse_args()
+    for report in run(args.writes):
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Response compression benchmark.
+
+Encodes a 1000-row results page (with metadata and hrefs, as served by
+GET /results?limit=1000) and measures, per available encoding and level,
+the CPU time to compress it against the bytes saved. No database needed.
+
+Usage: python -m benchmarks.compression [--rows N] [--iterations N]
+"""
+
+import argparse
+import statistics
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from src.middleware import compression
+from src.models.models import Result, ScoreStatusEnum, StatusEnum
+from src.services.collection_cache import encode
+
+LEVELS = {"gzip": (1, 6, 9), "br": (1, 5, 11), "zstd": (1, 3, 10)}
+
+
+def _page(rows: int) -> bytes:
+    now = datetime.utcnow()
+    results = [
+        Result(
+            sourced_id=f"bench-result-{i:06d}",
+            status=StatusEnum.active,
+            date_last_modified=now,
+            line_item_sourced_id=f"bench-line-item-{i % 40:03d}",
+            student_sourced_id=f"bench-student-{i // 40:05d}",
+            score_status=ScoreStatusEnum.earnedPartial,
+            score=50 + i % 50,
+            score_date=now,
+            comment="Good work, see rubric feedback" if i % 3 else None,
+            metadata_={"attempt": 1 + i % 3, "rubric": {"criteria": i % 4, "source": "lms"}},
+        )
+        for i in range(rows)
+    ]
+    data = [result.to_oneroster_dict() for result in results]
+    return encode({"data": data, "total": rows, "limit": rows, "offset": 0})
+
+
+def _time(operation: Callable[[], bytes], iterations: int) -> float:
+    timings: List[float] = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        operation()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def run(rows: int, iterations: int) -> Dict[str, Dict]:
+    """Run the benchmark and return size and CPU cost per encoding and level."""
+    raw = _page(rows)
+    report = {"identity": {"bytes": len(raw)}}
+    settings_attr = {
+        "gzip": "compression_gzip_level",
+        "br": "compression_brotli_quality",
+        "zstd": "compression_zstd_level",
+    }
+    original = {name: getattr(compression.settings, attr) for name, attr in settings_attr.items()}
+    try:
+        for encoding in compression.CODECS:
+            for level in LEVELS[encoding]:
+                setattr(compression.settings, settings_attr[encoding], level)
+                compressed = compression.compress(raw, encoding)
+                median_ms = _time(
+                    lambda encoding=encoding: compression.compress(raw, encoding), iterations
+                )
+                report[f"{encoding}-{level}"] = {
+                    "bytes": len(compressed),
+                    "ratio": round(len(raw) / len(compressed), 1),
+                    "medianMs": round(median_ms, 2),
+                    "savedKbPerCpuMs": round((len(raw) - len(compressed)) / 1024 / median_ms, 1),
+                }
+    finally:
+        for name, attr in settings_attr.items():
+            setattr(compression.settings, attr, original[name])
+
+    body = compression.EncodedBody(raw)
+    body.response("gzip", "application/json")
+    report["cached gzip hit"] = {
+        "medianMs": round(_time(lambda: body.response("gzip", "application/json").body, 200), 4)
+    }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+    for variant, numbers in run(args.rows, args.iterations).items():
+        print(f"{variant:>16}: {numbers}")
+
+
+if __name__ == "__main__":
+    main()
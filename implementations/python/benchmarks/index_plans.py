@@ -0,0 +1,176 @@
+"""
+Collection index benchmark.
+
+Seeds line items and results (a share of them tombstoned) with a ``bench-``
+prefix and runs the hot collection queries under EXPLAIN (ANALYZE, BUFFERS),
+once with the partial/covering indexes from schema.sql and once with the
+single-column indexes they replaced. The baseline indexes only exist inside
+a rolled-back transaction; the seeded rows are removed afterwards.
+
+Usage: python -m benchmarks.index_plans [--line-items N] [--results-per-item N]
+"""
+
+import argparse
+import statistics
+from typing import Dict, List
+
+from sqlalchemy import text
+
+from src.config.database import SessionLocal, engine
+from src.services.statistics_service import STATISTICS_QUERY
+
+PREFIX = "bench-index-"
+
+QUERIES = {
+    "results page": (
+        "SELECT * FROM results WHERE line_item_sourced_id = :line_item "
+        "AND status = 'active' ORDER BY sourced_id LIMIT 100"
+    ),
+    "results count": (
+        "SELECT COUNT(*) FROM results WHERE line_item_sourced_id = :line_item "
+        "AND status = 'active'"
+    ),
+    "student scores": (
+        "SELECT line_item_sourced_id, score_status, score FROM results "
+        "WHERE student_sourced_id = :student AND status = 'active' ORDER BY sourced_id"
+    ),
+    "class line items": (
+        "SELECT * FROM line_items WHERE class_sourced_id = :class "
+        "AND status = 'active' ORDER BY due_date, sourced_id LIMIT 100"
+    ),
+    "statistics": str(STATISTICS_QUERY),
+}
+
+BASELINE_DDL = [
+    "DROP INDEX idx_line_items_active_class",
+    "DROP INDEX idx_line_items_active_due_date",
+    "DROP INDEX idx_results_active_line_item",
+    "DROP INDEX idx_results_active_student",
+    "CREATE INDEX idx_line_items_status ON line_items(status)",
+    "CREATE INDEX idx_line_items_class ON line_items(class_sourced_id)",
+    "CREATE INDEX idx_line_items_due_date ON line_items(due_date)",
+    "CREATE INDEX idx_results_status ON results(status)",
+    "CREATE INDEX idx_results_lineitem ON results(line_item_sourced_id)",
+    "CREATE INDEX idx_results_student ON results(student_sourced_id)",
+    "ANALYZE line_items",
+    "ANALYZE results",
+]
+
+
+def _seed(db, line_items: int, results_per_item: int) -> None:
+    # Every fourth row is tombstoned, as after routine deletes
+    db.execute(
+        text(
+            "INSERT INTO line_items (sourced_id, status, title, assign_date, due_date, "
+            "class_sourced_id, result_value_min, result_value_max) "
+            "SELECT :prefix || 'li-' || i, "
+            "CASE WHEN i % 4 = 0 THEN 'tobedeleted' ELSE 'active' END::status_enum, "
+            "'Benchmark', NOW(), NOW() + i * INTERVAL '1 hour', "
+            ":prefix || 'class-' || (i % 20), 0, 100 "
+            "FROM generate_series(1, :line_items) AS i"
+        ),
+        {"prefix": PREFIX, "line_items": line_items},
+    )
+    db.execute(
+        text(
+            "INSERT INTO results (sourced_id, status, line_item_sourced_id, "
+            "student_sourced_id, score_status, score) "
+            "SELECT :prefix || 'r-' || i || '-' || s, "
+            "CASE WHEN s % 4 = 0 THEN 'tobedeleted' ELSE 'active' END::status_enum, "
+            ":prefix || 'li-' || i, :prefix || 'student-' || s, "
+            "'earnedFull', (i * 7 + s * 13) % 101 "
+            "FROM generate_series(1, :line_items) AS i, "
+            "generate_series(1, :results_per_item) AS s"
+        ),
+        {"prefix": PREFIX, "line_items": line_items, "results_per_item": results_per_item},
+    )
+    db.commit()
+    # VACUUM also sets the visibility map, so index-only scans skip the heap
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text("VACUUM ANALYZE line_items"))
+        connection.execute(text("VACUUM ANALYZE results"))
+
+
+def _explain(db, sql: str, params: Dict, runs: int) -> Dict:
+    times: List[float] = []
+    plan = None
+    for _ in range(runs):
+        plan = db.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}"), params).scalar()[
+            0
+        ]
+        times.append(plan["Execution Time"])
+
+    nodes = []
+
+    def walk(node: Dict) -> None:
+        if "Index Name" in node or node["Node Type"] == "Seq Scan":
+            target = node.get("Index Name", node.get("Relation Name"))
+            nodes.append(f"{node['Node Type']} ({target})")
+        for child in node.get("Plans", []):
+            walk(child)
+
+    walk(plan["Plan"])
+    return {
+        "medianMs": round(statistics.median(times), 3),
+        "sharedBuffers": plan["Plan"].get("Shared Hit Blocks", 0)
+        + plan["Plan"].get("Shared Read Blocks", 0),
+        "scans": nodes,
+    }
+
+
+def _run_queries(db, runs: int) -> Dict[str, Dict]:
+    params = {
+        "line_item": f"{PREFIX}li-1",
+        "student": f"{PREFIX}student-1",
+        "class": f"{PREFIX}class-1",
+        "low": 0,
+        "high": 100,
+        "buckets": 10,
+        "line_item_sourced_id": f"{PREFIX}li-1",
+        "academic_session": None,
+    }
+    return {name: _explain(db, sql, params, runs) for name, sql in QUERIES.items()}
+
+
+def run(line_items: int, results_per_item: int, runs: int) -> Dict[str, Dict[str, Dict]]:
+    """Run the benchmark and return plans and timings per index set and query."""
+    db = SessionLocal()
+    report = {}
+    try:
+        _seed(db, line_items, results_per_item)
+        report["partial"] = _run_queries(db, runs)
+        db.rollback()
+
+        for statement in BASELINE_DDL:
+            db.execute(text(statement))
+        report["baseline"] = _run_queries(db, runs)
+        db.rollback()
+    finally:
+        db.rollback()
+        for table in ("results", "line_items"):
+            db.execute(
+                text(f"DELETE FROM {table} WHERE sourced_id LIKE :prefix"), {"prefix": f"{PREFIX}%"}
+            )
+        db.commit()
+        db.close()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--line-items", type=int, default=2000)
+    parser.add_argument("--results-per-item", type=int, default=100)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    report = run(args.line_items, args.results_per_item, args.runs)
+    for name in QUERIES:
+        for index_set in ("baseline", "partial"):
+            numbers = report[index_set][name]
+            print(
+                f"{name:>16} {index_set:>8}: {numbers['medianMs']:>8} ms, "
+                f"{numbers['sharedBuffers']:>5} buffers, {', '.join(numbers['scans'])}"
+            )
+
+
+if __name__ == "__main__":
+    main()
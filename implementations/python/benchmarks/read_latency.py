@@ -0,0 +1,110 @@
+"""
+Single-resource read latency benchmark.
+
+Measures service-level lookups of categories and line items as served by
+GET /{sourcedId}: a database read plus serialization, against the
+per-worker resource cache; and the same for a GET /lineItems collection
+page against the collection cache. Rows are created with a ``bench-`` prefix and
+removed afterwards.
+
+Usage: python -m benchmarks.read_latency [--iterations N]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Callable, Dict, List
+
+from sqlalchemy import text
+
+from src.config.database import SessionLocal
+from src.services.category_service import CategoryService
+from src.services.collection_cache import cached_collection, collection_cache, encode
+from src.services.line_item_service import LineItemService
+from src.services.resource_cache import resource_cache
+
+PREFIX = "bench-read-"
+
+
+def _measure(operation: Callable[[int], object], iterations: int) -> Dict:
+    timings: List[float] = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        operation(i)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "medianMs": round(statistics.median(timings), 4),
+        "p95Ms": round(timings[int(len(timings) * 0.95) - 1], 4),
+    }
+
+
+def run(iterations: int) -> Dict[str, Dict]:
+    """Run the benchmark and return timings per lookup."""
+    db = SessionLocal()
+    services = {"category": CategoryService(db), "lineItem": LineItemService(db)}
+    category_id = f"{PREFIX}category"
+    line_item_id = f"{PREFIX}line-item"
+    db.execute(
+        text("INSERT INTO categories (sourced_id, title) VALUES (:id, 'Benchmark')"),
+        {"id": category_id},
+    )
+    db.execute(
+        text(
+            "INSERT INTO line_items (sourced_id, title, assign_date, due_date, class_sourced_id, "
+            "category_sourced_id) VALUES (:id, 'Benchmark', NOW(), NOW(), 'bench-class', :category)"
+        ),
+        {"id": line_item_id, "category": category_id},
+    )
+    db.commit()
+    ids = {"category": category_id, "lineItem": line_item_id}
+
+    report = {}
+    try:
+        for name, service in services.items():
+            sourced_id = ids[name]
+            report[f"{name} uncached"] = _measure(
+                lambda i, service=service, sourced_id=sourced_id: (
+                    service.get_by_id(sourced_id).to_oneroster_dict()
+                ),
+                iterations,
+            )
+            resource_cache.clear()
+            report[f"{name} cached"] = _measure(
+                lambda i, service=service, sourced_id=sourced_id: service.get_cached(sourced_id),
+                iterations,
+            )
+        line_items = services["lineItem"]
+
+        def page() -> dict:
+            items, total = line_items.get_all(filter_expr="classSourcedId='bench-class'")
+            return {"data": [item.to_oneroster_dict() for item in items], "total": total}
+
+        report["collection uncached"] = _measure(lambda i: encode(page()), iterations)
+        collection_cache.clear()
+        loop = asyncio.new_event_loop()
+        report["collection cached"] = _measure(
+            lambda i: loop.run_until_complete(cached_collection("bench", ("lineItems",), page)),
+            iterations,
+        )
+        loop.close()
+        report["cache"] = resource_cache.stats()
+    finally:
+        db.execute(text("DELETE FROM line_items WHERE sourced_id = :id"), {"id": line_item_id})
+        db.execute(text("DELETE FROM categories WHERE sourced_id = :id"), {"id": category_id})
+        db.commit()
+        db.close()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    for lookup, numbers in run(args.iterations).items():
+        print(f"{lookup:>18}: {numbers}")
+
+
+if __name__ == "__main__":
+    main()
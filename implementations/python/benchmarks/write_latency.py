@@ -0,0 +1,145 @@
+"""
+Write path latency benchmark.
+
+Measures service-level update (PUT) and soft delete (DELETE) latency for
+results, along with the number of SQL statements each call issues.
+``--baseline`` measures the write pattern the services used before single
+statement writes instead: load the row, modify it, commit, and reload it.
+Rows are created with a ``bench-`` prefix and removed afterwards.
+
+Usage: python -m benchmarks.write_latency [--iterations N] [--baseline]
+"""
+
+import argparse
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from src.config.database import SessionLocal, engine
+from src.models.models import Result, StatusEnum
+from src.services.result_service import UPDATABLE_FIELDS, ResultService
+from src.services.statistics_service import StatisticsService
+
+PREFIX = "bench-write-"
+
+
+class StatementCounter:
+    """Counts statements sent to the database."""
+
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __call__(self, *args) -> None:
+        self.count += 1
+
+
+class BaselineResultService:
+    """Result writes as a SELECT, the write, and a reload of the expired row."""
+
+    def __init__(self, db: Session) -> None:
+        self.db = db
+
+    def update(self, sourced_id: str, data: Dict[str, Any]) -> Optional[Result]:
+        result = self.db.query(Result).filter(Result.sourced_id == sourced_id).first()
+        if not result:
+            return None
+        for key, column in UPDATABLE_FIELDS.items():
+            if key in data:
+                setattr(result, column.key, data[key])
+        self.db.commit()
+        self.db.refresh(result)
+        StatisticsService.invalidate(result.line_item_sourced_id)
+        return result
+
+    def delete(self, sourced_id: str) -> bool:
+        result = self.db.query(Result).filter(Result.sourced_id == sourced_id).first()
+        if not result:
+            return False
+        result.status = StatusEnum.tobedeleted
+        self.db.commit()
+        StatisticsService.invalidate(result.line_item_sourced_id)
+        return True
+
+
+def _measure(
+    operation: Callable[[int], object], iterations: int, counter: StatementCounter
+) -> Dict:
+    timings: List[float] = []
+    counter.count = 0
+    for i in range(iterations):
+        start = time.perf_counter()
+        operation(i)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "medianMs": round(statistics.median(timings), 3),
+        "p95Ms": round(timings[int(len(timings) * 0.95) - 1], 3),
+        "statementsPerCall": counter.count / iterations,
+    }
+
+
+def run(iterations: int, baseline: bool = False) -> Dict[str, Dict]:
+    """Run the benchmark and return timings per operation."""
+    db = SessionLocal()
+    service = ResultService(db)
+    # The sessions expired every object on commit before single statement writes
+    writer = BaselineResultService(Session(engine)) if baseline else service
+    line_item_id = f"{PREFIX}line-item"
+    db.execute(
+        text(
+            "INSERT INTO line_items (sourced_id, title, assign_date, due_date, class_sourced_id) "
+            "VALUES (:id, 'Benchmark', NOW(), NOW(), 'bench-class')"
+        ),
+        {"id": line_item_id},
+    )
+    db.commit()
+    for i in range(iterations):
+        service.create(
+            {
+                "sourcedId": f"{PREFIX}{i}",
+                "lineItemSourcedId": line_item_id,
+                "studentSourcedId": f"bench-student-{i}",
+                "scoreStatus": "earnedFull",
+                "score": 50,
+            }
+        )
+    db.expunge_all()
+
+    counter = StatementCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    try:
+        report = {
+            "update": _measure(
+                lambda i: writer.update(f"{PREFIX}{i}", {"score": 75, "comment": "bench"}),
+                iterations,
+                counter,
+            ),
+            "delete": _measure(lambda i: writer.delete(f"{PREFIX}{i}"), iterations, counter),
+        }
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+        if baseline:
+            writer.db.close()
+        db.rollback()
+        db.execute(text("DELETE FROM line_items WHERE sourced_id = :id"), {"id": line_item_id})
+        db.commit()
+        db.close()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument(
+        "--baseline", action="store_true", help="measure the SELECT, write and reload pattern"
+    )
+    args = parser.parse_args()
+    for operation, numbers in run(args.iterations, args.baseline).items():
+        print(f"{operation:>8}: {numbers}")
+
+
+if __name__ == "__main__":
+    main()
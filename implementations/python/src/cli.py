@@ -0,0 +1,151 @@
+"""
+OneRoster Gradebook Service - Maintenance CLI
+Usage: python -m src.cli <command> [options]
+"""
+
+import argparse
+import json
+import sys
+from typing import List, Optional
+
+from src.config.database import SessionLocal
+from src.middleware.idempotency import PostgresIdempotencyStore
+from src.services.aggregate_service import AggregateService
+from src.services.compaction_service import CompactionService
+from src.services.partition_service import PartitionService
+from src.services.result_service import ResultService
+
+
+def rebuild_aggregates(args: argparse.Namespace) -> dict:
+    """Rebuild result aggregates from the results table."""
+    db = SessionLocal()
+    try:
+        return AggregateService(db).rebuild()
+    finally:
+        db.close()
+
+
+def compact_tombstones(args: argparse.Namespace) -> dict:
+    """Archive tobedeleted rows older than the retention window."""
+    db = SessionLocal()
+    try:
+        return CompactionService(db).compact(
+            retention_days=args.retention_days, batch_size=args.batch_size
+        )
+    finally:
+        db.close()
+
+
+def purge_idempotency_keys(args: argparse.Namespace) -> dict:
+    """Delete expired rows from the idempotency_keys table."""
+    return {"idempotencyKeysPurged": PostgresIdempotencyStore().purge_expired()}
+
+
+def backfill_result_classes(args: argparse.Namespace) -> dict:
+    """Copy the line item class onto results written before it was denormalized."""
+    db = SessionLocal()
+    try:
+        return ResultService(db).backfill_classes(batch_size=args.batch_size)
+    finally:
+        db.close()
+
+
+def create_result_partitions(args: argparse.Namespace) -> dict:
+    """Create results partitions for academic sessions that have none."""
+    db = SessionLocal()
+    try:
+        return PartitionService(db).create_partitions()
+    finally:
+        db.close()
+
+
+def detach_result_partition(args: argparse.Namespace) -> dict:
+    """Detach an academic session's results partition."""
+    db = SessionLocal()
+    try:
+        return PartitionService(db).detach(args.academic_session)
+    finally:
+        db.close()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the CLI argument parser."""
+    parser = argparse.ArgumentParser(
+        prog="python -m src.cli",
+        description="OneRoster Gradebook Service maintenance commands",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = subparsers.add_parser(
+        "rebuild-aggregates",
+        help="Rebuild line item and student/category score aggregates (drift repair)",
+    )
+    rebuild.set_defaults(func=rebuild_aggregates)
+
+    compact = subparsers.add_parser(
+        "compact-tombstones",
+        help="Move old tobedeleted rows into the archive tables",
+    )
+    compact.add_argument(
+        "--retention-days",
+        type=int,
+        default=None,
+        help="Keep tombstones modified within this many days (default: TOMBSTONE_RETENTION_DAYS)",
+    )
+    compact.add_argument(
+        "--batch-size",
+        type=int,
+        default=None,
+        help="Rows moved per transaction (default: COMPACTION_BATCH_SIZE)",
+    )
+    compact.set_defaults(func=compact_tombstones)
+
+    purge = subparsers.add_parser(
+        "purge-idempotency-keys",
+        help="Delete expired Idempotency-Key responses (IDEMPOTENCY_STORE=postgres)",
+    )
+    purge.set_defaults(func=purge_idempotency_keys)
+
+    backfill = subparsers.add_parser(
+        "backfill-result-classes",
+        help="Fill in results.class_sourced_id and academic_session_sourced_id "
+        "from each result's line item",
+    )
+    backfill.add_argument(
+        "--batch-size",
+        type=int,
+        default=None,
+        help="Results checked per transaction (default: COMPACTION_BATCH_SIZE)",
+    )
+    backfill.set_defaults(func=backfill_result_classes)
+
+    create_partitions = subparsers.add_parser(
+        "create-result-partitions",
+        help="Create results partitions for new academic sessions (partitioned results)",
+    )
+    create_partitions.set_defaults(func=create_result_partitions)
+
+    detach = subparsers.add_parser(
+        "detach-result-partition",
+        help="Detach an academic session's results partition (partitioned results)",
+    )
+    detach.add_argument(
+        "--academic-session",
+        required=True,
+        help="sourcedId of the academic session to detach",
+    )
+    detach.set_defaults(func=detach_result_partition)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """CLI entry point. Prints the command report as JSON."""
+    args = build_parser().parse_args(argv)
+    report = args.func(args)
+    print(json.dumps(report, indent=2, default=str))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,9 +2,10 @@
 Database configuration and session management.
 """
 
-from typing import Generator
+from typing import Callable, Generator
 
-from sqlalchemy import create_engine
+from fastapi import Depends
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import Session, sessionmaker
 
@@ -19,8 +20,9 @@ engine = create_engine(
     echo=settings.debug,  # Log SQL queries in debug mode
 )
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Create session factory. Objects stay loaded after commit: write paths get
+# every column back from RETURNING and must not re-SELECT to serialize them.
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 # Base class for models
 Base = declarative_base()
@@ -36,3 +38,50 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+@event.listens_for(Session, "after_begin")
+def _apply_statement_timeout(session: Session, transaction, connection) -> None:
+    # Set per transaction, so a session no request statement ever uses
+    # (e.g. on a cache hit) never checks out a connection for it
+    timeout_ms = session.info.get("statement_timeout_ms")
+    if timeout_ms:
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+
+
+def statement_timeout(timeout_ms: int) -> Callable[..., Session]:
+    """
+    Build a session dependency whose transactions run with a statement_timeout.
+
+    The timeout is applied with SET LOCAL when a transaction begins, so it
+    never outlives the request's transactions on the pooled connection.
+    A statement cancelled by it is answered with 503 and Retry-After.
+
+    Args:
+        timeout_ms: Timeout in milliseconds (0 disables)
+    """
+
+    def dependency(db: Session = Depends(get_db)) -> Session:
+        db.info["statement_timeout_ms"] = timeout_ms
+        return db
+
+    return dependency
+
+
+def session_like(db: Session) -> Session:
+    """
+    Open a new session with the bind and statement timeout of another.
+
+    For work shared beyond the request that owns db (such as a query other
+    requests wait on), which must not fail when that request ends and its
+    session is closed. The caller closes the new session.
+    """
+    session = SessionLocal(bind=db.get_bind())
+    session.info.update(db.info)
+    return session
+
+
+# Per-route session dependencies
+get_read_db = statement_timeout(settings.read_statement_timeout_ms)
+get_collection_db = statement_timeout(settings.collection_statement_timeout_ms)
+get_write_db = statement_timeout(settings.write_statement_timeout_ms)
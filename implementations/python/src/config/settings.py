@@ -51,6 +51,69 @@ class Settings(BaseSettings):
     rate_limit_enabled: bool = True
     rate_limit_per_minute: int = 100
 
+    # Filtering
+    filter_contains_min_length: int = 3  # shortest value for contains (~) filters
+    metadata_filter_keys: str = "vendorId"  # comma-separated metadata.<path> filter allowlist
+    filter_in_max_values: int = 5000  # longest IN (...) list, and most ids per batchGet
+    # Page limit cap with a collection include (e.g. lineItems?include=results),
+    # whose rows are loaded without a limit of their own
+    include_collection_max_limit: int = 50
+
+    # Query Guard: on tables with at least QUERY_GUARD_MIN_ROWS (planner
+    # estimate), filters and sorts must be backed by a declared index
+    query_guard_mode: str = "reject"  # reject, downgrade (drop unindexed sort keys) or off
+    query_guard_min_rows: int = 50000
+    # Set once migrations/013_brin_timestamp_indexes.sql has replaced the
+    # results timestamp B-trees: BRIN backs range filters but not sorts
+    results_brin_indexes: bool = False
+
+    # Statement Timeouts per route class, in milliseconds (0 disables)
+    read_statement_timeout_ms: int = 2000
+    collection_statement_timeout_ms: int = 10000
+    write_statement_timeout_ms: int = 5000
+    statement_timeout_retry_after_seconds: int = 5
+
+    # Delta Sync
+    delta_sync_safety_lag_seconds: int = 5
+
+    # Partitioning: set once migrations/012_partition_results.sql has
+    # partitioned results by academic session
+    results_partitioned: bool = False
+
+    # Tombstone Compaction
+    tombstone_retention_days: int = 90
+    compaction_batch_size: int = 1000
+
+    # Write Coalescing
+    result_write_coalescing_enabled: bool = False
+    result_write_coalescing_delay_ms: int = 5
+    result_write_coalescing_max_batch: int = 500
+
+    # Idempotency Keys
+    idempotency_enabled: bool = True
+    idempotency_store: str = "memory"  # memory or postgres
+    idempotency_ttl_seconds: int = 86400
+    idempotency_max_entries: int = 10000
+
+    # Response Compression (br/zstd need the optional brotli/zstandard packages)
+    compression_enabled: bool = True
+    compression_min_size: int = 1024
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 5
+    compression_zstd_level: int = 3
+
+    # Caching
+    statistics_cache_ttl_seconds: int = 300
+    statistics_cache_max_entries: int = 1024
+    score_scale_cache_ttl_seconds: int = 300
+    score_scale_cache_max_entries: int = 256
+    resource_cache_ttl_seconds: int = 60
+    resource_cache_max_entries: int = 10000  # 0 disables the cache
+    collection_cache_ttl_seconds: int = 60
+    collection_cache_max_entries: int = 256  # 0 disables the cache
+    collection_cache_max_body_bytes: int = 1048576
+    cache_invalidation_listener_enabled: bool = True
+
     # Logging
     log_level: str = "INFO"
     log_format: str = "json"
@@ -3,21 +3,47 @@ OneRoster Gradebook Service - FastAPI Application
 Main application entry point.
 """
 
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
 
 from fastapi import FastAPI, Form, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from psycopg2.errors import QueryCanceled
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from slowapi.util import get_remote_address
+from sqlalchemy.exc import OperationalError
 
 from src.config.settings import settings
 from src.middleware.auth import create_access_token, save_token, verify_client
-from src.routers import categories, line_items, results
+from src.middleware.compression import CompressionMiddleware
+from src.middleware.idempotency import IdempotencyMiddleware
+from src.routers import categories, line_items, results, score_scales, students
+from src.services.change_listener import change_listener
+from src.services.collection_cache import collection_cache, collection_flights
+from src.services.resource_cache import resource_cache
+from src.services.score_scale_service import compiled_scale_cache
+from src.services.statistics_service import statistics_cache
+from src.utils.include import InvalidIncludeError
+from src.utils.query_parser import InvalidFilterError, InvalidSortError
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run per-worker background services for the lifetime of the app."""
+    # Drop cached rows when any worker commits a change to them
+    if settings.cache_invalidation_listener_enabled:
+        change_listener.start()
+    try:
+        yield
+    finally:
+        change_listener.stop()
+
 
 # Create FastAPI app
 app = FastAPI(
+    lifespan=lifespan,
     title=settings.app_name,
     version=settings.app_version,
     description="IMS Global OneRoster v1.2 Gradebook Service Reference Implementation",
@@ -32,8 +58,17 @@ app.add_middleware(
     allow_credentials=settings.cors_allow_credentials,
     allow_methods=settings.cors_methods_list,
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+# Replay responses for retried writes carrying an Idempotency-Key
+if settings.idempotency_enabled:
+    app.add_middleware(IdempotencyMiddleware)
+
+# Outermost, so idempotency keys store and replay identity-coded bodies
+if settings.compression_enabled:
+    app.add_middleware(CompressionMiddleware)
+
 # Configure rate limiting
 limiter = Limiter(key_func=get_remote_address)
 app.state.limiter = limiter
@@ -53,6 +88,7 @@ async def root():
             "categories": "/ims/oneroster/v1p2/categories",
             "lineItems": "/ims/oneroster/v1p2/lineItems",
             "results": "/ims/oneroster/v1p2/results",
+            "scoreScales": "/ims/oneroster/v1p2/scoreScales",
             "students": "/ims/oneroster/v1p2/students",
         },
         "documentation": "https://www.imsglobal.org/spec/oneroster/v1p2",
@@ -66,6 +102,15 @@ async def health():
         "status": "ok",
         "timestamp": datetime.utcnow().isoformat() + "Z",
         "environment": settings.environment,
+        "caches": {
+            "resources": resource_cache.stats(),
+            "collections": {
+                **collection_cache.stats(),
+                "sharedQueries": collection_flights.shared,
+            },
+            "statistics": statistics_cache.stats(),
+            "scoreScales": compiled_scale_cache.stats(),
+        },
     }
 
 
@@ -148,6 +193,8 @@ API_BASE = "/ims/oneroster/v1p2"
 app.include_router(categories.router, prefix=f"{API_BASE}/categories", tags=["Categories"])
 app.include_router(line_items.router, prefix=f"{API_BASE}/lineItems", tags=["Line Items"])
 app.include_router(results.router, prefix=f"{API_BASE}/results", tags=["Results"])
+app.include_router(score_scales.router, prefix=f"{API_BASE}/scoreScales", tags=["Score Scales"])
+app.include_router(students.router, prefix=f"{API_BASE}/students", tags=["Students"])
 
 
 @app.exception_handler(HTTPException)
@@ -164,6 +211,39 @@ async def http_exception_handler(request, exc):
     )
 
 
+@app.exception_handler(InvalidFilterError)
+@app.exception_handler(InvalidSortError)
+@app.exception_handler(InvalidIncludeError)
+async def invalid_query_handler(request, exc):
+    """Report filter clauses, sort keys or includes that cannot be served as a OneRoster 400."""
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={
+            "imsx_codeMajor": "failure",
+            "imsx_severity": "error",
+            "imsx_description": str(exc),
+            "imsx_codeMinor": exc.code_minor,
+        },
+    )
+
+
+@app.exception_handler(OperationalError)
+async def operational_error_handler(request, exc):
+    """Answer statements cancelled by statement_timeout with 503 and Retry-After."""
+    if not isinstance(exc.orig, QueryCanceled):
+        return await general_exception_handler(request, exc)
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": str(settings.statement_timeout_retry_after_seconds)},
+        content={
+            "imsx_codeMajor": "failure",
+            "imsx_severity": "error",
+            "imsx_description": "The query exceeded its time limit; narrow it or retry later",
+            "imsx_codeMinor": "server_busy",
+        },
+    )
+
+
 @app.exception_handler(Exception)
 async def general_exception_handler(request, exc):
     """Handle unexpected exceptions."""
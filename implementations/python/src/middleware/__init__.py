@@ -10,6 +10,12 @@ from src.middleware.auth import (
     verify_client,
     verify_token,
 )
+from src.middleware.compression import CompressionMiddleware, EncodedBody
+from src.middleware.idempotency import (
+    IdempotencyMiddleware,
+    MemoryIdempotencyStore,
+    PostgresIdempotencyStore,
+)
 
 __all__ = [
     "create_access_token",
@@ -18,4 +24,9 @@ __all__ = [
     "verify_token",
     "get_current_client",
     "require_scope",
+    "CompressionMiddleware",
+    "EncodedBody",
+    "IdempotencyMiddleware",
+    "MemoryIdempotencyStore",
+    "PostgresIdempotencyStore",
 ]
@@ -0,0 +1,240 @@
+"""
+Response compression.
+
+Negotiates gzip, brotli or zstd from ``Accept-Encoding``. Brotli and zstd
+are used only when the optional ``brotli`` / ``zstandard`` packages are
+installed (``poetry install -E compression``). Whole bodies below
+``COMPRESSION_MIN_SIZE`` are sent as is; streamed bodies (delta sync
+exports) are compressed chunk by chunk.
+"""
+
+import gzip
+import zlib
+from typing import Callable, Dict, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.config.settings import settings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+# Content types worth compressing; everything else passes through
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/xml")
+
+
+class _StreamCompressor:
+    """compress()/flush() interface over each codec's streaming API."""
+
+    def __init__(self, compress: Callable[[bytes], bytes], flush: Callable[[], bytes]):
+        self.compress = compress
+        self.flush = flush
+
+
+def _gzip_stream() -> _StreamCompressor:
+    compressor = zlib.compressobj(settings.compression_gzip_level, zlib.DEFLATED, 31)
+    return _StreamCompressor(compressor.compress, compressor.flush)
+
+
+def _brotli_stream() -> _StreamCompressor:
+    compressor = brotli.Compressor(quality=settings.compression_brotli_quality)
+    return _StreamCompressor(compressor.process, compressor.finish)
+
+
+def _zstd_stream() -> _StreamCompressor:
+    compressor = zstandard.ZstdCompressor(level=settings.compression_zstd_level).compressobj()
+    return _StreamCompressor(compressor.compress, compressor.flush)
+
+
+# encoding -> (one-shot compress, streaming compressor factory), in server
+# preference order for equally acceptable encodings
+CODECS: Dict[str, Tuple[Callable[[bytes], bytes], Callable[[], _StreamCompressor]]] = {}
+if zstandard is not None:
+    CODECS["zstd"] = (
+        lambda data: zstandard.ZstdCompressor(level=settings.compression_zstd_level).compress(data),
+        _zstd_stream,
+    )
+if brotli is not None:
+    CODECS["br"] = (
+        lambda data: brotli.compress(data, quality=settings.compression_brotli_quality),
+        _brotli_stream,
+    )
+CODECS["gzip"] = (
+    lambda data: gzip.compress(data, compresslevel=settings.compression_gzip_level, mtime=0),
+    _gzip_stream,
+)
+
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Pick the content coding for an Accept-Encoding header.
+
+    Returns:
+        The supported encoding with the highest q-value (server preference
+        breaks ties), or None to send the body uncompressed
+    """
+    if not accept_encoding or not settings.compression_enabled:
+        return None
+
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding.strip().lower()] = q
+
+    best, best_q = None, 0.0
+    for encoding in CODECS:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Compress a whole body with a negotiated encoding."""
+    return CODECS[encoding][0](data)
+
+
+class EncodedBody:
+    """
+    Encoded (JSON) response body, with compressed variants built on demand.
+
+    Held by caches so each variant is compressed once and then reused by
+    every hit that negotiates the same encoding.
+    """
+
+    def __init__(self, raw: bytes):
+        self.raw = raw
+        self.variants: Dict[str, bytes] = {}
+
+    def __len__(self) -> int:
+        return len(self.raw)
+
+    def response(self, accept_encoding: Optional[str], media_type: str) -> Response:
+        """Build the response for a request's Accept-Encoding."""
+        encoding = None
+        if len(self.raw) >= settings.compression_min_size:
+            encoding = negotiate(accept_encoding)
+        if encoding is None:
+            return Response(content=self.raw, media_type=media_type)
+
+        variant = self.variants.get(encoding)
+        if variant is None:
+            variant = self.variants[encoding] = compress(self.raw, encoding)
+        return Response(
+            content=variant,
+            media_type=media_type,
+            headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"},
+        )
+
+
+def _compressible(headers: Headers) -> bool:
+    if "content-encoding" in headers:
+        return False
+    content_type = headers.get("content-type", "")
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses for clients that accept it.
+
+    Responses that already carry a Content-Encoding (e.g. precompressed
+    cache hits) pass through untouched. A strong ETag is weakened on
+    compressed responses, since the bytes differ from the identity coding.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = (
+            minimum_size if minimum_size is not None else settings.compression_min_size
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        await self.app(scope, receive, _CompressingSend(send, encoding, self.minimum_size))
+
+
+class _CompressingSend:
+    def __init__(self, send: Send, encoding: str, minimum_size: int):
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start: Optional[Message] = None
+        self.compressor: Optional[_StreamCompressor] = None
+        self.passthrough = False
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            self.passthrough = not _compressible(Headers(raw=message["headers"]))
+            if self.passthrough:
+                await self.send(message)
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            if not more_body:
+                # Whole body in one message
+                if len(body) < self.minimum_size:
+                    headers = MutableHeaders(raw=self.start["headers"])
+                    headers.add_vary_header("Accept-Encoding")
+                    await self.send(self.start)
+                    await self.send(message)
+                    return
+                compressed = compress(body, self.encoding)
+                await self.send(self._start_message(len(compressed)))
+                await self.send({"type": "http.response.body", "body": compressed})
+                return
+
+            # Streamed body: compress as it goes, without a Content-Length
+            self.compressor = CODECS[self.encoding][1]()
+            await self.send(self._start_message(None))
+
+        chunk = self.compressor.compress(body)
+        if not more_body:
+            chunk += self.compressor.flush()
+        if chunk or not more_body:
+            await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    def _start_message(self, content_length: Optional[int]) -> Message:
+        headers = MutableHeaders(raw=self.start["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if content_length is None:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(content_length)
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = "W/" + etag
+        return self.start
@@ -0,0 +1,395 @@
+"""
+Idempotency-Key support for write requests.
+
+A write carrying an ``Idempotency-Key`` header is executed once per client
+and key; retries with the same key and request replay the stored response
+without reaching the routers or the data tables.
+"""
+
+import hashlib
+import json
+import math
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.config.database import SessionLocal
+from src.config.settings import settings
+from src.middleware.auth import verify_token
+from src.utils.cache import TTLCache
+
+IDEMPOTENT_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+MAX_KEY_LENGTH = 255
+
+# Responses that depend on the caller's credentials or rate budget rather
+# than on the request are not stored, so a retry is evaluated afresh.
+UNSTORED_STATUS_CODES = {401, 403, 429}
+
+# A claimed key's lease outlasts a write statement by at least this much
+LEASE_MARGIN_SECONDS = 30
+
+# claim() outcomes
+CLAIMED = "claimed"
+REPLAY = "replay"
+IN_PROGRESS = "in_progress"
+MISMATCH = "mismatch"
+
+# Stored response: {"fingerprint", "status_code", "headers", "body"}
+StoredResponse = Dict
+
+
+class MemoryIdempotencyStore:
+    """Per-worker LRU store of completed responses, with TTL."""
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 86400):
+        self._responses = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        # (fingerprint, lease) of each claimed key
+        self._in_flight: Dict[Tuple[str, str], Tuple[str, object]] = {}
+        self._lock = threading.Lock()
+
+    def claim(self, client_id: str, key: str, fingerprint: str) -> Tuple[str, Any]:
+        """
+        Claim a key for a new request, or report why it cannot be claimed.
+
+        Returns:
+            The outcome, with the stored response for REPLAY or the lease to
+            complete the key with for CLAIMED
+        """
+        with self._lock:
+            stored = self._responses.get((client_id, key))
+            if stored is not None:
+                return (REPLAY if stored["fingerprint"] == fingerprint else MISMATCH), stored
+            running = self._in_flight.get((client_id, key))
+            if running is not None:
+                return (IN_PROGRESS if running[0] == fingerprint else MISMATCH), None
+            lease = object()
+            self._in_flight[(client_id, key)] = (fingerprint, lease)
+            return CLAIMED, lease
+
+    def complete(
+        self, client_id: str, key: str, response: Optional[StoredResponse], lease: Any = None
+    ) -> bool:
+        """
+        Release a claimed key, storing its response unless it is None.
+
+        Returns:
+            False, storing nothing, if the key is no longer held by lease
+        """
+        with self._lock:
+            running = self._in_flight.get((client_id, key))
+            if running is None or running[1] is not lease:
+                return False
+            del self._in_flight[(client_id, key)]
+            if response is not None:
+                self._responses.set((client_id, key), response)
+            return True
+
+
+class PostgresIdempotencyStore:
+    """
+    Idempotency store shared by all workers via the idempotency_keys table.
+
+    A claimed key is a row without a status code; its lease lets a key
+    held by a crashed worker be claimed again. A claim is identified by the
+    row's created_at, so a request that outlives its lease cannot store its
+    response over (or release) the claim of a retry that took the key over.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        ttl_seconds: int = 86400,
+        lease_seconds: int = 60,
+    ):
+        self.session_factory = session_factory
+        self.ttl_seconds = ttl_seconds
+        self.lease_seconds = lease_seconds
+
+    def claim(self, client_id: str, key: str, fingerprint: str) -> Tuple[str, Any]:
+        """
+        Claim a key for a new request, or report why it cannot be claimed.
+
+        Returns:
+            The outcome, with the stored response for REPLAY or the lease to
+            complete the key with for CLAIMED
+        """
+        params = {"client_id": client_id, "key": key, "fingerprint": fingerprint}
+        session = self.session_factory()
+        try:
+            session.execute(
+                text(
+                    "DELETE FROM idempotency_keys WHERE client_id = :client_id "
+                    "AND idempotency_key = :key AND expires_at < NOW()"
+                ),
+                params,
+            )
+            claimed = session.execute(
+                text(
+                    "INSERT INTO idempotency_keys "
+                    "(client_id, idempotency_key, fingerprint, created_at, expires_at) "
+                    "VALUES (:client_id, :key, :fingerprint, clock_timestamp(), "
+                    "NOW() + make_interval(secs => :lease)) "
+                    "ON CONFLICT (client_id, idempotency_key) DO NOTHING RETURNING created_at"
+                ),
+                {**params, "lease": self.lease_seconds},
+            ).scalar()
+            row = None
+            if not claimed:
+                row = session.execute(
+                    text(
+                        "SELECT fingerprint, status_code, response_headers, response_body "
+                        "FROM idempotency_keys "
+                        "WHERE client_id = :client_id AND idempotency_key = :key"
+                    ),
+                    params,
+                ).one_or_none()
+            session.commit()
+        finally:
+            session.close()
+
+        if claimed:
+            return CLAIMED, claimed
+        if row is None:
+            # Completed and expired between the statements; treat as in flight.
+            return IN_PROGRESS, None
+        if row.fingerprint != fingerprint:
+            return MISMATCH, None
+        if row.status_code is None:
+            return IN_PROGRESS, None
+        return REPLAY, {
+            "fingerprint": row.fingerprint,
+            "status_code": row.status_code,
+            "headers": row.response_headers,
+            "body": bytes(row.response_body),
+        }
+
+    def complete(
+        self, client_id: str, key: str, response: Optional[StoredResponse], lease: Any = None
+    ) -> bool:
+        """
+        Release a claimed key, storing its response unless it is None.
+
+        Returns:
+            False, storing nothing, if the key is no longer held by lease
+            (it expired and was claimed again)
+        """
+        params = {"client_id": client_id, "key": key, "lease": lease}
+        held = (
+            "WHERE client_id = :client_id AND idempotency_key = :key "
+            "AND created_at = :lease AND status_code IS NULL"
+        )
+        session = self.session_factory()
+        try:
+            if response is None:
+                completed = session.execute(
+                    text(f"DELETE FROM idempotency_keys {held}"), params
+                ).rowcount
+            else:
+                completed = session.execute(
+                    text(
+                        "UPDATE idempotency_keys SET status_code = :status_code, "
+                        "response_headers = CAST(:headers AS JSONB), response_body = :body, "
+                        f"expires_at = NOW() + make_interval(secs => :ttl) {held}"
+                    ),
+                    {
+                        **params,
+                        "status_code": response["status_code"],
+                        "headers": json.dumps(response["headers"]),
+                        "body": response["body"],
+                        "ttl": self.ttl_seconds,
+                    },
+                ).rowcount
+            session.commit()
+        finally:
+            session.close()
+        return completed == 1
+
+    def purge_expired(self) -> int:
+        """Delete expired keys. Returns the number of rows removed."""
+        session = self.session_factory()
+        try:
+            removed = session.execute(
+                text("DELETE FROM idempotency_keys WHERE expires_at < NOW()")
+            ).rowcount
+            session.commit()
+            return removed
+        finally:
+            session.close()
+
+
+def build_idempotency_store():
+    """Create the store selected by IDEMPOTENCY_STORE ('memory' or 'postgres')."""
+    if settings.idempotency_store == "postgres":
+        # A request is not reclaimed while one of its write statements may still run
+        statement_seconds = math.ceil(settings.write_statement_timeout_ms / 1000)
+        return PostgresIdempotencyStore(
+            ttl_seconds=settings.idempotency_ttl_seconds,
+            lease_seconds=max(60, statement_seconds + LEASE_MARGIN_SECONDS),
+        )
+    return MemoryIdempotencyStore(
+        max_entries=settings.idempotency_max_entries,
+        ttl_seconds=settings.idempotency_ttl_seconds,
+    )
+
+
+def _error(status_code: int, description: str, code_minor: str) -> JSONResponse:
+    return JSONResponse(
+        status_code=status_code,
+        content={
+            "imsx_codeMajor": "failure",
+            "imsx_severity": "error",
+            "imsx_description": description,
+            "imsx_codeMinor": code_minor,
+        },
+    )
+
+
+class IdempotencyMiddleware:
+    """
+    ASGI middleware applying Idempotency-Key semantics to write requests.
+
+    - First request with a key: executed; the response is stored.
+    - Retry with the same key and request: stored response replayed with
+      ``Idempotent-Replayed: true``.
+    - Same key, different request: 422.
+    - Same key while the first request is still running: 409.
+    - First request outliving its lease, after a retry took the key over:
+      its response is not stored and is answered with 409 instead.
+
+    Keys are scoped to the OAuth client, so clients cannot collide.
+    Requests without a valid bearer token pass through untouched.
+    """
+
+    def __init__(self, app: ASGIApp, store=None):
+        self.app = app
+        self.store = store if store is not None else build_idempotency_store()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in IDEMPOTENT_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        key = headers.get("idempotency-key")
+        client_id = _client_id(headers)
+        if not key or client_id is None:
+            await self.app(scope, receive, send)
+            return
+        if len(key) > MAX_KEY_LENGTH:
+            await _error(400, "Idempotency-Key is too long", "invalid_data")(scope, receive, send)
+            return
+
+        body = await _read_body(receive)
+        fingerprint = hashlib.sha256(
+            b"\n".join(
+                [scope["method"].encode(), scope["path"].encode(), scope["query_string"], body]
+            )
+        ).hexdigest()
+
+        state, claimed = await run_in_threadpool(self.store.claim, client_id, key, fingerprint)
+        if state == REPLAY:
+            replay = Response(content=claimed["body"], status_code=claimed["status_code"])
+            replay.raw_headers = [
+                (name.encode("latin-1"), value.encode("latin-1"))
+                for name, value in claimed["headers"]
+            ] + [(b"idempotent-replayed", b"true")]
+            await replay(scope, receive, send)
+            return
+        if state == MISMATCH:
+            await _error(
+                422, "Idempotency-Key was already used for a different request", "invalid_data"
+            )(scope, receive, send)
+            return
+        if state == IN_PROGRESS:
+            await _error(
+                409, "A request with this Idempotency-Key is still in progress", "conflict"
+            )(scope, receive, send)
+            return
+
+        await self._execute(scope, body, send, client_id, key, fingerprint, claimed)
+
+    async def _execute(
+        self,
+        scope: Scope,
+        body: bytes,
+        send: Send,
+        client_id: str,
+        key: str,
+        fingerprint: str,
+        lease: Any,
+    ) -> None:
+        sent_body = False
+
+        async def replay_body() -> Message:
+            nonlocal sent_body
+            if sent_body:
+                return {"type": "http.disconnect"}
+            sent_body = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        start: Optional[Message] = None
+        chunks: List[bytes] = []
+        # Held back until the response is stored, so a lost lease can be answered instead
+        messages: List[Message] = []
+
+        async def capture(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            messages.append(message)
+
+        response: Optional[StoredResponse] = None
+        try:
+            await self.app(scope, replay_body, capture)
+            if start is not None and start["status"] < 500:
+                if start["status"] not in UNSTORED_STATUS_CODES:
+                    response = {
+                        "fingerprint": fingerprint,
+                        "status_code": start["status"],
+                        "headers": [
+                            (name.decode("latin-1"), value.decode("latin-1"))
+                            for name, value in start.get("headers", [])
+                        ],
+                        "body": b"".join(chunks),
+                    }
+        finally:
+            completed = await run_in_threadpool(
+                self.store.complete, client_id, key, response, lease
+            )
+
+        if response is not None and not completed:
+            await _error(
+                409,
+                "The request ran, but outlived its Idempotency-Key lease and a retry "
+                "took the key over; its response was not stored",
+                "conflict",
+            )(scope, replay_body, send)
+            return
+        for message in messages:
+            await send(message)
+
+
+def _client_id(headers: Headers) -> Optional[str]:
+    authorization = headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    token_data = verify_token(token)
+    return token_data["client_id"] if token_data else None
+
+
+async def _read_body(receive: Receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            return b"".join(chunks)
@@ -1,5 +1,23 @@
 """Models package."""
 
-from src.models.models import Category, LineItem, Result, ScoreStatusEnum, StatusEnum
+from src.models.models import (
+    Category,
+    LineItem,
+    LineItemAggregate,
+    Result,
+    ScoreScale,
+    ScoreStatusEnum,
+    StatusEnum,
+    StudentCategoryAggregate,
+)
 
-__all__ = ["Category", "LineItem", "Result", "StatusEnum", "ScoreStatusEnum"]
+__all__ = [
+    "Category",
+    "LineItem",
+    "Result",
+    "ScoreScale",
+    "StatusEnum",
+    "ScoreStatusEnum",
+    "LineItemAggregate",
+    "StudentCategoryAggregate",
+]
@@ -8,18 +8,31 @@ from datetime import datetime
 from sqlalchemy import (
     CheckConstraint,
     Column,
+    Computed,
     DateTime,
     Enum,
     Float,
     ForeignKey,
     Index,
+    Integer,
+    Numeric,
     String,
     Text,
+    UniqueConstraint,
+    text,
 )
-from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 
 from src.config.database import Base
+from src.config.settings import settings
+
+# Predicate of the partial indexes serving API reads (mirrors schema.sql)
+ACTIVE_ROWS = text("status = 'active'")
+
+# Relationships are loaded explicitly (include=, see src/utils/include.py);
+# in production a lazy load raises instead of running one query per row
+RELATIONSHIP_LAZY = "raise" if settings.environment == "production" else "select"
 
 
 class StatusEnum(str, enum.Enum):
@@ -64,12 +77,26 @@ class Category(Base):
     metadata_ = Column("metadata", JSONB)  # Use metadata_ as attribute name
 
     # Relationships
-    line_items = relationship("LineItem", back_populates="category")
+    line_items = relationship("LineItem", back_populates="category", lazy=RELATIONSHIP_LAZY)
 
     # Indexes
     __table_args__ = (
         Index("idx_categories_status", "status"),
-        Index("idx_categories_date_last_modified", "date_last_modified"),
+        Index("idx_categories_modified", "date_last_modified", "sourced_id"),
+        Index(
+            "idx_categories_active_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+            postgresql_where=ACTIVE_ROWS,
+        ),
+        Index(
+            "idx_categories_active_metadata",
+            "metadata",
+            postgresql_using="gin",
+            postgresql_ops={"metadata": "jsonb_path_ops"},
+            postgresql_where=ACTIVE_ROWS,
+        ),
     )
 
     def to_oneroster_dict(self) -> dict:
@@ -107,24 +134,72 @@ class LineItem(Base):
     assign_date = Column(DateTime)
     due_date = Column(DateTime)
     class_sourced_id = Column(String(255), nullable=False)
+    academic_session_sourced_id = Column(String(255))
     category_sourced_id = Column(String(255), ForeignKey("categories.sourced_id"))
     result_value_min = Column(Float, nullable=False, default=0.0)
     result_value_max = Column(Float, nullable=False, default=100.0)
     metadata_ = Column("metadata", JSONB)  # Use metadata_ as attribute name
+    # Generated by the database; only read in search predicates and ranking
+    search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed(
+                "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+                "setweight(to_tsvector('english', coalesce(description, '')), 'B')",
+                persisted=True,
+            ),
+        )
+    )
 
     # Relationships
-    category = relationship("Category", back_populates="line_items")
-    results = relationship("Result", back_populates="line_item")
+    category = relationship("Category", back_populates="line_items", lazy=RELATIONSHIP_LAZY)
+    results = relationship("Result", back_populates="line_item", lazy=RELATIONSHIP_LAZY)
 
     # Indexes
     __table_args__ = (
-        Index("idx_line_items_class", "class_sourced_id"),
+        Index(
+            "idx_line_items_active_class",
+            "class_sourced_id",
+            "due_date",
+            "sourced_id",
+            postgresql_where=ACTIVE_ROWS,
+        ),
+        Index(
+            "idx_line_items_active_due_date",
+            "due_date",
+            "sourced_id",
+            postgresql_where=ACTIVE_ROWS,
+        ),
+        Index("idx_line_items_academic_session", "academic_session_sourced_id"),
         Index("idx_line_items_category", "category_sourced_id"),
-        Index("idx_line_items_status", "status"),
-        Index("idx_line_items_date_last_modified", "date_last_modified"),
-        Index("idx_line_items_due_date", "due_date"),
-        Index("idx_line_items_class_status", "class_sourced_id", "status"),
-        Index("idx_line_items_category_status", "category_sourced_id", "status"),
+        Index("idx_line_items_modified", "date_last_modified", "sourced_id"),
+        Index(
+            "idx_line_items_active_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+            postgresql_where=ACTIVE_ROWS,
+        ),
+        Index(
+            "idx_line_items_active_description_trgm",
+            "description",
+            postgresql_using="gin",
+            postgresql_ops={"description": "gin_trgm_ops"},
+            postgresql_where=ACTIVE_ROWS,
+        ),
+        Index(
+            "idx_line_items_active_search",
+            "search_vector",
+            postgresql_using="gin",
+            postgresql_where=ACTIVE_ROWS,
+        ),
+        Index(
+            "idx_line_items_active_metadata",
+            "metadata",
+            postgresql_using="gin",
+            postgresql_ops={"metadata": "jsonb_path_ops"},
+            postgresql_where=ACTIVE_ROWS,
+        ),
         CheckConstraint("result_value_max > result_value_min", name="check_value_range"),
     )
 
@@ -152,6 +227,13 @@ class LineItem(Base):
             result["assignDate"] = self.assign_date.isoformat() + "Z"
         if self.due_date:
             result["dueDate"] = self.due_date.isoformat() + "Z"
+        if self.academic_session_sourced_id:
+            result["academicSession"] = {
+                "href": f"{settings.rostering_service_base_url}/academicSessions/"
+                f"{self.academic_session_sourced_id}",
+                "sourcedId": self.academic_session_sourced_id,
+                "type": "academicSession",
+            }
         if self.category_sourced_id:
             result["category"] = {
                 "href": f"{settings.api_base_url}/ims/oneroster/v1p2/categories/{self.category_sourced_id}",
@@ -180,6 +262,10 @@ class Result(Base):
     date_last_modified = Column(DateTime, nullable=False, default=datetime.utcnow)
     line_item_sourced_id = Column(String(255), ForeignKey("line_items.sourced_id"), nullable=False)
     student_sourced_id = Column(String(255), nullable=False)
+    # Copied from the line item by the set_results_line_item_columns trigger;
+    # the session is the partition key of a partitioned results table
+    class_sourced_id = Column(String(255))
+    academic_session_sourced_id = Column(String(255), nullable=False, server_default="")
     score_status = Column(
         Enum(ScoreStatusEnum, name="score_status_enum"),
         nullable=False,
@@ -188,21 +274,65 @@ class Result(Base):
     score_date = Column(DateTime)
     comment = Column(Text)
     metadata_ = Column("metadata", JSONB)  # Use metadata_ as attribute name
+    # Generated by the database; only read in search predicates and ranking
+    search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed("to_tsvector('english', coalesce(comment, ''))", persisted=True),
+        )
+    )
 
     # Relationships
-    line_item = relationship("LineItem", back_populates="results")
+    line_item = relationship("LineItem", back_populates="results", lazy=RELATIONSHIP_LAZY)
 
     # Indexes
     __table_args__ = (
+        UniqueConstraint(
+            "line_item_sourced_id", "student_sourced_id", name="uk_result_student_lineitem"
+        ),
         Index(
-            "idx_results_lineitem_student",
+            "idx_results_active_line_item",
             "line_item_sourced_id",
+            "sourced_id",
+            postgresql_include=["score_status", "score"],
+            postgresql_where=ACTIVE_ROWS,
+        ),
+        Index(
+            "idx_results_active_student",
             "student_sourced_id",
-            unique=True,
+            "sourced_id",
+            postgresql_include=["line_item_sourced_id", "score_status", "score"],
+            postgresql_where=ACTIVE_ROWS,
         ),
-        Index("idx_results_student", "student_sourced_id"),
+        Index(
+            "idx_results_active_class",
+            "class_sourced_id",
+            "sourced_id",
+            postgresql_where=ACTIVE_ROWS,
+        ),
+        Index("idx_results_modified", "date_last_modified", "sourced_id"),
+        Index("idx_results_score_date", "score_date"),
         Index("idx_results_score_status", "score_status"),
-        Index("idx_results_date_last_modified", "date_last_modified"),
+        Index(
+            "idx_results_active_comment_trgm",
+            "comment",
+            postgresql_using="gin",
+            postgresql_ops={"comment": "gin_trgm_ops"},
+            postgresql_where=ACTIVE_ROWS,
+        ),
+        Index(
+            "idx_results_active_search",
+            "search_vector",
+            postgresql_using="gin",
+            postgresql_where=ACTIVE_ROWS,
+        ),
+        Index(
+            "idx_results_active_metadata",
+            "metadata",
+            postgresql_using="gin",
+            postgresql_ops={"metadata": "jsonb_path_ops"},
+            postgresql_where=ACTIVE_ROWS,
+        ),
     )
 
     def to_oneroster_dict(self) -> dict:
@@ -226,6 +356,13 @@ class Result(Base):
             "scoreStatus": self.score_status.value,
         }
 
+        if self.class_sourced_id:
+            result["class"] = {
+                "href": f"{settings.rostering_service_base_url}/classes/{self.class_sourced_id}",
+                "sourcedId": self.class_sourced_id,
+                "type": "class",
+            }
+
         if self.score is not None:
             result["score"] = float(self.score)
         if self.score_date:
@@ -236,3 +373,122 @@ class Result(Base):
             result["metadata"] = self.metadata_
 
         return result
+
+
+class ScoreScale(Base):
+    """
+    ScoreScale model - OneRoster Gradebook Score Scale.
+    Maps numeric scores to labels (e.g. letter grades) via a list of bands.
+    """
+
+    __tablename__ = "score_scales"
+
+    sourced_id = Column(String(255), primary_key=True)
+    status = Column(
+        Enum(StatusEnum, name="status_enum"),
+        nullable=False,
+        default=StatusEnum.active,
+    )
+    date_last_modified = Column(DateTime, nullable=False, default=datetime.utcnow)
+    title = Column(String(255), nullable=False)
+    type = Column(String(100))
+    course_sourced_id = Column(String(255))
+    class_sourced_id = Column(String(255))
+    score_scale_value = Column(JSONB, nullable=False)  # [{"label", "min", "max"}, ...]
+    metadata_ = Column("metadata", JSONB)  # Use metadata_ as attribute name
+
+    # Indexes
+    __table_args__ = (
+        Index("idx_score_scales_status", "status"),
+        Index("idx_score_scales_class", "class_sourced_id"),
+        Index("idx_score_scales_course", "course_sourced_id"),
+        Index("idx_score_scales_modified", "date_last_modified", "sourced_id"),
+    )
+
+    def to_oneroster_dict(self) -> dict:
+        """Convert to OneRoster format."""
+        from src.config.settings import settings
+
+        result = {
+            "sourcedId": self.sourced_id,
+            "status": self.status.value,
+            "dateLastModified": self.date_last_modified.isoformat() + "Z",
+            "title": self.title,
+            "scoreScaleValue": self.score_scale_value,
+        }
+
+        if self.type:
+            result["type"] = self.type
+        if self.course_sourced_id:
+            result["course"] = {
+                "href": f"{settings.rostering_service_base_url}/courses/{self.course_sourced_id}",
+                "sourcedId": self.course_sourced_id,
+                "type": "course",
+            }
+        if self.class_sourced_id:
+            result["class"] = {
+                "href": f"{settings.rostering_service_base_url}/classes/{self.class_sourced_id}",
+                "sourcedId": self.class_sourced_id,
+                "type": "class",
+            }
+        if self.metadata_:
+            result["metadata"] = self.metadata_
+        return result
+
+
+class AggregateMixin:
+    """
+    Running score aggregate columns shared by the aggregate tables.
+    Rows are maintained by database triggers on results (see schema.sql).
+    """
+
+    score_count = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Numeric, nullable=False, default=0)
+    score_sum_squares = Column(Numeric, nullable=False, default=0)
+    score_min = Column(Numeric(10, 2))
+    score_max = Column(Numeric(10, 2))
+    date_last_modified = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    def to_dict(self) -> dict:
+        """Convert to statistics dict (mean and population variance derived)."""
+        count = self.score_count or 0
+        result = {"count": count, "sum": float(self.score_sum or 0)}
+        if count:
+            mean = self.score_sum / count
+            variance = max(self.score_sum_squares / count - mean * mean, 0)
+            result.update(
+                {
+                    "mean": float(mean),
+                    "variance": float(variance),
+                    "stdDev": float(variance.sqrt()),
+                    "min": float(self.score_min),
+                    "max": float(self.score_max),
+                }
+            )
+        return result
+
+
+class LineItemAggregate(AggregateMixin, Base):
+    """Score aggregate for a single line item."""
+
+    __tablename__ = "line_item_aggregates"
+
+    line_item_sourced_id = Column(String(255), primary_key=True)
+
+
+class StudentCategoryAggregate(AggregateMixin, Base):
+    """
+    Score aggregate for a student within a category.
+    Uncategorized line items aggregate under category_sourced_id = ''.
+    """
+
+    __tablename__ = "student_category_aggregates"
+
+    student_sourced_id = Column(String(255), primary_key=True)
+    category_sourced_id = Column(String(255), primary_key=True, default="")
+
+    def to_dict(self) -> dict:
+        """Convert to statistics dict including the category reference."""
+        result = super().to_dict()
+        result["categorySourcedId"] = self.category_sourced_id or None
+        return result
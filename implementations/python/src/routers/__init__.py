@@ -1,5 +1,5 @@
 """Routers package."""
 
-from src.routers import categories, line_items, results
+from src.routers import categories, line_items, results, score_scales, students
 
-__all__ = ["categories", "line_items", "results"]
+__all__ = ["categories", "line_items", "results", "score_scales", "students"]
@@ -5,18 +5,24 @@ Implements OneRoster Gradebook Categories endpoints.
 
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from src.config.database import get_db
+from src.config.database import get_collection_db, get_read_db, get_write_db
 from src.middleware.auth import require_scope
 from src.schemas.schemas import (
     CategoryCreate,
     CategoryResponse,
     CategoryUpdate,
     CollectionResponse,
+    as_full_representation,
+    check_partial_update,
 )
-from src.services.category_service import CategoryService
+from src.services.category_service import UPDATABLE_FIELDS, CategoryService
+from src.services.collection_cache import cached_collection, collection_key
+from src.utils.delta_sync import changes_response
+from src.utils.etag import etag_matches, if_match_version, make_etag, not_modified, write_failed
 
 router = APIRouter()
 
@@ -29,7 +35,9 @@ SCOPE_DELETE = "https://purl.imsglobal.org/spec/or/v1p2/scope/results.delete"
 @router.get("/{sourced_id}", response_model=CategoryResponse)
 async def get_category(
     sourced_id: str,
-    db: Session = Depends(get_db),
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_read_db),
     client: dict = Depends(require_scope(SCOPE_READONLY)),
 ):
     """
@@ -38,15 +46,21 @@ async def get_category(
     **Required Scope**: `roster-core.readonly`
     """
     service = CategoryService(db)
-    category = service.get_by_id(sourced_id)
+    cached = service.get_cached(sourced_id)
 
-    if not category:
+    if not cached:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Category with sourcedId '{sourced_id}' not found",
         )
 
-    return category.to_oneroster_dict()
+    data, modified = cached
+    etag = make_etag(modified)
+    if if_none_match and etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    response.headers["ETag"] = etag
+    return data
 
 
 @router.get("", response_model=CollectionResponse)
@@ -56,7 +70,12 @@ async def get_categories(
     filter_param: Optional[str] = Query(None, alias="filter", description="Filter expression"),
     sort: Optional[str] = Query(None, description="Sort expression"),
     fields: Optional[str] = Query(None, description="Fields to include"),
-    db: Session = Depends(get_db),
+    changed_since: Optional[str] = Query(
+        None, alias="changedSince", description="Delta sync: rows modified since this time"
+    ),
+    cursor: Optional[str] = Query(None, description="Delta sync: nextCursor of a previous page"),
+    accept_encoding: Optional[str] = Header(None),
+    db: Session = Depends(get_collection_db),
     client: dict = Depends(require_scope(SCOPE_READONLY)),
 ):
     """
@@ -70,29 +89,38 @@ async def get_categories(
     - `filter`: Filter expression (e.g., `title='Math'`)
     - `sort`: Sort expression (e.g., `title`, `-dateLastModified`)
     - `fields`: Comma-separated list of fields to include
+    - `changedSince`: Delta sync mode - stream rows (tombstones included) modified
+      since this ISO 8601 time, ordered by (dateLastModified, sourcedId)
+    - `cursor`: Delta sync mode - resume from the `nextCursor` of a previous page
     """
     service = CategoryService(db)
 
-    categories, total = service.get_all(
-        limit=limit,
-        offset=offset,
-        filter_expr=filter_param,
-        sort_expr=sort,
-        fields=fields,
-    )
+    if changed_since or cursor:
+        return changes_response(service, changed_since, cursor, limit, filter_param)
+
+    def build(session: Session) -> dict:
+        categories, total = CategoryService(session).get_all(
+            limit=limit,
+            offset=offset,
+            filter_expr=filter_param,
+            sort_expr=sort,
+            fields=fields,
+        )
+        return {
+            "data": [cat.to_oneroster_dict() for cat in categories],
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+        }
 
-    return {
-        "data": [cat.to_oneroster_dict() for cat in categories],
-        "total": total,
-        "limit": limit,
-        "offset": offset,
-    }
+    key = collection_key("categories", client, limit, offset, filter_param, sort, fields)
+    return await cached_collection(db, key, ("categories",), build, accept_encoding)
 
 
 @router.post("", response_model=CategoryResponse, status_code=status.HTTP_201_CREATED)
 async def create_category(
     category: CategoryCreate,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     client: dict = Depends(require_scope(SCOPE_CREATEPUT)),
 ):
     """
@@ -119,30 +147,58 @@ async def create_category(
 async def update_category(
     sourced_id: str,
     category_update: CategoryUpdate,
-    db: Session = Depends(get_db),
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: Session = Depends(get_write_db),
     client: dict = Depends(require_scope(SCOPE_CREATEPUT)),
 ):
     """
-    Update an existing category.
+    Create or replace a category, or update some of its fields.
+
+    A body that is a complete category is written with one INSERT ... ON
+    CONFLICT: 201 if the category was created, 200 if it was replaced. A
+    partial body updates an existing category (404 if it does not exist).
+
+    With If-Match, the body is applied only to the category version named by
+    the ETag (412 if it has been modified since), never creating it.
 
     **Required Scope**: `roster-core.readonly`
     """
     service = CategoryService(db)
-    category = service.update(sourced_id, category_update.model_dump(exclude_unset=True))
+    data = category_update.model_dump(by_alias=True, exclude_unset=True)
+
+    full = as_full_representation(CategoryCreate, sourced_id, data)
+    if full is not None and if_match is None:
+        try:
+            category, created = service.upsert(sourced_id, full.model_dump(by_alias=True))
+        except IntegrityError as exc:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Category '{sourced_id}' conflicts with existing data",
+            ) from exc
+        if created:
+            response.status_code = status.HTTP_201_CREATED
+        response.headers["ETag"] = make_etag(category.date_last_modified)
+        return category.to_oneroster_dict()
+
+    check_partial_update(data, UPDATABLE_FIELDS)
+
+    expected = if_match_version(if_match) if if_match is not None else None
+    category = service.update(sourced_id, data, expected_modified=expected)
 
     if not category:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Category with sourcedId '{sourced_id}' not found",
-        )
+        raise write_failed(service, sourced_id, "Category", if_match)
 
+    response.headers["ETag"] = make_etag(category.date_last_modified)
     return category.to_oneroster_dict()
 
 
 @router.delete("/{sourced_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_category(
     sourced_id: str,
-    db: Session = Depends(get_db),
+    if_match: Optional[str] = Header(None),
+    db: Session = Depends(get_write_db),
     client: dict = Depends(require_scope(SCOPE_DELETE)),
 ):
     """
@@ -151,12 +207,10 @@ async def delete_category(
     **Required Scope**: `roster-core.readonly`
     """
     service = CategoryService(db)
-    success = service.delete(sourced_id)
+    expected = if_match_version(if_match) if if_match is not None else None
+    success = service.delete(sourced_id, expected_modified=expected)
 
     if not success:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Category with sourcedId '{sourced_id}' not found",
-        )
+        raise write_failed(service, sourced_id, "Category", if_match)
 
     return None
@@ -5,18 +5,33 @@ Implements OneRoster Gradebook Line Items endpoints.
 
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from src.config.database import get_db
+from src.config.database import get_collection_db, get_read_db, get_write_db
 from src.middleware.auth import require_scope
+from src.models.models import LineItem
 from src.schemas.schemas import (
     CollectionResponse,
     LineItemCreate,
     LineItemResponse,
     LineItemUpdate,
+    as_full_representation,
+    check_partial_update,
+)
+from src.services.aggregate_service import AggregateService
+from src.services.collection_cache import cached_collection, collection_key
+from src.services.line_item_service import UPDATABLE_FIELDS, LineItemService
+from src.services.statistics_service import StatisticsService
+from src.utils.delta_sync import changes_response
+from src.utils.etag import etag_matches, if_match_version, make_etag, not_modified, write_failed
+from src.utils.include import (
+    collect_included,
+    include_limit,
+    included_entities,
+    parse_include,
 )
-from src.services.line_item_service import LineItemService
 
 router = APIRouter()
 
@@ -24,25 +39,78 @@ router = APIRouter()
 SCOPE_READONLY = "https://purl.imsglobal.org/spec/or/v1p2/scope/roster-core.readonly"
 SCOPE_CREATEPUT = "https://purl.imsglobal.org/spec/or/v1p2/scope/results.createput"
 SCOPE_DELETE = "https://purl.imsglobal.org/spec/or/v1p2/scope/results.delete"
+SCOPE_RESULTS_READONLY = "https://purl.imsglobal.org/spec/or/v1p2/scope/results.readonly"
 
 
 @router.get("/{sourced_id}", response_model=LineItemResponse)
 async def get_line_item(
     sourced_id: str,
-    db: Session = Depends(get_db),
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_read_db),
     client: dict = Depends(require_scope(SCOPE_READONLY)),
 ):
     """Get a single line item by sourcedId."""
     service = LineItemService(db)
-    line_item = service.get_by_id(sourced_id)
+    cached = service.get_cached(sourced_id)
+
+    if not cached:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"LineItem with sourcedId '{sourced_id}' not found",
+        )
+
+    data, modified = cached
+    etag = make_etag(modified)
+    if if_none_match and etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    response.headers["ETag"] = etag
+    return data
+
+
+@router.get("/{sourced_id}/aggregate")
+async def get_line_item_aggregate(
+    sourced_id: str,
+    db: Session = Depends(get_read_db),
+    client: dict = Depends(require_scope(SCOPE_RESULTS_READONLY)),
+):
+    """Get the running score aggregate (count, sum, mean, min, max) for a line item."""
+    aggregate = AggregateService(db).get_line_item_aggregate(sourced_id)
+    if aggregate:
+        return {"lineItemSourcedId": sourced_id, **aggregate.to_dict()}
 
+    if not LineItemService(db).get_by_id(sourced_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"LineItem with sourcedId '{sourced_id}' not found",
+        )
+
+    return {"lineItemSourcedId": sourced_id, "count": 0, "sum": 0.0}
+
+
+@router.get("/{sourced_id}/statistics")
+async def get_line_item_statistics(
+    sourced_id: str,
+    buckets: int = Query(10, ge=1, le=100, description="Number of histogram buckets"),
+    db: Session = Depends(get_collection_db),
+    client: dict = Depends(require_scope(SCOPE_RESULTS_READONLY)),
+):
+    """
+    Get the score distribution for a line item: mean, median, percentiles,
+    histogram between resultValueMin and resultValueMax, and counts by scoreStatus.
+    """
+    version = StatisticsService.version()
+    line_item = LineItemService(db).get_by_id(sourced_id)
     if not line_item:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"LineItem with sourcedId '{sourced_id}' not found",
         )
 
-    return line_item.to_oneroster_dict()
+    return StatisticsService(db).get_line_item_statistics(
+        line_item, buckets=buckets, version=version
+    )
 
 
 @router.get("", response_model=CollectionResponse)
@@ -52,37 +120,85 @@ async def get_line_items(
     filter_param: Optional[str] = Query(None, alias="filter"),
     sort: Optional[str] = Query(None),
     fields: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    search: Optional[str] = Query(
+        None, description="Full-text search over titles and descriptions, best matches first"
+    ),
+    changed_since: Optional[str] = Query(
+        None, alias="changedSince", description="Delta sync: rows modified since this time"
+    ),
+    cursor: Optional[str] = Query(None, description="Delta sync: nextCursor of a previous page"),
+    include: Optional[str] = Query(
+        None, description="Related resources to return with the page: category, results"
+    ),
+    accept_encoding: Optional[str] = Header(None),
+    db: Session = Depends(get_collection_db),
     client: dict = Depends(require_scope(SCOPE_READONLY)),
 ):
     """Get collection of line items with pagination and filtering."""
     service = LineItemService(db)
 
-    line_items, total = service.get_all(
-        limit=limit,
-        offset=offset,
-        filter_expr=filter_param,
-        sort_expr=sort,
-        fields=fields,
-    )
+    if changed_since or cursor:
+        return changes_response(service, changed_since, cursor, limit, filter_param)
+
+    includes = parse_include(include, LineItem)
+    if "results" in includes and SCOPE_RESULTS_READONLY not in client.get("scope", "").split():
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Insufficient scope to include results. Required: {SCOPE_RESULTS_READONLY}",
+        )
+    limit = include_limit(LineItem, includes, limit)
+
+    def build(session: Session) -> dict:
+        line_items, total = LineItemService(session).get_all(
+            limit=limit,
+            offset=offset,
+            filter_expr=filter_param,
+            sort_expr=sort,
+            fields=fields,
+            search=search,
+            include=includes,
+        )
+        body = {
+            "data": [item.to_oneroster_dict() for item in line_items],
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+        }
+        if includes:
+            body["included"] = collect_included(line_items, includes)
+        return body
 
-    return {
-        "data": [item.to_oneroster_dict() for item in line_items],
-        "total": total,
-        "limit": limit,
-        "offset": offset,
-    }
+    key = collection_key(
+        "lineItems",
+        client,
+        limit,
+        offset,
+        filter_param,
+        sort,
+        fields,
+        search=search,
+        include=",".join(includes) or None,
+    )
+    entities = ("lineItems",) + included_entities(LineItem, includes)
+    return await cached_collection(db, key, entities, build, accept_encoding)
 
 
 @router.post("", response_model=LineItemResponse, status_code=status.HTTP_201_CREATED)
 async def create_line_item(
     line_item_create: LineItemCreate,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     client: dict = Depends(require_scope(SCOPE_CREATEPUT)),
 ):
     """Create a new line item."""
     service = LineItemService(db)
-    line_item = service.create(line_item_create.model_dump(by_alias=True))
+    try:
+        line_item = service.create(line_item_create.model_dump(by_alias=True))
+    except IntegrityError as exc:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"LineItem '{line_item_create.sourced_id}' conflicts with existing data",
+        ) from exc
     return line_item.to_oneroster_dict()
 
 
@@ -90,36 +206,77 @@ async def create_line_item(
 async def update_line_item(
     sourced_id: str,
     line_item_update: LineItemUpdate,
-    db: Session = Depends(get_db),
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: Session = Depends(get_write_db),
     client: dict = Depends(require_scope(SCOPE_CREATEPUT)),
 ):
-    """Update an existing line item."""
+    """
+    Create or replace a line item, or update some of its fields.
+
+    A body that is a complete line item is written with one INSERT ... ON
+    CONFLICT: 201 if the line item was created, 200 if it was replaced. A
+    partial body updates an existing line item (404 if it does not exist).
+
+    With If-Match, the body is applied only to the line item version named by
+    the ETag (412 if it has been modified since), never creating it.
+    """
     service = LineItemService(db)
-    line_item = service.update(sourced_id, line_item_update.model_dump(exclude_unset=True))
+    data = line_item_update.model_dump(by_alias=True, exclude_unset=True)
 
-    if not line_item:
+    full = as_full_representation(LineItemCreate, sourced_id, data)
+    if full is not None and if_match is None:
+        try:
+            line_item, created = service.upsert(sourced_id, full.model_dump(by_alias=True))
+        except IntegrityError as exc:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"LineItem '{sourced_id}' conflicts with existing data",
+            ) from exc
+        if created:
+            response.status_code = status.HTTP_201_CREATED
+        response.headers["ETag"] = make_etag(line_item.date_last_modified)
+        return line_item.to_oneroster_dict()
+
+    check_partial_update(data, UPDATABLE_FIELDS)
+
+    # One bound alone is checked against the stored other
+    if line_item_update.model_fields_set & {"result_value_min", "result_value_max"}:
+        stored = service.get_by_id(sourced_id)
+        if stored is not None:
+            line_item_update.check_value_range(stored.result_value_min, stored.result_value_max)
+
+    expected = if_match_version(if_match) if if_match is not None else None
+    try:
+        line_item = service.update(sourced_id, data, expected_modified=expected)
+    except IntegrityError as exc:
+        db.rollback()
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"LineItem with sourcedId '{sourced_id}' not found",
-        )
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"LineItem '{sourced_id}' conflicts with existing data",
+        ) from exc
 
+    if not line_item:
+        raise write_failed(service, sourced_id, "LineItem", if_match)
+
+    response.headers["ETag"] = make_etag(line_item.date_last_modified)
     return line_item.to_oneroster_dict()
 
 
 @router.delete("/{sourced_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_line_item(
     sourced_id: str,
-    db: Session = Depends(get_db),
+    if_match: Optional[str] = Header(None),
+    db: Session = Depends(get_write_db),
     client: dict = Depends(require_scope(SCOPE_DELETE)),
 ):
     """Delete (soft delete) a line item."""
     service = LineItemService(db)
-    success = service.delete(sourced_id)
+    expected = if_match_version(if_match) if if_match is not None else None
+    success = service.delete(sourced_id, expected_modified=expected)
 
     if not success:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"LineItem with sourcedId '{sourced_id}' not found",
-        )
+        raise write_failed(service, sourced_id, "LineItem", if_match)
 
     return None
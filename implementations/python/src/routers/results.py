@@ -5,13 +5,31 @@ Implements OneRoster Gradebook Results endpoints.
 
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from src.config.database import get_db
+from src.config.database import get_collection_db, get_read_db, get_write_db
+from src.config.settings import settings
 from src.middleware.auth import require_scope
-from src.schemas.schemas import CollectionResponse, ResultCreate, ResultResponse, ResultUpdate
-from src.services.result_service import ResultService
+from src.models.models import Result
+from src.schemas.schemas import (
+    BatchGetRequest,
+    BatchGetResponse,
+    CollectionResponse,
+    ResultCreate,
+    ResultResponse,
+    ResultUpdate,
+    as_full_representation,
+    check_partial_update,
+)
+from src.services.collection_cache import cached_collection, collection_key
+from src.services.result_service import UPDATABLE_FIELDS, ResultService
+from src.services.score_scale_service import ScoreScaleService
+from src.services.write_coalescer import result_write_coalescer
+from src.utils.delta_sync import changes_response
+from src.utils.etag import etag_matches, if_match_version, make_etag, not_modified, write_failed
+from src.utils.include import collect_included, included_entities, parse_include
 
 router = APIRouter()
 
@@ -19,25 +37,34 @@ router = APIRouter()
 SCOPE_READONLY = "https://purl.imsglobal.org/spec/or/v1p2/scope/results.readonly"
 SCOPE_CREATEPUT = "https://purl.imsglobal.org/spec/or/v1p2/scope/results.createput"
 SCOPE_DELETE = "https://purl.imsglobal.org/spec/or/v1p2/scope/results.delete"
+SCOPE_LINE_ITEMS_READONLY = "https://purl.imsglobal.org/spec/or/v1p2/scope/roster-core.readonly"
 
 
 @router.get("/{sourced_id}", response_model=ResultResponse)
 async def get_result(
     sourced_id: str,
-    db: Session = Depends(get_db),
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_read_db),
     client: dict = Depends(require_scope(SCOPE_READONLY)),
 ):
     """Get a single result by sourcedId."""
     service = ResultService(db)
-    result = service.get_by_id(sourced_id)
+    cached = service.get_cached(sourced_id)
 
-    if not result:
+    if not cached:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Result with sourcedId '{sourced_id}' not found",
         )
 
-    return result.to_oneroster_dict()
+    data, modified = cached
+    etag = make_etag(modified)
+    if if_none_match and etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    response.headers["ETag"] = etag
+    return data
 
 
 @router.get("", response_model=CollectionResponse)
@@ -47,37 +74,137 @@ async def get_results(
     filter_param: Optional[str] = Query(None, alias="filter"),
     sort: Optional[str] = Query(None),
     fields: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    search: Optional[str] = Query(
+        None, description="Full-text search over comments, best matches first"
+    ),
+    score_scale: Optional[str] = Query(
+        None, alias="scoreScale", description="ScoreScale sourcedId used to add textScore labels"
+    ),
+    changed_since: Optional[str] = Query(
+        None, alias="changedSince", description="Delta sync: rows modified since this time"
+    ),
+    cursor: Optional[str] = Query(None, description="Delta sync: nextCursor of a previous page"),
+    include: Optional[str] = Query(
+        None, description="Related resources to return with the page: lineItem"
+    ),
+    accept_encoding: Optional[str] = Header(None),
+    db: Session = Depends(get_collection_db),
     client: dict = Depends(require_scope(SCOPE_READONLY)),
 ):
     """Get collection of results with pagination and filtering."""
     service = ResultService(db)
 
-    results, total = service.get_all(
-        limit=limit,
-        offset=offset,
-        filter_expr=filter_param,
-        sort_expr=sort,
-        fields=fields,
+    if changed_since or cursor:
+        return changes_response(service, changed_since, cursor, limit, filter_param)
+
+    includes = parse_include(include, Result)
+    if includes and SCOPE_LINE_ITEMS_READONLY not in client.get("scope", "").split():
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Insufficient scope to include line items. "
+            f"Required: {SCOPE_LINE_ITEMS_READONLY}",
+        )
+
+    def build(session: Session) -> dict:
+        compiled_scale = None
+        if score_scale:
+            compiled_scale = ScoreScaleService(session).get_compiled(score_scale)
+            if not compiled_scale:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"ScoreScale with sourcedId '{score_scale}' not found",
+                )
+
+        results, total = ResultService(session).get_all(
+            limit=limit,
+            offset=offset,
+            filter_expr=filter_param,
+            sort_expr=sort,
+            fields=fields,
+            search=search,
+            include=includes,
+        )
+
+        data = [res.to_oneroster_dict() for res in results]
+        if compiled_scale:
+            label_for = compiled_scale.label_for
+            for item in data:
+                label = label_for(item.get("score"))
+                if label is not None:
+                    item["textScore"] = label
+
+        body = {
+            "data": data,
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+        }
+        if includes:
+            body["included"] = collect_included(results, includes)
+        return body
+
+    key = collection_key(
+        "results",
+        client,
+        limit,
+        offset,
+        filter_param,
+        sort,
+        fields,
+        scoreScale=score_scale,
+        search=search,
+        include=",".join(includes) or None,
     )
+    entities = ("results", "scoreScales") if score_scale else ("results",)
+    entities += included_entities(Result, includes)
+    return await cached_collection(db, key, entities, build, accept_encoding)
 
+
+@router.post("/batchGet", response_model=BatchGetResponse)
+async def batch_get_results(
+    batch: BatchGetRequest,
+    db: Session = Depends(get_collection_db),
+    client: dict = Depends(require_scope(SCOPE_READONLY)),
+):
+    """
+    Get up to FILTER_IN_MAX_VALUES results by sourcedId in one request.
+
+    The results are read with a single sourced_id = ANY(:ids) query and
+    returned in request order; ids with no active result are listed in
+    notFound.
+    """
+    if len(batch.sourced_ids) > settings.filter_in_max_values:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.filter_in_max_values} sourcedIds per batchGet",
+        )
+
+    ids = list(dict.fromkeys(batch.sourced_ids))
+    found = {result.sourced_id: result for result in ResultService(db).get_many(ids)}
     return {
-        "data": [res.to_oneroster_dict() for res in results],
-        "total": total,
-        "limit": limit,
-        "offset": offset,
+        "data": [
+            found[sourced_id].to_oneroster_dict() for sourced_id in ids if sourced_id in found
+        ],
+        "notFound": [sourced_id for sourced_id in ids if sourced_id not in found],
     }
 
 
 @router.post("", response_model=ResultResponse, status_code=status.HTTP_201_CREATED)
 async def create_result(
     result_create: ResultCreate,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     client: dict = Depends(require_scope(SCOPE_CREATEPUT)),
 ):
     """Create a new result."""
     service = ResultService(db)
-    result = service.create(result_create.model_dump(by_alias=True))
+    try:
+        result = service.create(result_create.model_dump(by_alias=True))
+    except IntegrityError as exc:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Result '{result_create.sourced_id}' conflicts with existing data",
+        ) from exc
     return result.to_oneroster_dict()
 
 
@@ -85,36 +212,84 @@ async def create_result(
 async def update_result(
     sourced_id: str,
     result_update: ResultUpdate,
-    db: Session = Depends(get_db),
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: Session = Depends(get_write_db),
     client: dict = Depends(require_scope(SCOPE_CREATEPUT)),
 ):
-    """Update an existing result."""
+    """
+    Create or replace a result, or update some of its fields.
+
+    A body that is a complete result is written with one INSERT ... ON
+    CONFLICT: 201 if the result was created, 200 if it was replaced. A
+    partial body updates an existing result (404 if it does not exist),
+    possibly moving it to another line item or student (409 if that one
+    already has a result); fields it cannot change, such as status, are 400.
+
+    With If-Match, the body is applied only to the result version named by
+    the ETag (412 if it has been modified since), never creating it.
+
+    With RESULT_WRITE_COALESCING_ENABLED, complete bodies are batched with
+    other concurrent PUTs into one transaction; the response is sent once
+    that transaction commits.
+    """
     service = ResultService(db)
-    result = service.update(sourced_id, result_update.model_dump(exclude_unset=True))
+    data = result_update.model_dump(by_alias=True, exclude_unset=True)
 
-    if not result:
+    full = as_full_representation(ResultCreate, sourced_id, data)
+    if full is not None and if_match is None:
+        try:
+            if settings.result_write_coalescing_enabled:
+                body, created, etag = await result_write_coalescer.upsert(
+                    sourced_id, full.model_dump(by_alias=True)
+                )
+                response.headers["ETag"] = etag
+            else:
+                result, created = service.upsert(sourced_id, full.model_dump(by_alias=True))
+                body = result.to_oneroster_dict()
+                response.headers["ETag"] = make_etag(result.date_last_modified)
+        except IntegrityError as exc:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Result '{sourced_id}' conflicts with existing data",
+            ) from exc
+        if created:
+            response.status_code = status.HTTP_201_CREATED
+        return body
+
+    check_partial_update(data, UPDATABLE_FIELDS)
+
+    expected = if_match_version(if_match) if if_match is not None else None
+    try:
+        result = service.update(sourced_id, data, expected_modified=expected)
+    except IntegrityError as exc:
+        db.rollback()
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Result with sourcedId '{sourced_id}' not found",
-        )
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Result '{sourced_id}' conflicts with existing data",
+        ) from exc
+
+    if not result:
+        raise write_failed(service, sourced_id, "Result", if_match)
 
+    response.headers["ETag"] = make_etag(result.date_last_modified)
     return result.to_oneroster_dict()
 
 
 @router.delete("/{sourced_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_result(
     sourced_id: str,
-    db: Session = Depends(get_db),
+    if_match: Optional[str] = Header(None),
+    db: Session = Depends(get_write_db),
     client: dict = Depends(require_scope(SCOPE_DELETE)),
 ):
     """Delete (soft delete) a result."""
     service = ResultService(db)
-    success = service.delete(sourced_id)
+    expected = if_match_version(if_match) if if_match is not None else None
+    success = service.delete(sourced_id, expected_modified=expected)
 
     if not success:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Result with sourcedId '{sourced_id}' not found",
-        )
+        raise write_failed(service, sourced_id, "Result", if_match)
 
     return None
@@ -0,0 +1,168 @@
+"""
+ScoreScales API Router
+Implements OneRoster Gradebook ScoreScales endpoints.
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from src.config.database import get_collection_db, get_read_db, get_write_db
+from src.middleware.auth import require_scope
+from src.schemas.schemas import (
+    CollectionResponse,
+    ScoreScaleCreate,
+    ScoreScaleResponse,
+    ScoreScaleUpdate,
+    as_full_representation,
+    check_partial_update,
+)
+from src.services.score_scale_service import UPDATABLE_FIELDS, ScoreScaleService
+from src.utils.delta_sync import changes_response
+
+router = APIRouter()
+
+# OneRoster scopes
+SCOPE_READONLY = "https://purl.imsglobal.org/spec/or/v1p2/scope/roster-core.readonly"
+SCOPE_CREATEPUT = "https://purl.imsglobal.org/spec/or/v1p2/scope/results.createput"
+SCOPE_DELETE = "https://purl.imsglobal.org/spec/or/v1p2/scope/results.delete"
+
+
+@router.get("/{sourced_id}", response_model=ScoreScaleResponse)
+async def get_score_scale(
+    sourced_id: str,
+    db: Session = Depends(get_read_db),
+    client: dict = Depends(require_scope(SCOPE_READONLY)),
+):
+    """Get a single score scale by sourcedId."""
+    service = ScoreScaleService(db)
+    score_scale = service.get_by_id(sourced_id)
+
+    if not score_scale:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"ScoreScale with sourcedId '{sourced_id}' not found",
+        )
+
+    return score_scale.to_oneroster_dict()
+
+
+@router.get("", response_model=CollectionResponse)
+async def get_score_scales(
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    filter_param: Optional[str] = Query(None, alias="filter"),
+    sort: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None),
+    changed_since: Optional[str] = Query(
+        None, alias="changedSince", description="Delta sync: rows modified since this time"
+    ),
+    cursor: Optional[str] = Query(None, description="Delta sync: nextCursor of a previous page"),
+    db: Session = Depends(get_collection_db),
+    client: dict = Depends(require_scope(SCOPE_READONLY)),
+):
+    """Get collection of score scales with pagination and filtering."""
+    service = ScoreScaleService(db)
+
+    if changed_since or cursor:
+        return changes_response(service, changed_since, cursor, limit, filter_param)
+
+    score_scales, total = service.get_all(
+        limit=limit,
+        offset=offset,
+        filter_expr=filter_param,
+        sort_expr=sort,
+        fields=fields,
+    )
+
+    return {
+        "data": [scale.to_oneroster_dict() for scale in score_scales],
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+    }
+
+
+@router.post("", response_model=ScoreScaleResponse, status_code=status.HTTP_201_CREATED)
+async def create_score_scale(
+    score_scale_create: ScoreScaleCreate,
+    db: Session = Depends(get_write_db),
+    client: dict = Depends(require_scope(SCOPE_CREATEPUT)),
+):
+    """Create a new score scale."""
+    service = ScoreScaleService(db)
+
+    if service.get_by_id(score_scale_create.sourced_id):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"ScoreScale with sourcedId '{score_scale_create.sourced_id}' already exists",
+        )
+
+    score_scale = service.create(score_scale_create.model_dump(by_alias=True))
+    return score_scale.to_oneroster_dict()
+
+
+@router.put("/{sourced_id}", response_model=ScoreScaleResponse)
+async def update_score_scale(
+    sourced_id: str,
+    score_scale_update: ScoreScaleUpdate,
+    response: Response,
+    db: Session = Depends(get_write_db),
+    client: dict = Depends(require_scope(SCOPE_CREATEPUT)),
+):
+    """
+    Create or replace a score scale, or update some of its fields.
+
+    A body that is a complete score scale is written with one INSERT ... ON
+    CONFLICT: 201 if the score scale was created, 200 if it was replaced. A
+    partial body updates an existing score scale (404 if it does not exist).
+    """
+    service = ScoreScaleService(db)
+    data = score_scale_update.model_dump(by_alias=True, exclude_unset=True)
+
+    full = as_full_representation(ScoreScaleCreate, sourced_id, data)
+    if full is not None:
+        try:
+            score_scale, created = service.upsert(sourced_id, full.model_dump(by_alias=True))
+        except IntegrityError as exc:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"ScoreScale '{sourced_id}' conflicts with existing data",
+            ) from exc
+        if created:
+            response.status_code = status.HTTP_201_CREATED
+        return score_scale.to_oneroster_dict()
+
+    check_partial_update(data, UPDATABLE_FIELDS)
+
+    score_scale = service.update(sourced_id, data)
+
+    if not score_scale:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"ScoreScale with sourcedId '{sourced_id}' not found",
+        )
+
+    return score_scale.to_oneroster_dict()
+
+
+@router.delete("/{sourced_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_score_scale(
+    sourced_id: str,
+    db: Session = Depends(get_write_db),
+    client: dict = Depends(require_scope(SCOPE_DELETE)),
+):
+    """Delete (soft delete) a score scale."""
+    service = ScoreScaleService(db)
+    success = service.delete(sourced_id)
+
+    if not success:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"ScoreScale with sourcedId '{sourced_id}' not found",
+        )
+
+    return None
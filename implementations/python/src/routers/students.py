@@ -0,0 +1,32 @@
+"""
+Students API Router
+Implements student-scoped Gradebook endpoints.
+"""
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from src.config.database import get_read_db
+from src.middleware.auth import require_scope
+from src.services.aggregate_service import AggregateService
+
+router = APIRouter()
+
+# OneRoster scopes
+SCOPE_READONLY = "https://purl.imsglobal.org/spec/or/v1p2/scope/results.readonly"
+
+
+@router.get("/{student_sourced_id}/aggregates")
+async def get_student_aggregates(
+    student_sourced_id: str,
+    db: Session = Depends(get_read_db),
+    client: dict = Depends(require_scope(SCOPE_READONLY)),
+):
+    """Get the running per-category score aggregates for a student."""
+    service = AggregateService(db)
+    aggregates = service.get_student_aggregates(student_sourced_id)
+
+    return {
+        "studentSourcedId": student_sourced_id,
+        "categories": [aggregate.to_dict() for aggregate in aggregates],
+    }
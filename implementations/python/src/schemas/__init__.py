@@ -12,6 +12,11 @@ from src.schemas.schemas import (
     ResultCreate,
     ResultResponse,
     ResultUpdate,
+    ScoreScaleBand,
+    ScoreScaleCreate,
+    ScoreScaleResponse,
+    ScoreScaleUpdate,
+    as_full_representation,
 )
 
 __all__ = [
@@ -24,6 +29,11 @@ __all__ = [
     "ResultCreate",
     "ResultUpdate",
     "ResultResponse",
+    "ScoreScaleBand",
+    "ScoreScaleCreate",
+    "ScoreScaleUpdate",
+    "ScoreScaleResponse",
     "CollectionResponse",
     "ErrorResponse",
+    "as_full_representation",
 ]
@@ -3,11 +3,89 @@ Pydantic schemas for API request/response validation.
 """
 
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional, Type, TypeVar
 
-from pydantic import BaseModel, Field, field_validator
+from fastapi import HTTPException, status
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, Field, ValidationError, field_validator
 
 from src.models.models import ScoreStatusEnum, StatusEnum
+from src.utils.score_scale import compile_score_scale
+
+CreateSchema = TypeVar("CreateSchema", bound=BaseModel)
+
+
+def as_full_representation(
+    create_schema: Type[CreateSchema], sourced_id: str, data: Dict[str, Any]
+) -> Optional[CreateSchema]:
+    """
+    Validate a PUT body as a complete resource representation.
+
+    Only a body that carries sourcedId is a complete representation (and
+    replaces the resource); any other body is a partial update, whatever
+    fields it happens to contain.
+
+    Args:
+        create_schema: Create schema the body must satisfy
+        sourced_id: sourcedId from the request path
+        data: PUT body dumped by alias
+
+    Returns:
+        The validated create schema, or None if the body is a partial update
+
+    Raises:
+        RequestValidationError: If the body carries sourcedId but is not a
+            complete resource, or its sourcedId differs from the path (422)
+    """
+    if "sourcedId" not in data:
+        return None
+    if data["sourcedId"] != sourced_id:
+        raise RequestValidationError(
+            [
+                {
+                    "type": "value_error",
+                    "loc": ("body", "sourcedId"),
+                    "msg": "sourcedId does not match the request path",
+                    "input": data["sourcedId"],
+                }
+            ]
+        )
+    try:
+        return create_schema.model_validate(data)
+    except ValidationError as exc:
+        raise RequestValidationError(
+            [
+                {**error, "loc": ("body", *error["loc"])}
+                for error in exc.errors(include_url=False, include_context=False)
+            ]
+        ) from exc
+
+
+def check_partial_update(data: Dict[str, Any], updatable: Iterable[str]) -> None:
+    """
+    Reject a partial PUT body naming fields the update cannot change.
+
+    A partial update only writes the service's updatable fields; anything
+    else (such as status, which only DELETE changes) would otherwise be
+    silently ignored while the request succeeds.
+
+    Args:
+        data: Partial PUT body dumped by alias
+        updatable: OneRoster names of the fields the update writes
+
+    Raises:
+        HTTPException: If the body names any other field (400)
+    """
+    unsupported = sorted(set(data) - set(updatable))
+    if unsupported:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                f"Fields {', '.join(unsupported)} cannot be changed by a partial update; "
+                "send the complete resource with sourcedId to replace it"
+            ),
+        )
+
 
 # ==================== Category Schemas ====================
 
@@ -29,6 +107,8 @@ class CategoryCreate(CategoryBase):
 class CategoryUpdate(BaseModel):
     """Schema for updating a category."""
 
+    # Only in a complete representation, which replaces the resource
+    sourced_id: Optional[str] = Field(None, min_length=1, max_length=255, alias="sourcedId")
     title: Optional[str] = Field(None, min_length=1, max_length=255)
     weight: Optional[float] = Field(None, ge=0.0, le=1.0)
     status: Optional[StatusEnum] = None
@@ -59,6 +139,9 @@ class LineItemBase(BaseModel):
     assign_date: Optional[datetime] = Field(None, alias="assignDate")
     due_date: Optional[datetime] = Field(None, alias="dueDate")
     class_sourced_id: str = Field(..., min_length=1, max_length=255, alias="classSourcedId")
+    academic_session_sourced_id: Optional[str] = Field(
+        None, min_length=1, max_length=255, alias="academicSessionSourcedId"
+    )
     category_sourced_id: Optional[str] = Field(
         None, min_length=1, max_length=255, alias="categorySourcedId"
     )
@@ -84,16 +167,60 @@ class LineItemCreate(LineItemBase):
 class LineItemUpdate(BaseModel):
     """Schema for updating a line item."""
 
+    # Only in a complete representation, which replaces the resource
+    sourced_id: Optional[str] = Field(None, min_length=1, max_length=255, alias="sourcedId")
     title: Optional[str] = Field(None, min_length=1, max_length=255)
     description: Optional[str] = None
     assign_date: Optional[datetime] = Field(None, alias="assignDate")
     due_date: Optional[datetime] = Field(None, alias="dueDate")
+    class_sourced_id: Optional[str] = Field(
+        None, min_length=1, max_length=255, alias="classSourcedId"
+    )
+    academic_session_sourced_id: Optional[str] = Field(
+        None, min_length=1, max_length=255, alias="academicSessionSourcedId"
+    )
     category_sourced_id: Optional[str] = Field(None, alias="categorySourcedId")
     result_value_min: Optional[float] = Field(None, alias="resultValueMin")
     result_value_max: Optional[float] = Field(None, alias="resultValueMax")
     status: Optional[StatusEnum] = None
     metadata: Optional[Dict[str, Any]] = None
 
+    @field_validator("result_value_max")
+    @classmethod
+    def validate_value_range(cls, v: Optional[float], info) -> Optional[float]:
+        """Validate that max > min when both are given."""
+        low = info.data.get("result_value_min")
+        if v is not None and low is not None and v <= low:
+            raise ValueError("result_value_max must be greater than result_value_min")
+        return v
+
+    def check_value_range(self, stored_min: Optional[float], stored_max: Optional[float]) -> None:
+        """
+        Validate the value range a partial update leaves on a stored line item.
+
+        Args:
+            stored_min: Current resultValueMin, used unless the update sets it
+            stored_max: Current resultValueMax, used unless the update sets it
+
+        Raises:
+            RequestValidationError: If resultValueMax would not exceed
+                resultValueMin (422)
+        """
+        fields = self.model_fields_set
+        low = self.result_value_min if "result_value_min" in fields else stored_min
+        high = self.result_value_max if "result_value_max" in fields else stored_max
+        if low is not None and high is not None and high <= low:
+            raise RequestValidationError(
+                [
+                    {
+                        "type": "value_error",
+                        "loc": ("body", "resultValueMax"),
+                        "msg": "resultValueMax must be greater than resultValueMin",
+                        "input": high,
+                    }
+                ]
+            )
+
 
 class LineItemResponse(BaseModel):
     """Schema for line item response (OneRoster format)."""
@@ -106,6 +233,7 @@ class LineItemResponse(BaseModel):
     assign_date: Optional[str] = Field(None, alias="assignDate")
     due_date: Optional[str] = Field(None, alias="dueDate")
     class_ref: Dict[str, str] = Field(..., alias="class")
+    academic_session: Optional[Dict[str, str]] = Field(None, alias="academicSession")
     category: Optional[Dict[str, str]] = None
     result_value_min: float = Field(..., alias="resultValueMin")
     result_value_max: float = Field(..., alias="resultValueMax")
@@ -156,6 +284,14 @@ class ResultCreate(ResultBase):
 class ResultUpdate(BaseModel):
     """Schema for updating a result."""
 
+    # Only in a complete representation, which replaces the resource
+    sourced_id: Optional[str] = Field(None, min_length=1, max_length=255, alias="sourcedId")
+    line_item_sourced_id: Optional[str] = Field(
+        None, min_length=1, max_length=255, alias="lineItemSourcedId"
+    )
+    student_sourced_id: Optional[str] = Field(
+        None, min_length=1, max_length=255, alias="studentSourcedId"
+    )
     score_status: Optional[ScoreStatusEnum] = Field(None, alias="scoreStatus")
     score: Optional[float] = None
     score_date: Optional[datetime] = Field(None, alias="scoreDate")
@@ -172,6 +308,7 @@ class ResultResponse(BaseModel):
     date_last_modified: str = Field(..., alias="dateLastModified")
     line_item: Dict[str, str] = Field(..., alias="lineItem")
     student: Dict[str, str]
+    class_ref: Optional[Dict[str, str]] = Field(None, alias="class")
     score_status: str = Field(..., alias="scoreStatus")
     score: Optional[float] = None
     score_date: Optional[str] = Field(None, alias="scoreDate")
@@ -181,6 +318,78 @@ class ResultResponse(BaseModel):
     model_config = {"populate_by_name": True}
 
 
+# ==================== ScoreScale Schemas ====================
+
+
+class ScoreScaleBand(BaseModel):
+    """A single band of a score scale (e.g. A: 90-100)."""
+
+    label: str = Field(..., min_length=1, max_length=255)
+    min: float
+    max: Optional[float] = None
+
+
+def _validate_bands(bands: Optional[List[ScoreScaleBand]]) -> Optional[List[ScoreScaleBand]]:
+    if bands is not None:
+        compile_score_scale("", [band.model_dump() for band in bands])
+    return bands
+
+
+class ScoreScaleCreate(BaseModel):
+    """Schema for creating a score scale."""
+
+    sourced_id: str = Field(..., min_length=1, max_length=255, alias="sourcedId")
+    title: str = Field(..., min_length=1, max_length=255)
+    type: Optional[str] = Field(None, max_length=100)
+    course_sourced_id: Optional[str] = Field(None, max_length=255, alias="courseSourcedId")
+    class_sourced_id: Optional[str] = Field(None, max_length=255, alias="classSourcedId")
+    score_scale_value: List[ScoreScaleBand] = Field(..., min_length=1, alias="scoreScaleValue")
+    metadata: Optional[Dict[str, Any]] = None
+
+    @field_validator("score_scale_value")
+    @classmethod
+    def validate_bands(cls, v: List[ScoreScaleBand]) -> List[ScoreScaleBand]:
+        """Validate that the bands compile into a scale."""
+        return _validate_bands(v)
+
+
+class ScoreScaleUpdate(BaseModel):
+    """Schema for updating a score scale."""
+
+    # Only in a complete representation, which replaces the resource
+    sourced_id: Optional[str] = Field(None, min_length=1, max_length=255, alias="sourcedId")
+    title: Optional[str] = Field(None, min_length=1, max_length=255)
+    type: Optional[str] = Field(None, max_length=100)
+    course_sourced_id: Optional[str] = Field(None, max_length=255, alias="courseSourcedId")
+    class_sourced_id: Optional[str] = Field(None, max_length=255, alias="classSourcedId")
+    score_scale_value: Optional[List[ScoreScaleBand]] = Field(
+        None, min_length=1, alias="scoreScaleValue"
+    )
+    metadata: Optional[Dict[str, Any]] = None
+
+    @field_validator("score_scale_value")
+    @classmethod
+    def validate_bands(cls, v: Optional[List[ScoreScaleBand]]) -> Optional[List[ScoreScaleBand]]:
+        """Validate that the bands compile into a scale."""
+        return _validate_bands(v)
+
+
+class ScoreScaleResponse(BaseModel):
+    """Schema for score scale response (OneRoster format)."""
+
+    sourced_id: str = Field(..., alias="sourcedId")
+    status: str
+    date_last_modified: str = Field(..., alias="dateLastModified")
+    title: str
+    type: Optional[str] = None
+    course: Optional[Dict[str, str]] = None
+    class_ref: Optional[Dict[str, str]] = Field(None, alias="class")
+    score_scale_value: List[Dict[str, Any]] = Field(..., alias="scoreScaleValue")
+    metadata: Optional[Dict[str, Any]] = None
+
+    model_config = {"populate_by_name": True}
+
+
 # ==================== Collection Response ====================
 
 
@@ -191,6 +400,27 @@ class CollectionResponse(BaseModel):
     total: int
     limit: int
     offset: int
+    included: Optional[Dict[str, list]] = None  # include=: related resources by name
+
+
+# ==================== Batch Get ====================
+
+
+class BatchGetRequest(BaseModel):
+    """Body of a batchGet: the sourcedIds to fetch."""
+
+    sourced_ids: List[str] = Field(..., min_length=1, alias="sourcedIds")
+
+    model_config = {"populate_by_name": True}
+
+
+class BatchGetResponse(BaseModel):
+    """Active resources found for a batchGet, in request order, and the ids that were not."""
+
+    data: list
+    not_found: List[str] = Field(..., alias="notFound")
+
+    model_config = {"populate_by_name": True}
 
 
 # ==================== Error Response ====================
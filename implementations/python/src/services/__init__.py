@@ -1,7 +1,23 @@
 """Services package."""
 
+from src.services.aggregate_service import AggregateService
 from src.services.category_service import CategoryService
+from src.services.change_listener import ChangeListener
+from src.services.compaction_service import CompactionService
 from src.services.line_item_service import LineItemService
 from src.services.result_service import ResultService
+from src.services.score_scale_service import ScoreScaleService
+from src.services.statistics_service import StatisticsService
+from src.services.write_coalescer import ResultWriteCoalescer
 
-__all__ = ["CategoryService", "LineItemService", "ResultService"]
+__all__ = [
+    "AggregateService",
+    "CategoryService",
+    "ChangeListener",
+    "CompactionService",
+    "LineItemService",
+    "ResultService",
+    "ResultWriteCoalescer",
+    "ScoreScaleService",
+    "StatisticsService",
+]
@@ -0,0 +1,46 @@
+"""
+Aggregate Service
+Reads the incrementally maintained score aggregates.
+"""
+
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from src.models.models import LineItemAggregate, StudentCategoryAggregate
+
+
+class AggregateService:
+    """Service class for result aggregate operations."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_line_item_aggregate(self, line_item_sourced_id: str) -> Optional[LineItemAggregate]:
+        """Get the running aggregate for a line item (None when it has no scores)."""
+        return self.db.get(LineItemAggregate, line_item_sourced_id)
+
+    def get_student_aggregates(self, student_sourced_id: str) -> List[StudentCategoryAggregate]:
+        """Get the running per-category aggregates for a student."""
+        return (
+            self.db.query(StudentCategoryAggregate)
+            .filter(StudentCategoryAggregate.student_sourced_id == student_sourced_id)
+            .order_by(StudentCategoryAggregate.category_sourced_id)
+            .all()
+        )
+
+    def rebuild(self) -> Dict[str, int]:
+        """
+        Rebuild all aggregates from the results table.
+        Used to repair drift; blocks result writes while it runs.
+
+        Returns:
+            Dict with the number of aggregate rows written per table
+        """
+        row = self.db.execute(text("SELECT * FROM rebuild_result_aggregates()")).one()
+        self.db.commit()
+        return {
+            "lineItemAggregates": row.line_item_rows,
+            "studentCategoryAggregates": row.student_category_rows,
+        }
@@ -3,12 +3,26 @@ Category Service
 Business logic for categories operations.
 """
 
-from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
+from sqlalchemy import insert, update
 from sqlalchemy.orm import Session
 
+from src.config.settings import settings
 from src.models.models import Category, StatusEnum
+from src.services.resource_cache import CachedResource, get_resource, invalidate_resource
+from src.utils.delta_sync import Watermark, apply_changes_window
+from src.utils.query_guard import guard_query
 from src.utils.query_parser import parse_filter, parse_sort
+from src.utils.upsert import build_upsert
+
+# Request fields a PUT may change, by OneRoster name
+UPDATABLE_FIELDS = {
+    "title": Category.title,
+    "weight": Category.weight,
+    "metadata": Category.metadata_,
+}
 
 
 class CategoryService:
@@ -25,6 +39,18 @@ class CategoryService:
             .first()
         )
 
+    def get_cached(self, sourced_id: str) -> Optional[CachedResource]:
+        """Get an active category as (OneRoster dict, dateLastModified), read through the cache."""
+        return get_resource("categories", sourced_id, lambda: self.get_by_id(sourced_id))
+
+    def get_version(self, sourced_id: str) -> Optional[datetime]:
+        """Get the dateLastModified of an active category (its ETag version) without loading it."""
+        return (
+            self.db.query(Category.date_last_modified)
+            .filter(Category.sourced_id == sourced_id, Category.status == StatusEnum.active)
+            .scalar()
+        )
+
     def get_all(
         self,
         limit: int = 100,
@@ -45,7 +71,14 @@ class CategoryService:
 
         Returns:
             Tuple of (list of categories, total count)
+
+        Raises:
+            InvalidFilterError, InvalidSortError: If the query guard rejects
+                a filter or sort no index serves
         """
+        # Reject (or downgrade) filters and sorts no index serves on large tables
+        sort_expr = guard_query(self.db, Category, filter_expr, sort_expr)
+
         query = self.db.query(Category).filter(Category.status == StatusEnum.active)
 
         # Apply filters
@@ -71,10 +104,35 @@ class CategoryService:
 
         return categories, total
 
-    def create(self, data: Dict[str, Any]) -> Category:
-        """Create a new category."""
+    def get_changes(
+        self,
+        watermark: Watermark,
+        limit: int = 100,
+        filter_expr: Optional[str] = None,
+    ) -> Iterator[Category]:
+        """
+        Get categories changed after a delta sync watermark.
+        Includes tombstones (status 'tobedeleted') and streams rows in
+        (dateLastModified, sourcedId) order.
+        """
+        query = self.db.query(Category)
+
+        # Apply filters
+        if filter_expr:
+            conditions = parse_filter(filter_expr, Category)
+            for condition in conditions:
+                query = query.filter(condition)
+
+        query = apply_changes_window(
+            query, Category, watermark, settings.delta_sync_safety_lag_seconds
+        )
+        return iter(query.limit(limit).yield_per(500))
+
+    @staticmethod
+    def _to_row(data: Dict[str, Any]) -> Dict[str, Any]:
+        """Map a OneRoster category body to column values for a new active row."""
         # Convert camelCase to snake_case for database
-        category_data = {
+        return {
             "sourced_id": data.get("sourcedId"),
             "status": StatusEnum.active,
             "title": data.get("title"),
@@ -82,39 +140,89 @@ class CategoryService:
             "metadata_": data.get("metadata"),
         }
 
-        category = Category(**category_data)
-        self.db.add(category)
+    def create(self, data: Dict[str, Any]) -> Category:
+        """Create a new category with a single INSERT ... RETURNING."""
+        category = self.db.scalars(insert(Category).returning(Category), [self._to_row(data)]).one()
         self.db.commit()
-        self.db.refresh(category)
+        invalidate_resource("categories", category.sourced_id)
         return category
 
-    def update(self, sourced_id: str, data: Dict[str, Any]) -> Optional[Category]:
-        """Update an existing category."""
-        category = self.get_by_id(sourced_id)
-        if not category:
-            return None
+    def update(
+        self,
+        sourced_id: str,
+        data: Dict[str, Any],
+        expected_modified: Optional[datetime] = None,
+    ) -> Optional[Category]:
+        """
+        Update an active category with a single UPDATE ... RETURNING.
 
-        # Update allowed fields
-        if "title" in data:
-            category.title = data["title"]
-        if "weight" in data:
-            category.weight = data["weight"]
-        if "metadata" in data:
-            category.metadata_ = data["metadata"]
+        Args:
+            sourced_id: Category sourcedId
+            data: Fields to change, keyed by OneRoster name
+            expected_modified: Only update if dateLastModified still equals
+                this value (If-Match)
 
+        Returns:
+            The updated category, or None if it is missing or was modified
+        """
+        values = {column: data[key] for key, column in UPDATABLE_FIELDS.items() if key in data}
+        if not values:
+            category = self.get_by_id(sourced_id)
+            if category is None or expected_modified is None:
+                return category
+            if category.date_last_modified != expected_modified:
+                return None
+            return category
+
+        category = self.db.scalars(
+            update(Category)
+            .where(*self._active_version(Category, sourced_id, expected_modified))
+            .values(values)
+            .returning(Category),
+            execution_options={"populate_existing": True},
+        ).first()
         self.db.commit()
-        self.db.refresh(category)
+        invalidate_resource("categories", sourced_id)
         return category
 
-    def delete(self, sourced_id: str) -> bool:
+    def upsert(self, sourced_id: str, data: Dict[str, Any]) -> Tuple[Category, bool]:
+        """
+        Create or replace a category (PUT) with a single INSERT ... ON CONFLICT.
+        Replacing a tombstoned category makes it active again.
+
+        Returns:
+            Tuple of (category, created)
+        """
+        row = self.db.execute(
+            build_upsert(Category, self._to_row({**data, "sourcedId": sourced_id})),
+            execution_options={"populate_existing": True},
+        ).one()
+        self.db.commit()
+        invalidate_resource("categories", sourced_id)
+        category, created = row
+        return category, created
+
+    def delete(self, sourced_id: str, expected_modified: Optional[datetime] = None) -> bool:
         """
         Soft delete a category.
         Sets status to 'tobedeleted' instead of physically deleting.
+        With expected_modified (If-Match), only deletes that version.
         """
-        category = self.get_by_id(sourced_id)
-        if not category:
-            return False
-
-        category.status = StatusEnum.tobedeleted
+        deleted = self.db.scalars(
+            update(Category)
+            .where(*self._active_version(Category, sourced_id, expected_modified))
+            .values(status=StatusEnum.tobedeleted)
+            .returning(Category.sourced_id)
+        ).first()
         self.db.commit()
-        return True
+        invalidate_resource("categories", sourced_id)
+        return deleted is not None
+
+    @staticmethod
+    def _active_version(
+        model: Any, sourced_id: str, expected_modified: Optional[datetime]
+    ) -> List[Any]:
+        conditions = [model.sourced_id == sourced_id, model.status == StatusEnum.active]
+        if expected_modified is not None:
+            conditions.append(model.date_last_modified == expected_modified)
+        return conditions
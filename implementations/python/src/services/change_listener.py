@@ -0,0 +1,133 @@
+"""
+Change Listener
+Applies row changes committed by any worker to this worker's caches.
+"""
+
+import json
+import logging
+import os
+import select
+import threading
+from typing import Optional
+
+import psycopg2
+
+from src.config.settings import settings
+from src.services.resource_cache import invalidate_all, invalidate_resource
+from src.services.score_scale_service import compiled_scale_cache
+from src.services.statistics_service import StatisticsService
+
+logger = logging.getLogger(__name__)
+
+# Channel the notify_entity_change() triggers publish on
+CHANNEL = "oneroster_changes"
+
+# Table name in notifications -> entity name used by the caches
+TABLE_ENTITIES = {
+    "categories": "categories",
+    "line_items": "lineItems",
+    "results": "results",
+    "score_scales": "scoreScales",
+}
+
+
+def apply_change(payload: str) -> None:
+    """
+    Invalidate everything cached from one changed row.
+
+    Args:
+        payload: JSON notification {"table", "sourcedId", "lineItemSourcedId"}
+    """
+    change = json.loads(payload)
+    table = change.get("table")
+    sourced_id = change.get("sourcedId")
+    entity = TABLE_ENTITIES.get(table)
+    if entity is None or sourced_id is None:
+        return
+
+    invalidate_resource(entity, sourced_id)
+    if table == "score_scales":
+        compiled_scale_cache.delete(sourced_id)
+    elif table == "line_items":
+        StatisticsService.invalidate(sourced_id)
+    elif table == "results" and change.get("lineItemSourcedId"):
+        StatisticsService.invalidate(change["lineItemSourcedId"])
+
+
+def _invalidate_everything() -> None:
+    invalidate_all()
+    StatisticsService.invalidate_all()
+    compiled_scale_cache.clear()
+
+
+class ChangeListener:
+    """
+    Per-worker thread that LISTENs for change notifications.
+
+    Uses its own connection outside the pool. Whenever it (re)connects,
+    changes may have been missed, so every local cache is dropped first.
+    """
+
+    def __init__(self, dsn: Optional[str] = None, reconnect_seconds: float = 5.0):
+        self.dsn = dsn or settings.get_database_url()
+        self.reconnect_seconds = reconnect_seconds
+        self.listening = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start listening in a daemon thread."""
+        self._stopped.clear()
+        # stop() writes to this pipe to wake the thread out of select()
+        self._wake_read, self._wake_write = os.pipe()
+        self._thread = threading.Thread(target=self._run, name="change-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the thread and close its connection."""
+        if self._thread is None:
+            return
+        self._stopped.set()
+        os.write(self._wake_write, b"x")
+        self._thread.join()
+        self._thread = None
+        os.close(self._wake_read)
+        os.close(self._wake_write)
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                self._listen()
+            except psycopg2.Error as exc:
+                logger.warning("Change listener disconnected: %s", exc)
+            self.listening.clear()
+            # Wait before reconnecting, unless stop() wakes us
+            select.select([self._wake_read], [], [], self.reconnect_seconds)
+
+    def _listen(self) -> None:
+        # Keepalives turn a silently dropped connection into an error
+        connection = psycopg2.connect(
+            self.dsn, keepalives=1, keepalives_idle=30, keepalives_interval=10, keepalives_count=3
+        )
+        try:
+            connection.autocommit = True
+            connection.cursor().execute(f"LISTEN {CHANNEL}")
+            _invalidate_everything()
+            self.listening.set()
+            while not self._stopped.is_set():
+                readable, _, _ = select.select([connection, self._wake_read], [], [])
+                if connection not in readable:
+                    continue
+                connection.poll()
+                while connection.notifies:
+                    notify = connection.notifies.pop(0)
+                    try:
+                        apply_change(notify.payload)
+                    except ValueError:
+                        logger.warning("Ignoring malformed change notification: %s", notify.payload)
+        finally:
+            connection.close()
+
+
+# Per-worker listener, started with the app when CACHE_INVALIDATION_LISTENER_ENABLED
+change_listener = ChangeListener()
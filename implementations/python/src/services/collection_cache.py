@@ -0,0 +1,115 @@
+"""
+Collection Cache
+Per-worker cache of encoded collection responses, keyed by normalized query.
+"""
+
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+from starlette.responses import Response
+
+from src.config.database import session_like
+from src.config.settings import settings
+from src.middleware.compression import EncodedBody
+from src.services.resource_cache import table_version
+from src.utils.cache import TTLCache
+from src.utils.query_parser import normalize_filter, normalize_sort
+from src.utils.singleflight import SingleFlight
+
+# Keyed by (query key, versions of the entities the response was built from);
+# values are EncodedBody, so compressed variants are reused across hits.
+# A write bumps its entity's version, so stale responses are never looked up
+# again and age out of the LRU.
+collection_cache = TTLCache(
+    max_entries=settings.collection_cache_max_entries,
+    ttl_seconds=settings.collection_cache_ttl_seconds,
+)
+
+# Concurrent misses for the same key share one query and encoding
+collection_flights = SingleFlight()
+
+
+def collection_key(
+    entity: str,
+    client: Dict[str, Any],
+    limit: int,
+    offset: int,
+    filter_expr: Optional[str] = None,
+    sort_expr: Optional[str] = None,
+    fields: Optional[str] = None,
+    **extra: Optional[str],
+) -> Hashable:
+    """
+    Build the cache key of a collection query.
+
+    Equivalent queries share a key: filter clauses are compared as parsed
+    and sorted, fields as a set. The client's scopes are part of the key
+    so a response is only shared between clients allowed the same data.
+
+    Args:
+        entity: Collection name, e.g. 'lineItems'
+        client: Authenticated client, as returned by require_scope
+        extra: Further query parameters that change the response
+    """
+    return (
+        entity,
+        tuple(sorted(client.get("scope", "").split())),
+        normalize_filter(filter_expr) if filter_expr else (),
+        normalize_sort(sort_expr) if sort_expr else (),
+        tuple(sorted({f.strip() for f in fields.split(",") if f.strip()})) if fields else (),
+        limit,
+        offset,
+        tuple(sorted(extra.items())),
+    )
+
+
+def encode(body: Dict[str, Any]) -> bytes:
+    """Encode a response body exactly as FastAPI would render it."""
+    return JSONResponse(content=jsonable_encoder(body)).body
+
+
+async def cached_collection(
+    db: Session,
+    key: Hashable,
+    entities: Sequence[str],
+    build: Callable[[Session], Dict[str, Any]],
+    accept_encoding: Optional[str] = None,
+) -> Response:
+    """
+    Serve a collection response from the cache, building and encoding it on a miss.
+
+    Concurrent misses for the same key and versions run build once, in the
+    threadpool, and share its encoded body (or its error). The shared build
+    runs on its own session like db, so it does not fail when the request
+    that started it goes away and its session is closed.
+
+    Args:
+        db: Session of the request, for its bind and statement timeout
+        key: collection_key() of the query
+        entities: Every entity the response is built from
+        build: Runs the query on the session given and returns the response body
+        accept_encoding: Accept-Encoding header of the request
+
+    Returns:
+        JSON response with the encoded body, compressed if negotiated
+    """
+    versions: Tuple[int, ...] = tuple(table_version(entity) for entity in entities)
+    body = collection_cache.get((key, versions))
+    if body is None:
+
+        def build_and_store() -> EncodedBody:
+            session = session_like(db)
+            try:
+                encoded = EncodedBody(encode(build(session)))
+            finally:
+                session.close()
+            # Skip the fill if a write landed while the query ran
+            unchanged = versions == tuple(table_version(entity) for entity in entities)
+            if unchanged and len(encoded) <= settings.collection_cache_max_body_bytes:
+                collection_cache.set((key, versions), encoded)
+            return encoded
+
+        body = await collection_flights.run((key, versions), build_and_store)
+    return body.response(accept_encoding, "application/json")
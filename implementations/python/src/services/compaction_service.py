@@ -0,0 +1,76 @@
+"""
+Compaction Service
+Moves old tombstones (status = tobedeleted) out of the hot tables.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from src.config.settings import settings
+
+# Dependents before parents: a line item is only archived once its results
+# are gone, and a category once no line item references it.
+COMPACTION_ORDER = ("results", "line_items", "categories", "score_scales")
+
+
+class CompactionService:
+    """Service class for tombstone compaction."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def compact(
+        self,
+        retention_days: Optional[int] = None,
+        batch_size: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Archive tombstones older than the retention window.
+
+        Each batch is moved and committed on its own so row locks are held
+        briefly and concurrent writers are skipped rather than waited on.
+
+        Args:
+            retention_days: Keep tombstones modified within this many days
+                (defaults to settings.tombstone_retention_days)
+            batch_size: Rows moved per transaction
+                (defaults to settings.compaction_batch_size)
+
+        Returns:
+            Report with the cutoff and rows archived per table
+        """
+        if retention_days is None:
+            retention_days = settings.tombstone_retention_days
+        if batch_size is None:
+            batch_size = settings.compaction_batch_size
+        if retention_days < 0 or batch_size < 1:
+            raise ValueError("retention_days must be >= 0 and batch_size >= 1")
+
+        cutoff: datetime = self.db.execute(
+            text("SELECT NOW() - make_interval(days => :days)"), {"days": retention_days}
+        ).scalar_one()
+
+        archived = {}
+        for table in COMPACTION_ORDER:
+            archived[table] = self._compact_table(table, cutoff, batch_size)
+
+        return {
+            "cutoff": cutoff.isoformat(),
+            "archived": archived,
+            "totalArchived": sum(archived.values()),
+        }
+
+    def _compact_table(self, table: str, cutoff: datetime, batch_size: int) -> int:
+        total = 0
+        while True:
+            moved = self.db.execute(
+                text("SELECT compact_tombstones_batch(:table, :cutoff, :batch_size)"),
+                {"table": table, "cutoff": cutoff, "batch_size": batch_size},
+            ).scalar_one()
+            self.db.commit()
+            total += moved
+            if moved < batch_size:
+                return total
@@ -3,12 +3,38 @@ Line Item Service
 Business logic for line items operations.
 """
 
-from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
+from sqlalchemy import insert, select, update
 from sqlalchemy.orm import Session
 
-from src.models.models import LineItem, StatusEnum
-from src.utils.query_parser import parse_filter, parse_sort
+from src.config.settings import settings
+from src.models.models import LineItem, Result, StatusEnum
+from src.services.resource_cache import CachedResource, get_resource, invalidate_resource
+from src.services.statistics_service import StatisticsService
+from src.utils.delta_sync import Watermark, apply_changes_window
+from src.utils.include import include_options
+from src.utils.query_guard import guard_query
+from src.utils.query_parser import parse_filter, parse_search, parse_sort
+from src.utils.upsert import build_upsert
+
+# Request fields a PUT may change, by OneRoster name
+UPDATABLE_FIELDS = {
+    "title": LineItem.title,
+    "description": LineItem.description,
+    "assignDate": LineItem.assign_date,
+    "dueDate": LineItem.due_date,
+    "classSourcedId": LineItem.class_sourced_id,
+    "academicSessionSourcedId": LineItem.academic_session_sourced_id,
+    "categorySourcedId": LineItem.category_sourced_id,
+    "resultValueMin": LineItem.result_value_min,
+    "resultValueMax": LineItem.result_value_max,
+    "metadata": LineItem.metadata_,
+}
+
+# Copied onto every result of the line item by the propagate_line_items_columns trigger
+PROPAGATED_FIELDS = ("classSourcedId", "academicSessionSourcedId")
 
 
 class LineItemService:
@@ -25,6 +51,18 @@ class LineItemService:
             .first()
         )
 
+    def get_cached(self, sourced_id: str) -> Optional[CachedResource]:
+        """Get an active line item as (OneRoster dict, dateLastModified), read through the cache."""
+        return get_resource("lineItems", sourced_id, lambda: self.get_by_id(sourced_id))
+
+    def get_version(self, sourced_id: str) -> Optional[datetime]:
+        """Get the dateLastModified of an active line item (its ETag version) without loading it."""
+        return (
+            self.db.query(LineItem.date_last_modified)
+            .filter(LineItem.sourced_id == sourced_id, LineItem.status == StatusEnum.active)
+            .scalar()
+        )
+
     def get_all(
         self,
         limit: int = 100,
@@ -32,6 +70,8 @@ class LineItemService:
         filter_expr: Optional[str] = None,
         sort_expr: Optional[str] = None,
         fields: Optional[str] = None,
+        search: Optional[str] = None,
+        include: Tuple[str, ...] = (),
     ) -> Tuple[List[LineItem], int]:
         """
         Get all line items with pagination, filtering, and sorting.
@@ -42,10 +82,20 @@ class LineItemService:
             filter_expr: OneRoster filter expression
             sort_expr: OneRoster sort expression
             fields: Comma-separated list of fields to return
+            search: Full-text search query; matches are ranked best first
+                unless sort_expr is given
+            include: Relationships to load with the page (parse_include)
 
         Returns:
             Tuple of (list of line items, total count)
+
+        Raises:
+            InvalidFilterError, InvalidSortError: If the query guard rejects
+                a filter or sort no index serves
         """
+        # Reject (or downgrade) filters and sorts no index serves on large tables
+        sort_expr = guard_query(self.db, LineItem, filter_expr, sort_expr)
+
         query = self.db.query(LineItem).filter(LineItem.status == StatusEnum.active)
 
         # Apply filters
@@ -54,6 +104,12 @@ class LineItemService:
             for condition in conditions:
                 query = query.filter(condition)
 
+        # Apply full-text search
+        rank = None
+        if search:
+            match, rank = parse_search(search, LineItem)
+            query = query.filter(match)
+
         # Get total count before pagination
         total = query.count()
 
@@ -62,19 +118,48 @@ class LineItemService:
             order_by_clauses = parse_sort(sort_expr, LineItem)
             for clause in order_by_clauses:
                 query = query.order_by(clause)
+        elif rank is not None:
+            # Best matches first
+            query = query.order_by(rank.desc(), LineItem.sourced_id)
         else:
             # Default sorting by sourcedId
             query = query.order_by(LineItem.sourced_id)
 
-        # Apply pagination
+        # Apply pagination; included relationships are loaded with the page
+        query = query.options(*include_options(LineItem, include))
         line_items = query.limit(limit).offset(offset).all()
 
         return line_items, total
 
-    def create(self, data: Dict[str, Any]) -> LineItem:
-        """Create a new line item."""
+    def get_changes(
+        self,
+        watermark: Watermark,
+        limit: int = 100,
+        filter_expr: Optional[str] = None,
+    ) -> Iterator[LineItem]:
+        """
+        Get line items changed after a delta sync watermark.
+        Includes tombstones (status 'tobedeleted') and streams rows in
+        (dateLastModified, sourcedId) order.
+        """
+        query = self.db.query(LineItem)
+
+        # Apply filters
+        if filter_expr:
+            conditions = parse_filter(filter_expr, LineItem)
+            for condition in conditions:
+                query = query.filter(condition)
+
+        query = apply_changes_window(
+            query, LineItem, watermark, settings.delta_sync_safety_lag_seconds
+        )
+        return iter(query.limit(limit).yield_per(500))
+
+    @staticmethod
+    def _to_row(data: Dict[str, Any]) -> Dict[str, Any]:
+        """Map a OneRoster line item body to column values for a new active row."""
         # Convert camelCase to snake_case for database
-        line_item_data = {
+        return {
             "sourced_id": data.get("sourcedId"),
             "status": StatusEnum.active,
             "title": data.get("title"),
@@ -82,55 +167,130 @@ class LineItemService:
             "assign_date": data.get("assignDate"),
             "due_date": data.get("dueDate"),
             "class_sourced_id": data.get("classSourcedId"),
+            "academic_session_sourced_id": data.get("academicSessionSourcedId"),
             "category_sourced_id": data.get("categorySourcedId"),
             "result_value_min": data.get("resultValueMin", 0),
             "result_value_max": data.get("resultValueMax", 100),
             "metadata_": data.get("metadata"),
         }
 
-        line_item = LineItem(**line_item_data)
-        self.db.add(line_item)
+    def create(self, data: Dict[str, Any]) -> LineItem:
+        """Create a new line item with a single INSERT ... RETURNING."""
+        line_item = self.db.scalars(
+            insert(LineItem).returning(LineItem), [self._to_row(data)]
+        ).one()
         self.db.commit()
-        self.db.refresh(line_item)
+        invalidate_resource("lineItems", line_item.sourced_id)
         return line_item
 
-    def update(self, sourced_id: str, data: Dict[str, Any]) -> Optional[LineItem]:
-        """Update an existing line item."""
-        line_item = self.get_by_id(sourced_id)
-        if not line_item:
-            return None
-
-        # Update allowed fields
-        if "title" in data:
-            line_item.title = data["title"]
-        if "description" in data:
-            line_item.description = data["description"]
-        if "assignDate" in data:
-            line_item.assign_date = data["assignDate"]
-        if "dueDate" in data:
-            line_item.due_date = data["dueDate"]
-        if "categorySourcedId" in data:
-            line_item.category_sourced_id = data["categorySourcedId"]
-        if "resultValueMin" in data:
-            line_item.result_value_min = data["resultValueMin"]
-        if "resultValueMax" in data:
-            line_item.result_value_max = data["resultValueMax"]
-        if "metadata" in data:
-            line_item.metadata_ = data["metadata"]
+    def update(
+        self,
+        sourced_id: str,
+        data: Dict[str, Any],
+        expected_modified: Optional[datetime] = None,
+    ) -> Optional[LineItem]:
+        """
+        Update an active line item with a single UPDATE ... RETURNING.
 
+        Args:
+            sourced_id: LineItem sourcedId
+            data: Fields to change, keyed by OneRoster name
+            expected_modified: Only update if dateLastModified still equals
+                this value (If-Match)
+
+        Returns:
+            The updated line item, or None if it is missing or was modified
+        """
+        values = {column: data[key] for key, column in UPDATABLE_FIELDS.items() if key in data}
+        if not values:
+            line_item = self.get_by_id(sourced_id)
+            if line_item is None or expected_modified is None:
+                return line_item
+            if line_item.date_last_modified != expected_modified:
+                return None
+            return line_item
+
+        placement = (
+            self._placement(sourced_id) if any(key in data for key in PROPAGATED_FIELDS) else None
+        )
+        line_item = self.db.scalars(
+            update(LineItem)
+            .where(*self._active_version(LineItem, sourced_id, expected_modified))
+            .values(values)
+            .returning(LineItem),
+            execution_options={"populate_existing": True},
+        ).first()
         self.db.commit()
-        self.db.refresh(line_item)
+        invalidate_resource("lineItems", sourced_id)
+        self._invalidate_moved_results(line_item, placement)
+        StatisticsService.invalidate(sourced_id)
         return line_item
 
-    def delete(self, sourced_id: str) -> bool:
+    def upsert(self, sourced_id: str, data: Dict[str, Any]) -> Tuple[LineItem, bool]:
+        """
+        Create or replace a line item (PUT) with a single INSERT ... ON CONFLICT.
+        Replacing a tombstoned line item makes it active again.
+
+        Returns:
+            Tuple of (line_item, created)
+        """
+        placement = self._placement(sourced_id)
+        row = self.db.execute(
+            build_upsert(LineItem, self._to_row({**data, "sourcedId": sourced_id})),
+            execution_options={"populate_existing": True},
+        ).one()
+        self.db.commit()
+        invalidate_resource("lineItems", sourced_id)
+        line_item, created = row
+        self._invalidate_moved_results(line_item, placement)
+        StatisticsService.invalidate(sourced_id)
+        return line_item, created
+
+    def delete(self, sourced_id: str, expected_modified: Optional[datetime] = None) -> bool:
         """
         Soft delete a line item.
         Sets status to 'tobedeleted' instead of physically deleting.
+        With expected_modified (If-Match), only deletes that version.
         """
-        line_item = self.get_by_id(sourced_id)
-        if not line_item:
-            return False
-
-        line_item.status = StatusEnum.tobedeleted
+        deleted = self.db.scalars(
+            update(LineItem)
+            .where(*self._active_version(LineItem, sourced_id, expected_modified))
+            .values(status=StatusEnum.tobedeleted)
+            .returning(LineItem.sourced_id)
+        ).first()
         self.db.commit()
-        return True
+        invalidate_resource("lineItems", sourced_id)
+        return deleted is not None
+
+    def _placement(self, sourced_id: str) -> Optional[Tuple[Optional[str], Optional[str]]]:
+        """Get the (class, academic session) of a line item before a write."""
+        row = self.db.execute(
+            select(LineItem.class_sourced_id, LineItem.academic_session_sourced_id).where(
+                LineItem.sourced_id == sourced_id
+            )
+        ).first()
+        return tuple(row) if row is not None else None
+
+    def _invalidate_moved_results(
+        self,
+        line_item: Optional[LineItem],
+        placement: Optional[Tuple[Optional[str], Optional[str]]],
+    ) -> None:
+        """Drop the cached results of a line item the write moved to another class or session."""
+        if line_item is None or placement is None:
+            return
+        if placement == (line_item.class_sourced_id, line_item.academic_session_sourced_id):
+            return
+        for result_sourced_id in self.db.scalars(
+            select(Result.sourced_id).where(Result.line_item_sourced_id == line_item.sourced_id)
+        ):
+            invalidate_resource("results", result_sourced_id)
+
+    @staticmethod
+    def _active_version(
+        model: Any, sourced_id: str, expected_modified: Optional[datetime]
+    ) -> List[Any]:
+        conditions = [model.sourced_id == sourced_id, model.status == StatusEnum.active]
+        if expected_modified is not None:
+            conditions.append(model.date_last_modified == expected_modified)
+        return conditions
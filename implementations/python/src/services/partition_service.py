@@ -0,0 +1,98 @@
+"""
+Partition Service
+Creates and detaches the academic session partitions of a partitioned
+results table (migrations/012_partition_results.sql).
+"""
+
+from typing import Any, Dict
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+
+class PartitionService:
+    """Service class for results partition maintenance."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _require_partitioned(self) -> None:
+        partitioned = self.db.execute(
+            text("SELECT relkind = 'p' FROM pg_class WHERE oid = 'results'::regclass")
+        ).scalar_one()
+        if not partitioned:
+            raise ValueError(
+                "results is not partitioned; apply migrations/012_partition_results.sql first"
+            )
+
+    def create_partitions(self) -> Dict[str, Any]:
+        """
+        Create a results partition for every academic session of a line item
+        that has none yet. Sessions whose partition was detached are skipped.
+
+        Results of the session already stored in the default partition are
+        moved into the new one. Each partition is created and committed on
+        its own.
+
+        Returns:
+            Report with the partitions created, by academic session sourcedId
+        """
+        self._require_partitioned()
+        sessions = self.db.scalars(
+            text(
+                """
+                SELECT DISTINCT li.academic_session_sourced_id FROM line_items li
+                WHERE li.academic_session_sourced_id <> ''
+                AND to_regclass(
+                    'results_' || substr(md5(li.academic_session_sourced_id), 1, 12)
+                ) IS NULL
+                ORDER BY 1
+                """
+            )
+        ).all()
+
+        created = {}
+        for session in sessions:
+            created[session] = self.db.execute(
+                text("SELECT create_result_partition(:session)"), {"session": session}
+            ).scalar_one()
+            self.db.commit()
+        return {"partitionsCreated": created}
+
+    def detach(self, academic_session_sourced_id: str) -> Dict[str, Any]:
+        """
+        Detach an academic session's partition from results.
+
+        The partition stays as a standalone table holding the session's
+        results; the API no longer serves them and the score aggregates no
+        longer count them.
+
+        Returns:
+            Report with the detached table name
+
+        Raises:
+            ValueError: If results is not partitioned or has no partition
+                for the session
+        """
+        self._require_partitioned()
+        exists = self.db.execute(
+            text(
+                """
+                SELECT 1 FROM pg_inherits
+                WHERE inhparent = 'results'::regclass
+                AND inhrelid = to_regclass('results_' || substr(md5(:session), 1, 12))
+                """
+            ),
+            {"session": academic_session_sourced_id},
+        ).first()
+        if exists is None:
+            raise ValueError(
+                f"results has no partition for academic session '{academic_session_sourced_id}'"
+            )
+
+        table = self.db.execute(
+            text("SELECT detach_result_partition(:session)"),
+            {"session": academic_session_sourced_id},
+        ).scalar_one()
+        self.db.commit()
+        return {"academicSession": academic_session_sourced_id, "detachedTable": table}
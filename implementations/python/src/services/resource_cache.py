@@ -0,0 +1,79 @@
+"""
+Resource Cache
+Per-worker read-through cache of single resources for GET /{sourcedId},
+plus per-entity version counters bumped by every invalidation.
+"""
+
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Callable, DefaultDict, Dict, Optional, Tuple
+
+from src.config.settings import settings
+from src.utils.cache import TTLCache
+
+# (OneRoster dict, dateLastModified) of an active resource
+CachedResource = Tuple[Dict[str, Any], datetime]
+
+# Keyed by (entity, sourcedId); only active resources are cached
+resource_cache = TTLCache(
+    max_entries=settings.resource_cache_max_entries,
+    ttl_seconds=settings.resource_cache_ttl_seconds,
+)
+
+# Bumped whenever a row of the entity is known to have changed, locally or
+# in another worker; anything derived from the entity is stale once its
+# recorded version differs.
+_table_versions: DefaultDict[str, int] = defaultdict(int)
+_all_tables_version = 0
+_versions_lock = threading.Lock()
+
+
+def table_version(entity: str) -> int:
+    """Get the current version counter of an entity, e.g. 'lineItems'."""
+    return _all_tables_version + _table_versions[entity]
+
+
+def get_resource(
+    entity: str, sourced_id: str, load: Callable[[], Optional[Any]]
+) -> Optional[CachedResource]:
+    """
+    Get a serialized resource, loading and caching it on a miss.
+
+    Args:
+        entity: Collection name, e.g. 'lineItems'
+        sourced_id: Resource sourcedId
+        load: Loads the active model, or None if there is none
+
+    Returns:
+        Tuple of (OneRoster dict, dateLastModified), or None if not found
+    """
+    cached = resource_cache.get((entity, sourced_id))
+    if cached is not None:
+        return cached
+
+    version = table_version(entity)
+    model = load()
+    if model is None:
+        return None
+
+    cached = (model.to_oneroster_dict(), model.date_last_modified)
+    # A write invalidated while we were loading: our copy may predate it
+    if table_version(entity) == version:
+        resource_cache.set((entity, sourced_id), cached)
+    return cached
+
+
+def invalidate_resource(entity: str, sourced_id: str) -> None:
+    """Drop a resource after it was written and bump its entity's version."""
+    with _versions_lock:
+        _table_versions[entity] += 1
+    resource_cache.delete((entity, sourced_id))
+
+
+def invalidate_all() -> None:
+    """Drop every cached resource and bump all versions, e.g. after missed changes."""
+    global _all_tables_version
+    with _versions_lock:
+        _all_tables_version += 1
+    resource_cache.clear()
@@ -3,12 +3,62 @@ Result Service
 Business logic for results operations.
 """
 
-from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 
+from sqlalchemy import String, column, delete, insert, select, text, update, values
 from sqlalchemy.orm import Session
 
+from src.config.settings import settings
 from src.models.models import Result, StatusEnum
-from src.utils.query_parser import parse_filter, parse_sort
+from src.services.resource_cache import CachedResource, get_resource, invalidate_resource
+from src.services.statistics_service import StatisticsService
+from src.utils.delta_sync import Watermark, apply_changes_window
+from src.utils.include import include_options
+from src.utils.partitioning import is_partitioned, line_item_session, prune_by_line_item
+from src.utils.query_guard import guard_query
+from src.utils.query_parser import in_condition, parse_filter, parse_search, parse_sort
+from src.utils.upsert import build_upsert
+
+# Request fields a PUT may change, by OneRoster name
+UPDATABLE_FIELDS = {
+    "lineItemSourcedId": Result.line_item_sourced_id,
+    "studentSourcedId": Result.student_sourced_id,
+    "scoreStatus": Result.score_status,
+    "score": Result.score,
+    "scoreDate": Result.score_date,
+    "comment": Result.comment,
+    "metadata": Result.metadata_,
+}
+
+# One keyset batch of the backfill: the next :limit results after :after,
+# of which those whose class or session differs from their line item's are fixed
+BACKFILL_CLASSES_BATCH = text(
+    """
+    WITH batch AS (
+        SELECT sourced_id FROM results
+        WHERE sourced_id > :after
+        ORDER BY sourced_id
+        LIMIT :limit
+    ),
+    fixed AS (
+        UPDATE results r
+        SET class_sourced_id = li.class_sourced_id,
+            academic_session_sourced_id = COALESCE(li.academic_session_sourced_id, '')
+        FROM batch, line_items li
+        WHERE r.sourced_id = batch.sourced_id
+          AND li.sourced_id = r.line_item_sourced_id
+          AND (r.class_sourced_id IS DISTINCT FROM li.class_sourced_id
+               OR r.academic_session_sourced_id
+                  <> COALESCE(li.academic_session_sourced_id, ''))
+        RETURNING 1
+    )
+    SELECT
+        (SELECT MAX(sourced_id) FROM batch) AS last_id,
+        (SELECT COUNT(*) FROM batch) AS checked,
+        (SELECT COUNT(*) FROM fixed) AS updated
+    """
+)
 
 
 class ResultService:
@@ -25,6 +75,32 @@ class ResultService:
             .first()
         )
 
+    def get_cached(self, sourced_id: str) -> Optional[CachedResource]:
+        """Get an active result as (OneRoster dict, dateLastModified), read through the cache."""
+        return get_resource("results", sourced_id, lambda: self.get_by_id(sourced_id))
+
+    def get_many(self, sourced_ids: List[str]) -> List[Result]:
+        """
+        Get the active results among a list of sourcedIds with one query.
+
+        Raises:
+            InvalidFilterError: If there are more than FILTER_IN_MAX_VALUES ids
+        """
+        return (
+            self.db.query(Result)
+            .filter(in_condition(Result.sourced_id, sourced_ids))
+            .filter(Result.status == StatusEnum.active)
+            .all()
+        )
+
+    def get_version(self, sourced_id: str) -> Optional[datetime]:
+        """Get the dateLastModified of an active result (its ETag version) without loading it."""
+        return (
+            self.db.query(Result.date_last_modified)
+            .filter(Result.sourced_id == sourced_id, Result.status == StatusEnum.active)
+            .scalar()
+        )
+
     def get_all(
         self,
         limit: int = 100,
@@ -32,6 +108,8 @@ class ResultService:
         filter_expr: Optional[str] = None,
         sort_expr: Optional[str] = None,
         fields: Optional[str] = None,
+        search: Optional[str] = None,
+        include: Tuple[str, ...] = (),
     ) -> Tuple[List[Result], int]:
         """
         Get all results with pagination, filtering, and sorting.
@@ -42,10 +120,20 @@ class ResultService:
             filter_expr: OneRoster filter expression
             sort_expr: OneRoster sort expression
             fields: Comma-separated list of fields to return
+            search: Full-text search query; matches are ranked best first
+                unless sort_expr is given
+            include: Relationships to load with the page (parse_include)
 
         Returns:
             Tuple of (list of results, total count)
+
+        Raises:
+            InvalidFilterError, InvalidSortError: If the query guard rejects
+                a filter or sort no index serves
         """
+        # Reject (or downgrade) filters and sorts no index serves on large tables
+        sort_expr = guard_query(self.db, Result, filter_expr, sort_expr)
+
         query = self.db.query(Result).filter(Result.status == StatusEnum.active)
 
         # Apply filters
@@ -54,6 +142,15 @@ class ResultService:
             for condition in conditions:
                 query = query.filter(condition)
 
+        # Only visit the line item's partition when results is partitioned
+        query = prune_by_line_item(query, Result, filter_expr)
+
+        # Apply full-text search
+        rank = None
+        if search:
+            match, rank = parse_search(search, Result)
+            query = query.filter(match)
+
         # Get total count before pagination
         total = query.count()
 
@@ -62,19 +159,49 @@ class ResultService:
             order_by_clauses = parse_sort(sort_expr, Result)
             for clause in order_by_clauses:
                 query = query.order_by(clause)
+        elif rank is not None:
+            # Best matches first
+            query = query.order_by(rank.desc(), Result.sourced_id)
         else:
             # Default sorting by sourcedId
             query = query.order_by(Result.sourced_id)
 
-        # Apply pagination
+        # Apply pagination; included relationships are loaded with the page
+        query = query.options(*include_options(Result, include))
         results = query.limit(limit).offset(offset).all()
 
         return results, total
 
-    def create(self, data: Dict[str, Any]) -> Result:
-        """Create a new result."""
+    def get_changes(
+        self,
+        watermark: Watermark,
+        limit: int = 100,
+        filter_expr: Optional[str] = None,
+    ) -> Iterator[Result]:
+        """
+        Get results changed after a delta sync watermark.
+        Includes tombstones (status 'tobedeleted') and streams rows in
+        (dateLastModified, sourcedId) order.
+        """
+        query = self.db.query(Result)
+
+        # Apply filters
+        if filter_expr:
+            conditions = parse_filter(filter_expr, Result)
+            for condition in conditions:
+                query = query.filter(condition)
+        query = prune_by_line_item(query, Result, filter_expr)
+
+        query = apply_changes_window(
+            query, Result, watermark, settings.delta_sync_safety_lag_seconds
+        )
+        return iter(query.limit(limit).yield_per(500))
+
+    @staticmethod
+    def _to_row(data: Dict[str, Any]) -> Dict[str, Any]:
+        """Map a OneRoster result body to column values for a new active row."""
         # Convert camelCase to snake_case for database
-        result_data = {
+        row = {
             "sourced_id": data.get("sourcedId"),
             "status": StatusEnum.active,
             "line_item_sourced_id": data.get("lineItemSourcedId"),
@@ -85,44 +212,195 @@ class ResultService:
             "comment": data.get("comment"),
             "metadata_": data.get("metadata"),
         }
+        # Partitions are chosen before the trigger copying the session runs
+        if is_partitioned(Result):
+            row["academic_session_sourced_id"] = line_item_session(row["line_item_sourced_id"])
+        return row
+
+    @staticmethod
+    def _release_moved(db: Session, rows: List[Dict[str, Any]]) -> Set[str]:
+        """
+        Delete the results a partitioned upsert moves to another academic session.
 
-        result = Result(**result_data)
-        self.db.add(result)
+        The partitioned primary key holds the session, so a replace naming a
+        line item of another session would not conflict with the old row
+        (and check_result_sourced_id would reject it). The old rows are
+        deleted first, under the per-sourcedId advisory locks the trigger
+        takes (in sourcedId order, so concurrent batches cannot deadlock on
+        them), and the upsert then inserts them into their new partition.
+
+        Args:
+            db: Session of the upsert's transaction
+            rows: Rows from _to_row with distinct sourcedIds
+
+        Returns:
+            sourcedIds of the moved results (replaced, not created)
+        """
+        if not is_partitioned(Result) or not rows:
+            return set()
+        db.execute(
+            text(
+                "SELECT COUNT(pg_advisory_xact_lock(hashtext(id))) "
+                "FROM (SELECT unnest(CAST(:ids AS text[])) AS id ORDER BY id) AS ids"
+            ),
+            {"ids": sorted(row["sourced_id"] for row in rows)},
+        )
+        targets = values(
+            column("sourced_id", String), column("line_item_sourced_id", String), name="targets"
+        ).data([(row["sourced_id"], row["line_item_sourced_id"]) for row in rows])
+        moved = db.scalars(
+            delete(Result)
+            .where(
+                Result.sourced_id == targets.c.sourced_id,
+                Result.academic_session_sourced_id
+                != line_item_session(targets.c.line_item_sourced_id),
+            )
+            .returning(Result.sourced_id)
+            .execution_options(synchronize_session=False)
+        ).all()
+        return set(moved)
+
+    def create(self, data: Dict[str, Any]) -> Result:
+        """Create a new result with a single INSERT ... RETURNING."""
+        result = self.db.scalars(insert(Result).values(self._to_row(data)).returning(Result)).one()
         self.db.commit()
-        self.db.refresh(result)
+        invalidate_resource("results", result.sourced_id)
+        StatisticsService.invalidate(result.line_item_sourced_id)
         return result
 
-    def update(self, sourced_id: str, data: Dict[str, Any]) -> Optional[Result]:
-        """Update an existing result."""
-        result = self.get_by_id(sourced_id)
-        if not result:
-            return None
-
-        # Update allowed fields
-        if "scoreStatus" in data:
-            result.score_status = data["scoreStatus"]
-        if "score" in data:
-            result.score = data["score"]
-        if "scoreDate" in data:
-            result.score_date = data["scoreDate"]
-        if "comment" in data:
-            result.comment = data["comment"]
-        if "metadata" in data:
-            result.metadata_ = data["metadata"]
+    def update(
+        self,
+        sourced_id: str,
+        data: Dict[str, Any],
+        expected_modified: Optional[datetime] = None,
+    ) -> Optional[Result]:
+        """
+        Update an active result with a single UPDATE ... RETURNING.
+
+        Args:
+            sourced_id: Result sourcedId
+            data: Fields to change, keyed by OneRoster name
+            expected_modified: Only update if dateLastModified still equals
+                this value (If-Match)
+
+        Returns:
+            The updated result, or None if it is missing or was modified
+        """
+        values = {column: data[key] for key, column in UPDATABLE_FIELDS.items() if key in data}
+        if not values:
+            result = self.get_by_id(sourced_id)
+            if result is None or expected_modified is None:
+                return result
+            if result.date_last_modified != expected_modified:
+                return None
+            return result
 
+        # A result moved to another line item leaves its old statistics stale
+        moved_from = None
+        if "lineItemSourcedId" in data:
+            moved_from = self.db.scalar(
+                select(Result.line_item_sourced_id).where(Result.sourced_id == sourced_id)
+            )
+            # Set the partition key here: a BEFORE trigger may not move the row
+            if is_partitioned(Result):
+                values[Result.academic_session_sourced_id] = line_item_session(
+                    data["lineItemSourcedId"]
+                )
+
+        result = self.db.scalars(
+            update(Result)
+            .where(*self._active_version(Result, sourced_id, expected_modified))
+            .values(values)
+            .returning(Result),
+            execution_options={"populate_existing": True},
+        ).first()
         self.db.commit()
-        self.db.refresh(result)
+        invalidate_resource("results", sourced_id)
+        if result:
+            StatisticsService.invalidate(result.line_item_sourced_id)
+            if moved_from is not None and moved_from != result.line_item_sourced_id:
+                StatisticsService.invalidate(moved_from)
         return result
 
-    def delete(self, sourced_id: str) -> bool:
+    def upsert(self, sourced_id: str, data: Dict[str, Any]) -> Tuple[Result, bool]:
+        """
+        Create or replace a result (PUT) with a single INSERT ... ON CONFLICT.
+        Replacing a tombstoned result makes it active again. When partitioned,
+        a result moved to another academic session is deleted first.
+
+        Returns:
+            Tuple of (result, created)
+        """
+        new_row = self._to_row({**data, "sourcedId": sourced_id})
+        moved = self._release_moved(self.db, [new_row])
+        row = self.db.execute(
+            build_upsert(Result, new_row), execution_options={"populate_existing": True}
+        ).one()
+        self.db.commit()
+        invalidate_resource("results", sourced_id)
+        result, inserted = row
+        StatisticsService.invalidate(result.line_item_sourced_id)
+        return result, inserted and sourced_id not in moved
+
+    def delete(self, sourced_id: str, expected_modified: Optional[datetime] = None) -> bool:
         """
         Soft delete a result.
         Sets status to 'tobedeleted' instead of physically deleting.
+        With expected_modified (If-Match), only deletes that version.
         """
-        result = self.get_by_id(sourced_id)
-        if not result:
+        line_item_sourced_id = self.db.scalars(
+            update(Result)
+            .where(*self._active_version(Result, sourced_id, expected_modified))
+            .values(status=StatusEnum.tobedeleted)
+            .returning(Result.line_item_sourced_id)
+        ).first()
+        self.db.commit()
+        invalidate_resource("results", sourced_id)
+        if line_item_sourced_id is None:
             return False
 
-        result.status = StatusEnum.tobedeleted
-        self.db.commit()
+        StatisticsService.invalidate(line_item_sourced_id)
         return True
+
+    def backfill_classes(self, batch_size: Optional[int] = None) -> Dict[str, int]:
+        """
+        Copy each result's class and academic session from its line item
+        where they are missing or stale.
+
+        New writes are kept in sync by the set_results_class trigger; this
+        fills in rows written before it existed. Results are walked in
+        sourcedId order and each batch is committed on its own.
+
+        Args:
+            batch_size: Results checked per transaction
+                (defaults to settings.compaction_batch_size)
+
+        Returns:
+            Report with the results checked and updated
+        """
+        if batch_size is None:
+            batch_size = settings.compaction_batch_size
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+
+        checked = updated = 0
+        after = ""
+        while True:
+            row = self.db.execute(
+                BACKFILL_CLASSES_BATCH, {"after": after, "limit": batch_size}
+            ).one()
+            self.db.commit()
+            if row.last_id is None:
+                return {"resultsChecked": checked, "resultsUpdated": updated}
+            checked += row.checked
+            updated += row.updated
+            after = row.last_id
+
+    @staticmethod
+    def _active_version(
+        model: Any, sourced_id: str, expected_modified: Optional[datetime]
+    ) -> List[Any]:
+        conditions = [model.sourced_id == sourced_id, model.status == StatusEnum.active]
+        if expected_modified is not None:
+            conditions.append(model.date_last_modified == expected_modified)
+        return conditions
@@ -0,0 +1,221 @@
+"""
+ScoreScale Service
+Business logic for score scale operations.
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from src.config.settings import settings
+from src.models.models import ScoreScale, StatusEnum
+from src.services.resource_cache import invalidate_resource
+from src.utils.cache import TTLCache
+from src.utils.delta_sync import Watermark, apply_changes_window
+from src.utils.query_guard import guard_query
+from src.utils.query_parser import parse_filter, parse_sort
+from src.utils.score_scale import CompiledScoreScale, compile_score_scale
+from src.utils.upsert import build_upsert
+
+# Per-worker cache of compiled scales, keyed by sourcedId
+compiled_scale_cache = TTLCache(
+    max_entries=settings.score_scale_cache_max_entries,
+    ttl_seconds=settings.score_scale_cache_ttl_seconds,
+)
+
+# Request fields a PUT may change, by OneRoster name
+UPDATABLE_FIELDS = {
+    "title": ScoreScale.title,
+    "type": ScoreScale.type,
+    "courseSourcedId": ScoreScale.course_sourced_id,
+    "classSourcedId": ScoreScale.class_sourced_id,
+    "scoreScaleValue": ScoreScale.score_scale_value,
+    "metadata": ScoreScale.metadata_,
+}
+
+
+class ScoreScaleService:
+    """Service class for ScoreScale operations."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_by_id(self, sourced_id: str) -> Optional[ScoreScale]:
+        """Get a score scale by sourcedId."""
+        return (
+            self.db.query(ScoreScale)
+            .filter(ScoreScale.sourced_id == sourced_id, ScoreScale.status == StatusEnum.active)
+            .first()
+        )
+
+    def get_compiled(self, sourced_id: str) -> Optional[CompiledScoreScale]:
+        """
+        Get a score scale compiled for label lookups.
+        Compiled scales are cached per worker and dropped on scale writes.
+        """
+        compiled = compiled_scale_cache.get(sourced_id)
+        if compiled is not None:
+            return compiled
+
+        score_scale = self.get_by_id(sourced_id)
+        if not score_scale:
+            return None
+
+        compiled = compile_score_scale(score_scale.sourced_id, score_scale.score_scale_value)
+        compiled_scale_cache.set(sourced_id, compiled)
+        return compiled
+
+    def get_all(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        filter_expr: Optional[str] = None,
+        sort_expr: Optional[str] = None,
+        fields: Optional[str] = None,
+    ) -> Tuple[List[ScoreScale], int]:
+        """
+        Get all score scales with pagination, filtering, and sorting.
+
+        Args:
+            limit: Maximum number of results to return
+            offset: Number of results to skip
+            filter_expr: OneRoster filter expression
+            sort_expr: OneRoster sort expression
+            fields: Comma-separated list of fields to return
+
+        Returns:
+            Tuple of (list of score scales, total count)
+
+        Raises:
+            InvalidFilterError, InvalidSortError: If the query guard rejects
+                a filter or sort no index serves
+        """
+        # Reject (or downgrade) filters and sorts no index serves on large tables
+        sort_expr = guard_query(self.db, ScoreScale, filter_expr, sort_expr)
+
+        query = self.db.query(ScoreScale).filter(ScoreScale.status == StatusEnum.active)
+
+        # Apply filters
+        if filter_expr:
+            conditions = parse_filter(filter_expr, ScoreScale)
+            for condition in conditions:
+                query = query.filter(condition)
+
+        # Get total count before pagination
+        total = query.count()
+
+        # Apply sorting
+        if sort_expr:
+            order_by_clauses = parse_sort(sort_expr, ScoreScale)
+            for clause in order_by_clauses:
+                query = query.order_by(clause)
+        else:
+            # Default sorting by sourcedId
+            query = query.order_by(ScoreScale.sourced_id)
+
+        # Apply pagination
+        score_scales = query.limit(limit).offset(offset).all()
+
+        return score_scales, total
+
+    def get_changes(
+        self,
+        watermark: Watermark,
+        limit: int = 100,
+        filter_expr: Optional[str] = None,
+    ) -> Iterator[ScoreScale]:
+        """
+        Get score scales changed after a delta sync watermark.
+        Includes tombstones (status 'tobedeleted') and streams rows in
+        (dateLastModified, sourcedId) order.
+        """
+        query = self.db.query(ScoreScale)
+
+        # Apply filters
+        if filter_expr:
+            conditions = parse_filter(filter_expr, ScoreScale)
+            for condition in conditions:
+                query = query.filter(condition)
+
+        query = apply_changes_window(
+            query, ScoreScale, watermark, settings.delta_sync_safety_lag_seconds
+        )
+        return iter(query.limit(limit).yield_per(500))
+
+    @staticmethod
+    def _to_row(data: Dict[str, Any]) -> Dict[str, Any]:
+        """Map a OneRoster score scale body to column values for a new active row."""
+        # Convert camelCase to snake_case for database
+        return {
+            "sourced_id": data.get("sourcedId"),
+            "status": StatusEnum.active,
+            "title": data.get("title"),
+            "type": data.get("type"),
+            "course_sourced_id": data.get("courseSourcedId"),
+            "class_sourced_id": data.get("classSourcedId"),
+            "score_scale_value": data.get("scoreScaleValue"),
+            "metadata_": data.get("metadata"),
+        }
+
+    def create(self, data: Dict[str, Any]) -> ScoreScale:
+        """Create a new score scale with a single INSERT ... RETURNING."""
+        score_scale = self.db.scalars(
+            insert(ScoreScale).returning(ScoreScale), [self._to_row(data)]
+        ).one()
+        self.db.commit()
+        compiled_scale_cache.delete(score_scale.sourced_id)
+        invalidate_resource("scoreScales", score_scale.sourced_id)
+        return score_scale
+
+    def update(self, sourced_id: str, data: Dict[str, Any]) -> Optional[ScoreScale]:
+        """Update an active score scale with a single UPDATE ... RETURNING."""
+        values = {column: data[key] for key, column in UPDATABLE_FIELDS.items() if key in data}
+        if not values:
+            return self.get_by_id(sourced_id)
+
+        score_scale = self.db.scalars(
+            update(ScoreScale)
+            .where(ScoreScale.sourced_id == sourced_id, ScoreScale.status == StatusEnum.active)
+            .values(values)
+            .returning(ScoreScale),
+            execution_options={"populate_existing": True},
+        ).first()
+        self.db.commit()
+        compiled_scale_cache.delete(sourced_id)
+        invalidate_resource("scoreScales", sourced_id)
+        return score_scale
+
+    def upsert(self, sourced_id: str, data: Dict[str, Any]) -> Tuple[ScoreScale, bool]:
+        """
+        Create or replace a score scale (PUT) with a single INSERT ... ON CONFLICT.
+        Replacing a tombstoned score scale makes it active again.
+
+        Returns:
+            Tuple of (score_scale, created)
+        """
+        row = self.db.execute(
+            build_upsert(ScoreScale, self._to_row({**data, "sourcedId": sourced_id})),
+            execution_options={"populate_existing": True},
+        ).one()
+        self.db.commit()
+        score_scale, created = row
+        compiled_scale_cache.delete(sourced_id)
+        invalidate_resource("scoreScales", sourced_id)
+        return score_scale, created
+
+    def delete(self, sourced_id: str) -> bool:
+        """
+        Soft delete a score scale.
+        Sets status to 'tobedeleted' instead of physically deleting.
+        """
+        deleted = self.db.scalars(
+            update(ScoreScale)
+            .where(ScoreScale.sourced_id == sourced_id, ScoreScale.status == StatusEnum.active)
+            .values(status=StatusEnum.tobedeleted)
+            .returning(ScoreScale.sourced_id)
+        ).first()
+        self.db.commit()
+        compiled_scale_cache.delete(sourced_id)
+        invalidate_resource("scoreScales", sourced_id)
+        return deleted is not None
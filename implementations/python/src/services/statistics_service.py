@@ -0,0 +1,182 @@
+"""
+Statistics Service
+Score distribution statistics for line items.
+"""
+
+import threading
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from src.config.settings import settings
+from src.models.models import LineItem
+from src.utils.cache import TTLCache
+
+PERCENTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+# Per-worker cache of computed statistics, keyed by line item sourcedId.
+# Each entry maps bucket count -> statistics dict.
+statistics_cache = TTLCache(
+    max_entries=settings.statistics_cache_max_entries,
+    ttl_seconds=settings.statistics_cache_ttl_seconds,
+)
+
+# Bumped by every invalidation; statistics computed across a bump may
+# predate the write and are returned but not cached
+_version = 0
+_version_lock = threading.Lock()
+
+# A single pass over the line item's results: GROUPING SETS produce the
+# overall row (with percentiles), one row per scoreStatus and one per bucket.
+STATISTICS_QUERY = text(
+    f"""
+    SELECT
+        GROUPING(r.score_status) AS status_grouped,
+        GROUPING(r.bucket) AS bucket_grouped,
+        r.score_status,
+        r.bucket,
+        COUNT(*) AS result_count,
+        COUNT(r.score) AS score_count,
+        AVG(r.score) AS mean,
+        STDDEV_POP(r.score) AS std_dev,
+        MIN(r.score) AS score_min,
+        MAX(r.score) AS score_max,
+        percentile_cont(ARRAY{list(PERCENTILES)}::float8[])
+            WITHIN GROUP (ORDER BY r.score) AS percentiles
+    FROM (
+        SELECT
+            score_status,
+            score,
+            -- width_bucket rejects an empty range; such line items get no histogram
+            CASE WHEN CAST(:high AS numeric) > CAST(:low AS numeric) THEN LEAST(
+                GREATEST(width_bucket(score, CAST(:low AS numeric), CAST(:high AS numeric), :buckets), 1),
+                :buckets
+            ) END AS bucket
+        FROM results
+        WHERE line_item_sourced_id = :line_item_sourced_id
+        AND status = 'active'
+        -- Partition key of a partitioned results table (NULL otherwise)
+        AND (CAST(:academic_session AS varchar) IS NULL
+             OR academic_session_sourced_id = :academic_session)
+    ) r
+    GROUP BY GROUPING SETS ((), (r.score_status), (r.bucket))
+    """
+)
+
+
+def _to_float(value: Any) -> Optional[float]:
+    return float(value) if value is not None else None
+
+
+class StatisticsService:
+    """Service class for line item score statistics."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_line_item_statistics(
+        self, line_item: LineItem, buckets: int = 10, version: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Get score distribution statistics for a line item.
+
+        Args:
+            line_item: Line item to compute statistics for
+            buckets: Number of equal-width histogram buckets between
+                resultValueMin and resultValueMax
+            version: StatisticsService.version() from before line_item was
+                loaded (defaults to the current version)
+
+        Returns:
+            Statistics dict (served from the per-worker cache when possible)
+        """
+        if version is None:
+            version = StatisticsService.version()
+        cached = statistics_cache.get(line_item.sourced_id) or {}
+        if buckets in cached:
+            return cached[buckets]
+
+        stats = self._compute(line_item, buckets)
+        # An invalidation while computing: our statistics may predate the write
+        if StatisticsService.version() == version:
+            statistics_cache.set(line_item.sourced_id, {**cached, buckets: stats})
+        return stats
+
+    @staticmethod
+    def version() -> int:
+        """Get the invalidation counter, to be read before loading what is computed."""
+        return _version
+
+    @staticmethod
+    def invalidate(line_item_sourced_id: str) -> None:
+        """Drop cached statistics for a line item after its results change."""
+        global _version
+        with _version_lock:
+            _version += 1
+        statistics_cache.delete(line_item_sourced_id)
+
+    @staticmethod
+    def invalidate_all() -> None:
+        """Drop all cached statistics, e.g. after missed changes."""
+        global _version
+        with _version_lock:
+            _version += 1
+        statistics_cache.clear()
+
+    def _compute(self, line_item: LineItem, buckets: int) -> Dict[str, Any]:
+        low = line_item.result_value_min if line_item.result_value_min is not None else 0.0
+        high = line_item.result_value_max if line_item.result_value_max is not None else 100.0
+        rows = self.db.execute(
+            STATISTICS_QUERY,
+            {
+                "line_item_sourced_id": line_item.sourced_id,
+                "academic_session": (
+                    (line_item.academic_session_sourced_id or "")
+                    if settings.results_partitioned
+                    else None
+                ),
+                "low": low,
+                "high": high,
+                "buckets": buckets,
+            },
+        ).all()
+
+        width = (high - low) / buckets
+        histogram = [
+            {"min": low + i * width, "max": low + (i + 1) * width, "count": 0}
+            for i in range(buckets)
+            if high > low
+        ]
+        stats: Dict[str, Any] = {
+            "lineItemSourcedId": line_item.sourced_id,
+            "resultCount": 0,
+            "scoreCount": 0,
+            "scoreStatusCounts": {},
+            "histogram": histogram,
+        }
+
+        for row in rows:
+            if row.status_grouped and row.bucket_grouped:
+                percentiles = row.percentiles or [None] * len(PERCENTILES)
+                stats.update(
+                    {
+                        "resultCount": row.result_count,
+                        "scoreCount": row.score_count,
+                        "mean": _to_float(row.mean),
+                        "median": _to_float(percentiles[PERCENTILES.index(0.5)]),
+                        "stdDev": _to_float(row.std_dev),
+                        "min": _to_float(row.score_min),
+                        "max": _to_float(row.score_max),
+                        "percentiles": {
+                            f"p{round(p * 100)}": _to_float(v)
+                            for p, v in zip(PERCENTILES, percentiles, strict=True)
+                        },
+                    }
+                )
+            elif not row.status_grouped:
+                stats["scoreStatusCounts"][row.score_status] = row.result_count
+            elif row.bucket is not None:
+                histogram[row.bucket - 1]["count"] = row.score_count
+
+        return stats
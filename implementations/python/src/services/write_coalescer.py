@@ -0,0 +1,202 @@
+"""
+Write Coalescer
+Batches concurrent result upserts into one multi-row transaction.
+"""
+
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
+
+from psycopg2.errors import DeadlockDetected, SerializationFailure
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from src.config.database import SessionLocal
+from src.config.settings import settings
+from src.models.models import Result
+from src.services.resource_cache import invalidate_resource
+from src.services.result_service import ResultService
+from src.services.statistics_service import StatisticsService
+from src.utils.etag import make_etag
+from src.utils.upsert import build_upsert
+
+# (OneRoster result dict, created, ETag) or the error for that write
+WriteOutcome = Union[Tuple[Dict[str, Any], bool, str], Exception]
+
+
+class ResultWriteCoalescer:
+    """
+    Per-worker buffer for result PUT upserts.
+
+    Writes arriving within ``delay_ms`` of each other (up to ``max_batch``)
+    are flushed as one multi-row INSERT ... ON CONFLICT and one commit.
+    Each caller is answered only after its batch commits, so a following
+    read sees the write. If the batch hits an integrity error, every write
+    is retried in its own savepoint so only the offending ones fail.
+
+    Rows are upserted in (lineItem, student, sourcedId) order, so
+    overlapping batches of other workers take their row locks in the same
+    order; a batch that still loses a deadlock or serialization failure is
+    retried whole, up to ``max_attempts`` times.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        delay_ms: int = 5,
+        max_batch: int = 500,
+        max_attempts: int = 3,
+    ):
+        self.session_factory = session_factory
+        self.delay_ms = delay_ms
+        self.max_batch = max_batch
+        self.max_attempts = max_attempts
+        self.batches = 0
+        self.writes = 0
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes: Set[asyncio.Task] = set()
+
+    async def upsert(
+        self, sourced_id: str, data: Dict[str, Any]
+    ) -> Tuple[Dict[str, Any], bool, str]:
+        """
+        Queue a create-or-replace of a result and wait for its batch to commit.
+
+        Args:
+            sourced_id: Result sourcedId
+            data: Full result body keyed by OneRoster field name
+
+        Returns:
+            Tuple of (OneRoster result dict, created, ETag)
+
+        Raises:
+            IntegrityError: If this write violates a constraint
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((ResultService._to_row({**data, "sourcedId": sourced_id}), future))
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.delay_ms / 1000, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._write_batch(batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _write_batch(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        try:
+            outcomes = await run_in_threadpool(self._write, [row for row, _ in batch])
+        except Exception as exc:
+            outcomes = [exc] * len(batch)
+
+        for (_, future), outcome in zip(batch, outcomes, strict=True):
+            if future.done():
+                continue
+            if isinstance(outcome, Exception):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
+
+    def _write(self, rows: List[Dict[str, Any]]) -> List[WriteOutcome]:
+        session = self.session_factory()
+        try:
+            for attempt in range(1, self.max_attempts + 1):
+                try:
+                    try:
+                        outcomes = self._upsert_all(session, rows)
+                    except IntegrityError:
+                        session.rollback()
+                        outcomes = self._upsert_each(session, rows)
+                    session.commit()
+                    break
+                except OperationalError as exc:
+                    session.rollback()
+                    retryable = isinstance(exc.orig, (DeadlockDetected, SerializationFailure))
+                    if not retryable or attempt == self.max_attempts:
+                        raise
+        finally:
+            session.close()
+
+        self.batches += 1
+        self.writes += len(rows)
+        for sourced_id in {row["sourced_id"] for row in rows}:
+            invalidate_resource("results", sourced_id)
+        for line_item_sourced_id in {row["line_item_sourced_id"] for row in rows}:
+            StatisticsService.invalidate(line_item_sourced_id)
+        return outcomes
+
+    @staticmethod
+    def _upsert_all(session: Session, rows: List[Dict[str, Any]]) -> List[WriteOutcome]:
+        # A statement may touch each sourcedId once, so repeated writes of the
+        # same result go into later rounds, applied in arrival order.
+        rounds: List[Dict[str, int]] = []
+        for index, row in enumerate(rows):
+            for round_ in rounds:
+                if row["sourced_id"] not in round_:
+                    round_[row["sourced_id"]] = index
+                    break
+            else:
+                rounds.append({row["sourced_id"]: index})
+
+        outcomes: List[WriteOutcome] = [None] * len(rows)  # type: ignore[list-item]
+        for round_ in rounds:
+            # One lock order for every batch: the unique (line item, student)
+            # entries, then the primary key
+            ordered = sorted(
+                (rows[index] for index in round_.values()),
+                key=lambda row: (
+                    row["line_item_sourced_id"],
+                    row["student_sourced_id"],
+                    row["sourced_id"],
+                ),
+            )
+            moved = ResultService._release_moved(session, ordered)
+            returned = session.execute(
+                build_upsert(Result, ordered), execution_options={"populate_existing": True}
+            ).all()
+            for result, inserted in returned:
+                outcomes[round_[result.sourced_id]] = ResultWriteCoalescer._outcome(
+                    result, inserted and result.sourced_id not in moved
+                )
+        return outcomes
+
+    @staticmethod
+    def _upsert_each(session: Session, rows: List[Dict[str, Any]]) -> List[WriteOutcome]:
+        outcomes: List[WriteOutcome] = []
+        for row in rows:
+            try:
+                with session.begin_nested():
+                    moved = ResultService._release_moved(session, [row])
+                    result, inserted = session.execute(
+                        build_upsert(Result, row), execution_options={"populate_existing": True}
+                    ).one()
+                outcomes.append(
+                    ResultWriteCoalescer._outcome(
+                        result, inserted and result.sourced_id not in moved
+                    )
+                )
+            except IntegrityError as exc:
+                outcomes.append(exc)
+        return outcomes
+
+    @staticmethod
+    def _outcome(result: Result, inserted: bool) -> WriteOutcome:
+        return result.to_oneroster_dict(), inserted, make_etag(result.date_last_modified)
+
+
+# Per-worker coalescer used by PUT /results when coalescing is enabled
+result_write_coalescer = ResultWriteCoalescer(
+    delay_ms=settings.result_write_coalescing_delay_ms,
+    max_batch=settings.result_write_coalescing_max_batch,
+)
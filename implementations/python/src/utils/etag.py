@@ -0,0 +1,114 @@
+"""
+ETag helpers for optimistic concurrency.
+A resource's ETag is its dateLastModified in microseconds since the epoch,
+so the version needs no extra column and is bumped by the modtime triggers.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, List, Optional
+
+from fastapi import HTTPException, Response, status
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def make_etag(modified: datetime) -> str:
+    """Build the (strong) ETag for a dateLastModified value."""
+    if modified.tzinfo is None:
+        modified = modified.replace(tzinfo=timezone.utc)
+    return f'"{(modified - EPOCH) // MICROSECOND}"'
+
+
+def parse_etag(etag: str) -> datetime:
+    """
+    Get the dateLastModified an ETag was built from.
+
+    Raises:
+        ValueError: If the ETag was not produced by make_etag
+    """
+    value = etag.strip()
+    if value.startswith("W/"):
+        value = value[2:]
+    if len(value) < 2 or value[0] != '"' or value[-1] != '"':
+        raise ValueError(f"Malformed ETag: {etag}")
+    try:
+        return EPOCH + int(value[1:-1]) * MICROSECOND
+    except OverflowError as exc:
+        # Beyond the datetime range: no resource can have this version
+        raise ValueError(f"Malformed ETag: {etag}") from exc
+
+
+def _split(header: str) -> List[str]:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    """Check an If-None-Match style header (list or '*') against an ETag, weakly."""
+    tags = _split(header)
+    if "*" in tags:
+        return True
+    bare = etag[2:] if etag.startswith("W/") else etag
+    return any((tag[2:] if tag.startswith("W/") else tag) == bare for tag in tags)
+
+
+def parse_if_match(header: str) -> Optional[datetime]:
+    """
+    Get the dateLastModified required by an If-Match header.
+
+    Returns:
+        None for 'If-Match: *' (any current version)
+
+    Raises:
+        ValueError: If the header lists several or unknown ETags; such a
+            precondition can never hold for a single conditional UPDATE
+    """
+    tags = _split(header)
+    if tags == ["*"]:
+        return None
+    if len(tags) != 1:
+        raise ValueError("If-Match must carry a single ETag")
+    return parse_etag(tags[0])
+
+
+def not_modified(etag: str) -> Response:
+    """Build an empty 304 response for a matching If-None-Match."""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+
+def if_match_version(header: str) -> Optional[datetime]:
+    """parse_if_match for routers: an unusable If-Match fails the precondition (412)."""
+    try:
+        return parse_if_match(header)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail=f"If-Match precondition failed: {exc}",
+        ) from exc
+
+
+def write_failed(
+    service: Any, sourced_id: str, resource: str, if_match: Optional[str]
+) -> HTTPException:
+    """
+    Explain why a conditional UPDATE matched no row.
+
+    Returns:
+        412 if the resource exists but its version differs from If-Match, or
+        if 'If-Match: *' names a missing resource (RFC 9110 13.1.1),
+        otherwise 404
+    """
+    if if_match is not None and if_match.strip() == "*":
+        return HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail=f"{resource} '{sourced_id}' does not exist (If-Match: *)",
+        )
+    if if_match is not None and service.get_version(sourced_id) is not None:
+        return HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail=f"{resource} '{sourced_id}' was modified since the If-Match ETag",
+        )
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"{resource} with sourcedId '{sourced_id}' not found",
+    )
@@ -0,0 +1,106 @@
+"""
+Eager loading of related resources for include= on collections.
+
+include names are a model's relationships in camelCase (line items:
+category, results; results: lineItem). Each is loaded together with the
+page: a many-to-one relationship with a join in the page query, a
+collection with one extra selectinload query for the whole page, limited
+to active rows. A collection has no limit of its own, so pages that
+include one are capped at INCLUDE_COLLECTION_MAX_LIMIT rows. Tombstoned
+related resources are never included. Relationships are never lazy loaded
+per row, and in production a lazy load raises (models.RELATIONSHIP_LAZY).
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import DeclarativeMeta, joinedload, selectinload
+
+from src.config.settings import settings
+from src.models.models import StatusEnum
+from src.utils.query_parser import camel_to_snake
+
+
+class InvalidIncludeError(ValueError):
+    """Raised when an include name is not a relationship of the model (HTTP 400)."""
+
+    code_minor = "invalid_selection_field"
+
+
+def parse_include(include_expr: Optional[str], model: DeclarativeMeta) -> Tuple[str, ...]:
+    """
+    Parse a comma-separated include expression.
+
+    Returns:
+        Sorted distinct include names (camelCase)
+
+    Raises:
+        InvalidIncludeError: If a name is not a relationship of the model
+    """
+    if not include_expr:
+        return ()
+    relationships = model.__mapper__.relationships
+    names = {name.strip() for name in include_expr.split(",") if name.strip()}
+    for name in names:
+        if camel_to_snake(name) not in relationships:
+            raise InvalidIncludeError(
+                f"Cannot include '{name}' with {model.__tablename__}; "
+                f"supported: {', '.join(sorted(_camel(key) for key in relationships.keys()))}"
+            )
+    return tuple(sorted(names))
+
+
+def include_limit(model: DeclarativeMeta, includes: Iterable[str], limit: int) -> int:
+    """Page limit for a request, capped when it includes a collection."""
+    relationships = model.__mapper__.relationships
+    if any(relationships[camel_to_snake(name)].uselist for name in includes):
+        return min(limit, settings.include_collection_max_limit)
+    return limit
+
+
+def _camel(name: str) -> str:
+    first, *rest = name.split("_")
+    return first + "".join(part.title() for part in rest)
+
+
+def include_options(model: DeclarativeMeta, includes: Iterable[str]) -> List[Any]:
+    """Loader options that load the included relationships with the query."""
+    options = []
+    for name in includes:
+        attribute = getattr(model, camel_to_snake(name))
+        prop = attribute.property
+        if prop.uselist:
+            target = prop.mapper.class_
+            options.append(selectinload(attribute.and_(target.status == StatusEnum.active)))
+        else:
+            options.append(joinedload(attribute))
+    return options
+
+
+def included_entities(model: DeclarativeMeta, includes: Iterable[str]) -> Tuple[str, ...]:
+    """Cache entity names (e.g. 'lineItems') of the included relationships' tables."""
+    relationships = model.__mapper__.relationships
+    return tuple(
+        _camel(relationships[camel_to_snake(name)].mapper.class_.__tablename__) for name in includes
+    )
+
+
+def collect_included(rows: Iterable[Any], includes: Iterable[str]) -> Dict[str, list]:
+    """
+    Gather the included resources of a page as OneRoster dicts.
+
+    Returns:
+        Include name -> related resources, each once, in sourcedId order
+    """
+    rows = list(rows)
+    included = {}
+    for name in includes:
+        attribute = camel_to_snake(name)
+        related: Dict[str, Any] = {}
+        for row in rows:
+            value = getattr(row, attribute)
+            for resource in value if isinstance(value, list) else [value]:
+                # Joined many-to-one rows are loaded whatever their status
+                if resource is not None and resource.status == StatusEnum.active:
+                    related.setdefault(resource.sourced_id, resource)
+        included[name] = [related[key].to_oneroster_dict() for key in sorted(related)]
+    return included
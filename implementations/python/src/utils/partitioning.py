@@ -0,0 +1,57 @@
+"""
+Partition key helpers for the optional partitioned results table.
+
+With RESULTS_PARTITIONED=true (after migrations/012_partition_results.sql)
+results is LIST-partitioned on academic_session_sourced_id, which each
+result copies from its line item ('' when the line item has none). Rows
+are routed to a partition before any trigger runs, so writes name the
+key themselves, and reads scoped to one line item add it so the planner
+only visits that session's partition.
+"""
+
+from typing import Any, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import DeclarativeMeta, Query
+from sqlalchemy.sql.elements import ColumnElement
+
+from src.config.settings import settings
+from src.models.models import LineItem
+from src.utils.query_parser import normalize_filter
+
+
+def is_partitioned(model: DeclarativeMeta) -> bool:
+    """Check whether a model's table is partitioned in this deployment."""
+    return settings.results_partitioned and model.__tablename__ == "results"
+
+
+def line_item_session(line_item_sourced_id: Any) -> ColumnElement:
+    """Scalar subquery for the partition key of a line item's results."""
+    return (
+        select(func.coalesce(LineItem.academic_session_sourced_id, ""))
+        .where(LineItem.sourced_id == line_item_sourced_id)
+        .scalar_subquery()
+    )
+
+
+def prune_by_line_item(query: Query, model: DeclarativeMeta, filter_expr: Optional[str]) -> Query:
+    """
+    Add the partition key to a query filtered on one line item.
+
+    Args:
+        query: Query over the model
+        model: SQLAlchemy model class
+        filter_expr: OneRoster filter expression of the query
+
+    Returns:
+        The query, restricted to the line item's session when the model's
+        table is partitioned and the filter has lineItemSourcedId='...'
+    """
+    if not filter_expr or not is_partitioned(model):
+        return query
+    for field, operator, value in normalize_filter(filter_expr):
+        if field == "line_item_sourced_id" and operator == "=":
+            return query.filter(
+                model.academic_session_sourced_id == line_item_session(value.strip("'"))
+            )
+    return query
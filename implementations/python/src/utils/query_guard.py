@@ -0,0 +1,205 @@
+"""
+Query cost guard for collection reads.
+
+On large tables every filter clause and sort key of a collection query must
+be backed by an index, unless an indexed equality clause on a selective key
+(SELECTIVE_COLUMNS: sourcedId, line item, student, class, category) already
+narrows the rows to a small set; low-cardinality columns such as
+scoreStatus or status never do. Which columns are indexed is read from each
+model's declared indexes (``__table_args__``, which mirror schema.sql, with
+the BRIN replacements of RESULTS_BRIN_INDEXES applied):
+
+- comparisons need a B-tree index led by the column (or the primary key /
+  a unique constraint led by it), or a BRIN index on it; != needs a
+  narrowing clause, since no index serves a negation
+- IN lists need a B-tree index led by the column
+- contains (~) needs a pg_trgm index on the column
+- sort keys need a B-tree index led by the column
+
+Tables whose planner row estimate is below QUERY_GUARD_MIN_ROWS are not
+checked. QUERY_GUARD_MODE=downgrade drops unindexed sort keys instead of
+rejecting them (rows come back in index order); unindexed filters are
+always rejected, since dropping them would change the result.
+"""
+
+import logging
+import re
+from typing import Dict, FrozenSet, NamedTuple, Optional, Tuple
+
+from sqlalchemy import UniqueConstraint, text
+from sqlalchemy.orm import DeclarativeMeta, Session
+
+from src.config.settings import settings
+from src.utils.cache import TTLCache
+from src.utils.query_parser import (
+    InvalidFilterError,
+    InvalidSortError,
+    camel_to_snake,
+    normalize_filter,
+    normalize_sort,
+)
+
+logger = logging.getLogger(__name__)
+
+# Planner row estimates per table; they only move with ANALYZE
+row_estimates = TTLCache(max_entries=64, ttl_seconds=300)
+
+
+class IndexMap(NamedTuple):
+    """Columns of a table usable by the index-backed query shapes."""
+
+    btree: FrozenSet[str]  # columns leading a B-tree index
+    trigram: FrozenSet[str]  # columns with a gin_trgm_ops index
+    brin: FrozenSet[str]  # columns leading a BRIN index (range filters, no order)
+
+
+# Keys whose equality or IN list bounds a query to a small set of rows
+SELECTIVE_COLUMNS = frozenset(
+    {
+        "sourced_id",
+        "line_item_sourced_id",
+        "student_sourced_id",
+        "class_sourced_id",
+        "category_sourced_id",
+    }
+)
+
+# Declared B-trees that migrations/013_brin_timestamp_indexes.sql replaces
+# with BRIN indexes on their leading column
+BRIN_REPLACED_INDEXES = frozenset({"idx_results_modified", "idx_results_score_date"})
+
+_index_maps: Dict[Tuple[str, bool], IndexMap] = {}
+
+
+def index_map(model: DeclarativeMeta) -> IndexMap:
+    """Get the index map of a model, derived from its declared indexes."""
+    table = model.__table__
+    key = (table.name, settings.results_brin_indexes)
+    cached = _index_maps.get(key)
+    if cached is not None:
+        return cached
+
+    btree = {column.name for column in list(table.primary_key.columns)[:1]}
+    trigram = set()
+    brin = set()
+    for index in table.indexes:
+        options = index.dialect_options["postgresql"]
+        leading = list(index.columns)[0].name
+        if options["using"] == "gin":
+            if (options["ops"] or {}).get(leading) == "gin_trgm_ops":
+                trigram.add(leading)
+        elif options["using"] == "brin" or (
+            settings.results_brin_indexes and index.name in BRIN_REPLACED_INDEXES
+        ):
+            brin.add(leading)
+        else:
+            btree.add(leading)
+    for constraint in table.constraints:
+        if isinstance(constraint, UniqueConstraint):
+            btree.add(list(constraint.columns)[0].name)
+
+    cached = _index_maps[key] = IndexMap(frozenset(btree), frozenset(trigram), frozenset(brin))
+    return cached
+
+
+def estimated_rows(db: Session, model: DeclarativeMeta) -> float:
+    """Get the planner's row estimate for a model's table (0 if never analyzed)."""
+    table = model.__tablename__
+    rows = row_estimates.get(table)
+    if rows is None:
+        rows = db.execute(
+            text("SELECT reltuples FROM pg_class WHERE oid = CAST(:table AS regclass)"),
+            {"table": table},
+        ).scalar()
+        rows = max(rows or 0, 0)
+        row_estimates.set(table, rows)
+    return rows
+
+
+def _camel(field: str) -> str:
+    return re.sub(r"_([a-z])", lambda match: match.group(1).upper(), field)
+
+
+def guard_query(
+    db: Session,
+    model: DeclarativeMeta,
+    filter_expr: Optional[str] = None,
+    sort_expr: Optional[str] = None,
+) -> Optional[str]:
+    """
+    Check that a collection query on a model is served by its indexes.
+
+    Args:
+        db: Database session (for the table's row estimate)
+        model: SQLAlchemy model class
+        filter_expr: OneRoster filter expression
+        sort_expr: OneRoster sort expression
+
+    Returns:
+        The sort expression to run: sort_expr, or with unindexed keys removed
+        in downgrade mode
+
+    Raises:
+        InvalidFilterError: If a filter clause is not index-backed
+        InvalidSortError: If a sort key is not index-backed (reject mode)
+    """
+    if settings.query_guard_mode == "off" or not (filter_expr or sort_expr):
+        return sort_expr
+    if estimated_rows(db, model) < settings.query_guard_min_rows:
+        return sort_expr
+
+    indexes = index_map(model)
+    columns = model.__table__.columns
+    clauses = normalize_filter(filter_expr) if filter_expr else ()
+
+    # An indexed equality or IN list on a selective key (or metadata
+    # containment) bounds the rows to check
+    narrowed = any(
+        (operator == "=" and field.startswith("metadata."))
+        or (operator in ("=", "IN") and field in indexes.btree & SELECTIVE_COLUMNS)
+        for field, operator, _ in clauses
+    )
+    if narrowed:
+        return sort_expr
+
+    for field, operator, _ in clauses:
+        # Metadata paths are allowlisted by the parser; unknown fields are ignored
+        if field not in columns:
+            continue
+        if operator == "~":
+            backed = field in indexes.trigram
+        elif operator == "!=":
+            backed = False
+        elif operator == "IN":
+            backed = field in indexes.btree
+        else:
+            backed = field in indexes.btree | indexes.brin
+        if not backed:
+            raise InvalidFilterError(
+                f"Filter on '{_camel(field)}' is not indexed; add an equality filter on "
+                f"one of: "
+                f"{', '.join(sorted(_camel(n) for n in indexes.btree & SELECTIVE_COLUMNS))}"
+            )
+
+    if not sort_expr:
+        return sort_expr
+    unindexed = {
+        field
+        for field, _ in normalize_sort(sort_expr)
+        if field in columns and field not in indexes.btree
+    }
+    if not unindexed:
+        return sort_expr
+    if settings.query_guard_mode != "downgrade":
+        raise InvalidSortError(
+            f"Sort on {', '.join(sorted(_camel(field) for field in unindexed))} is not "
+            f"indexed for an unfiltered {model.__tablename__} query"
+        )
+
+    logger.warning("Dropping unindexed sort keys on %s: %s", model.__tablename__, unindexed)
+    kept = [
+        clause
+        for clause in sort_expr.split(",")
+        if camel_to_snake(clause.strip().partition(" ")[0]) not in unindexed
+    ]
+    return ",".join(kept) or None
@@ -4,22 +4,160 @@ Parses OneRoster filter and sort expressions into SQLAlchemy queries.
 """
 
 import re
-from typing import Any, List
+from typing import Any, List, Optional, Set, Tuple
 
-from sqlalchemy import asc, desc
+from sqlalchemy import Enum, String, any_, asc, desc, func, literal
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 from sqlalchemy.orm import DeclarativeMeta
 
+from src.config.settings import settings
+
+# LIKE wildcards in a contains value are matched literally
+LIKE_ESCAPE = "\\"
+
+# Text search configuration of the generated search_vector columns
+SEARCH_CONFIG = "english"
+
+# field IN ('a','b',...): a parenthesized list of quoted values
+IN_CLAUSE = re.compile(r"([\w.]+)\s+IN\s*\((\s*'[^']*'(?:\s*,\s*'[^']*')*\s*)\)$")
+
+
+class InvalidFilterError(ValueError):
+    """Raised when a filter clause cannot be served (reported as HTTP 400)."""
+
+    code_minor = "invalid_filter_field"
+
+
+class InvalidSortError(ValueError):
+    """Raised when a sort key cannot be served (reported as HTTP 400)."""
+
+    code_minor = "invalid_sort_field"
+
+
+def contains_condition(attr: Any, value: str) -> Any:
+    """
+    Build the condition for a contains (~) clause.
+
+    The pattern is a plain ILIKE '%value%' on the column itself, which the
+    pg_trgm GIN indexes on the searchable text columns can answer.
+    Trigram lookups need at least three characters to be selective, so
+    shorter values are rejected (FILTER_CONTAINS_MIN_LENGTH) rather than
+    scanning the whole table.
+
+    Raises:
+        InvalidFilterError: If the column is not text or the value is too short
+    """
+    if not isinstance(attr.type, String) or isinstance(attr.type, Enum):
+        raise InvalidFilterError(f"Contains (~) is only supported on text fields: '{attr.key}'")
+    return _ilike_contains(attr, attr.key, value)
+
+
+def parse_in_clause(clause: str) -> Optional[Tuple[str, List[str]]]:
+    """Split a field IN ('a','b') clause into its field and values (None if it is not one)."""
+    match = IN_CLAUSE.match(clause.strip())
+    if not match:
+        return None
+    return match.group(1), re.findall(r"'([^']*)'", match.group(2))
+
+
+def in_condition(attr: Any, values: List[str]) -> Any:
+    """
+    Build the condition for an IN (...) clause.
+
+    Text columns get a single array parameter (column = ANY(:values)), so a
+    list of thousands of sourcedIds is still one short statement the
+    B-tree answers with one index scan.
+
+    Raises:
+        InvalidFilterError: If there are more than FILTER_IN_MAX_VALUES values
+    """
+    if len(values) > settings.filter_in_max_values:
+        raise InvalidFilterError(
+            f"IN filter on '{attr.key}' has {len(values)} values; "
+            f"at most {settings.filter_in_max_values} are allowed"
+        )
+    if isinstance(attr.type, String) and not isinstance(attr.type, Enum):
+        return attr == any_(literal(values, ARRAY(String)))
+    return attr.in_(values)
+
+
+def _ilike_contains(expression: Any, name: str, value: str) -> Any:
+    if len(value.strip()) < settings.filter_contains_min_length:
+        raise InvalidFilterError(
+            f"Contains (~) filter on '{name}' needs at least "
+            f"{settings.filter_contains_min_length} characters"
+        )
+    escaped = re.sub(r"([\\%_])", r"\\\1", value)
+    return expression.ilike(f"%{escaped}%", escape=LIKE_ESCAPE)
+
+
+def metadata_filter_keys() -> Set[str]:
+    """Metadata paths clients may filter on (METADATA_FILTER_KEYS)."""
+    return {key.strip() for key in settings.metadata_filter_keys.split(",") if key.strip()}
+
+
+def metadata_condition(column: Any, path: str, operator: str, value: str, quoted: bool) -> Any:
+    """
+    Build the condition for a filter on a key inside a JSONB metadata column.
+
+    '=' becomes containment (metadata @> '{"key": value}'), which the
+    jsonb_path_ops GIN indexes on metadata answer. The other operators
+    compare the JSON value at the path (-> / #>) and '~' its text (->>),
+    so they are only cheap combined with an indexed predicate; keys are
+    therefore limited to an allowlist.
+
+    Args:
+        column: JSONB column
+        path: Dotted key path, e.g. 'vendorId' or 'vendor.id'
+        operator: Filter operator
+        value: Filter value; a quoted value is a JSON string, a bare one a number
+        quoted: Whether the value was quoted
+
+    Raises:
+        InvalidFilterError: If the path is not allowlisted, or a contains
+            value is too short
+    """
+    if path not in metadata_filter_keys():
+        raise InvalidFilterError(f"Filtering on 'metadata.{path}' is not supported")
+
+    keys = path.split(".")
+    element = column[keys[0]] if len(keys) == 1 else column[tuple(keys)]
+    if operator == "~":
+        return _ilike_contains(element.astext, f"metadata.{path}", value)
+
+    if not quoted:
+        value = float(value) if "." in value else int(value)
+    if operator == "=":
+        document: Any = value
+        for key in reversed(keys):
+            document = {key: document}
+        return column.contains(document)
+
+    # JSON values compare by type first, then like the matching SQL type
+    value = literal(value, JSONB)
+    if operator == "!=":
+        return element != value
+    if operator == "<":
+        return element < value
+    if operator == "<=":
+        return element <= value
+    if operator == ">":
+        return element > value
+    return element >= value
+
 
 def parse_filter(filter_expr: str, model: DeclarativeMeta) -> List[Any]:
     """
     Parse OneRoster filter expression into SQLAlchemy filter conditions.
 
-    Supports operators: =, !=, <, <=, >, >=, ~
+    Supports operators: =, !=, <, <=, >, >=, ~, IN
     Examples:
         - title='Math'
         - weight>0.5
         - status='active'
         - title~'Math'  (contains)
+        - sourcedId IN ('r1','r2')
+        - metadata.vendorId='x'  (key in the metadata JSONB column)
 
     Args:
         filter_expr: OneRoster filter expression
@@ -27,6 +165,11 @@ def parse_filter(filter_expr: str, model: DeclarativeMeta) -> List[Any]:
 
     Returns:
         List of SQLAlchemy filter conditions
+
+    Raises:
+        InvalidFilterError: If a contains (~) clause cannot use the trigram
+            indexes, a metadata key is not in METADATA_FILTER_KEYS, or an IN
+            list is too long or on a metadata key
     """
     conditions = []
 
@@ -36,16 +179,36 @@ def parse_filter(filter_expr: str, model: DeclarativeMeta) -> List[Any]:
     for f in filters:
         f = f.strip()
 
+        in_clause = parse_in_clause(f)
+        if in_clause:
+            field_name, values = in_clause
+            if "." in field_name:
+                raise InvalidFilterError(f"IN is not supported on '{field_name}'")
+            field_name = camel_to_snake(field_name)
+            if hasattr(model, field_name):
+                conditions.append(in_condition(getattr(model, field_name), values))
+            continue
+
         # Parse filter expression
         # Operators: =, !=, <, <=, >, >=, ~
-        match = re.match(r"(\w+)\s*(=|!=|<|<=|>|>=|~)\s*'([^']*)'", f)
+        match = re.match(r"([\w.]+)\s*(=|!=|<|<=|>|>=|~)\s*'([^']*)'", f)
+        quoted = match is not None
         if not match:
             # Try without quotes for numbers
-            match = re.match(r"(\w+)\s*(=|!=|<|<=|>|>=)\s*(\d+(?:\.\d+)?)", f)
+            match = re.match(r"([\w.]+)\s*(=|!=|<|<=|>|>=)\s*(\d+(?:\.\d+)?)", f)
 
         if match:
             field_name, operator, value = match.groups()
 
+            # metadata.<path>: keys inside the JSONB metadata column
+            field_name, _, path = field_name.partition(".")
+            if path:
+                if camel_to_snake(field_name) == "metadata" and hasattr(model, "metadata_"):
+                    conditions.append(
+                        metadata_condition(model.metadata_, path, operator, value, quoted)
+                    )
+                continue
+
             # Convert camelCase to snake_case
             field_name = camel_to_snake(field_name)
 
@@ -55,6 +218,10 @@ def parse_filter(filter_expr: str, model: DeclarativeMeta) -> List[Any]:
 
             attr = getattr(model, field_name)
 
+            if operator == "~":
+                conditions.append(contains_condition(attr, value))
+                continue
+
             # Convert value to appropriate type
             if value.replace(".", "", 1).isdigit():
                 value = float(value) if "." in value else int(value)
@@ -72,13 +239,33 @@ def parse_filter(filter_expr: str, model: DeclarativeMeta) -> List[Any]:
                 conditions.append(attr > value)
             elif operator == ">=":
                 conditions.append(attr >= value)
-            elif operator == "~":
-                # Contains (case-insensitive)
-                conditions.append(attr.ilike(f"%{value}%"))
 
     return conditions
 
 
+def parse_search(search: str, model: DeclarativeMeta) -> Tuple[Any, Any]:
+    """
+    Parse a full-text search query against a model's search_vector column.
+
+    The query uses web search syntax: words are ANDed, "quoted phrases"
+    match in order, 'or' separates alternatives and a leading '-' excludes
+    a word.
+
+    Args:
+        search: Search query
+        model: SQLAlchemy model class with a generated search_vector column
+
+    Returns:
+        Tuple of (match condition, rank expression); higher ranks first,
+        with matches in weight 'A' fields (titles) outranking the rest
+    """
+    ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, search)
+    return (
+        model.search_vector.op("@@")(ts_query),
+        func.ts_rank_cd(model.search_vector, ts_query),
+    )
+
+
 def parse_sort(sort_expr: str, model: DeclarativeMeta) -> List[Any]:
     """
     Parse OneRoster sort expression into SQLAlchemy order_by clauses.
@@ -130,6 +317,61 @@ def parse_sort(sort_expr: str, model: DeclarativeMeta) -> List[Any]:
     return order_by_clauses
 
 
+def normalize_filter(filter_expr: str) -> Tuple[Tuple[str, str, str], ...]:
+    """
+    Reduce a filter expression to a canonical form for cache keys.
+
+    Clauses are parsed like parse_filter and sorted, so spacing and clause
+    order do not matter: "a='1' AND b>2" and "b > 2 AND a='1'" are equal.
+    Clauses parse_filter would ignore are dropped here too.
+
+    Returns:
+        Sorted tuple of (snake_case field, operator, value); the value of an
+        IN clause is its distinct quoted values, sorted and comma-separated
+    """
+    clauses = []
+    for f in filter_expr.split(" AND "):
+        f = f.strip()
+        in_clause = parse_in_clause(f)
+        if in_clause:
+            field_name, values = in_clause
+            quoted = ",".join(f"'{value}'" for value in sorted(set(values)))
+            clauses.append((camel_to_snake(field_name), "IN", quoted))
+            continue
+        match = re.match(r"([\w.]+)\s*(=|!=|<|<=|>|>=|~)\s*'([^']*)'", f)
+        if match:
+            field_name, operator, value = match.groups()
+            # Quoted and bare numbers differ for metadata (JSON string vs number)
+            value = f"'{value}'"
+        else:
+            match = re.match(r"([\w.]+)\s*(=|!=|<|<=|>|>=)\s*(\d+(?:\.\d+)?)", f)
+            if not match:
+                continue
+            field_name, operator, value = match.groups()
+        # Metadata paths keep their case; only the column name is converted
+        field_name, dot, path = field_name.partition(".")
+        clauses.append((camel_to_snake(field_name) + dot + path, operator, value))
+    return tuple(sorted(clauses))
+
+
+def normalize_sort(sort_expr: str) -> Tuple[Tuple[str, str], ...]:
+    """
+    Reduce a sort expression to a canonical form for cache keys.
+
+    Returns:
+        Tuple of (snake_case field, 'ASC' or 'DESC'), in sort order
+    """
+    clauses = []
+    for s in sort_expr.split(","):
+        s = s.strip()
+        if not s:
+            continue
+        field_name, _, direction = s.partition(" ")
+        direction = "DESC" if direction.strip().upper() == "DESC" else "ASC"
+        clauses.append((camel_to_snake(field_name), direction))
+    return tuple(clauses)
+
+
 def camel_to_snake(name: str) -> str:
     """
     Convert camelCase to snake_case.
@@ -0,0 +1,77 @@
+"""
+ScoreScale band lookup.
+Compiles a scale's JSON band list into sorted arrays once so mapping a score
+to its label is a bisect, with no per-score JSON handling.
+"""
+
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional, Sequence
+
+
+class CompiledScoreScale:
+    """
+    Score scale compiled for fast lookups.
+
+    Bands are sorted by their lower bound; a score maps to the band with the
+    greatest ``min`` not above it, so gaps such as 89..90 fall into the lower
+    band. Scores below the lowest ``min`` or above the highest ``max`` have
+    no label.
+    """
+
+    __slots__ = ("sourced_id", "thresholds", "labels", "ceiling")
+
+    def __init__(
+        self,
+        sourced_id: str,
+        thresholds: List[float],
+        labels: List[str],
+        ceiling: Optional[float],
+    ):
+        self.sourced_id = sourced_id
+        self.thresholds = thresholds
+        self.labels = labels
+        self.ceiling = ceiling
+
+    def label_for(self, score: Optional[float]) -> Optional[str]:
+        """Get the label for a numeric score, or None if outside the scale."""
+        if score is None:
+            return None
+        if self.ceiling is not None and score > self.ceiling:
+            return None
+        index = bisect_right(self.thresholds, score) - 1
+        if index < 0:
+            return None
+        return self.labels[index]
+
+
+def compile_score_scale(sourced_id: str, bands: Sequence[Dict[str, Any]]) -> CompiledScoreScale:
+    """
+    Compile a ScoreScale band list into a CompiledScoreScale.
+
+    Args:
+        sourced_id: ScoreScale sourcedId
+        bands: Band list, e.g. [{"label": "A", "min": 90, "max": 100}, ...]
+
+    Returns:
+        Compiled scale
+
+    Raises:
+        ValueError: If a band is malformed or two bands share a lower bound
+    """
+    if not bands:
+        raise ValueError("scoreScaleValue must contain at least one band")
+
+    try:
+        ordered = sorted(bands, key=lambda band: float(band["min"]))
+        thresholds = [float(band["min"]) for band in ordered]
+        labels = [str(band["label"]) for band in ordered]
+        maxima = [float(band["max"]) for band in ordered if band.get("max") is not None]
+    except (KeyError, TypeError, ValueError) as exc:
+        raise ValueError(f"Invalid scoreScaleValue band: {exc}") from exc
+
+    if len(set(thresholds)) != len(thresholds):
+        raise ValueError("scoreScaleValue bands must have distinct 'min' values")
+
+    # The top band's max caps the scale; without one the scale is open-ended.
+    ceiling = max(maxima) if maxima and ordered[-1].get("max") is not None else None
+    return CompiledScoreScale(sourced_id, thresholds, labels, ceiling)
@@ -0,0 +1,49 @@
+"""
+Single-flight execution of identical concurrent calls.
+"""
+
+import asyncio
+from typing import Any, Callable, Dict, Hashable
+
+from starlette.concurrency import run_in_threadpool
+
+
+class SingleFlight:
+    """
+    Per-worker deduplication of identical in-flight calls.
+
+    The first caller for a key runs the (blocking) function in the
+    threadpool; callers arriving with the same key while it runs await the
+    same outcome instead of running it again. Nothing is kept once the call
+    finishes, so it complements a cache rather than replacing one.
+    """
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.shared = 0
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+
+    async def run(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn once for all concurrent callers with the same key.
+
+        Raises:
+            Whatever fn raised, to every caller that shared the call
+        """
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.shared += 1
+        else:
+            self.calls += 1
+            task = asyncio.ensure_future(run_in_threadpool(fn))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        # shield: a caller that goes away must not cancel the shared call
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # Mark any error retrieved even if every caller went away
+            task.exception()
@@ -0,0 +1,50 @@
+"""
+Create-or-replace (PUT) statement helpers.
+"""
+
+from typing import Any, Dict, List, Union
+
+from sqlalchemy import literal_column
+from sqlalchemy.dialects.postgresql import Insert, insert
+from sqlalchemy.orm import DeclarativeMeta
+
+from src.utils.partitioning import is_partitioned
+
+# Columns a replace never overwrites; date_last_modified is set by the
+# update_*_modtime trigger when the conflicting row is updated. Generated
+# columns (e.g. search_vector) are recomputed by the database.
+PRESERVED_COLUMNS = ("sourced_id", "created_at", "date_last_modified")
+
+# A row was inserted, not replaced, when xmax is still 0. Partitioned tables
+# cannot return system columns; there created_at defaults to the statement
+# timestamp (migrations/012_partition_results.sql) and is never replaced.
+INSERTED = literal_column("(xmax = 0)")
+INSERTED_PARTITIONED = literal_column("(created_at = statement_timestamp())")
+
+
+def build_upsert(
+    model: DeclarativeMeta, values: Union[Dict[str, Any], List[Dict[str, Any]]]
+) -> Insert:
+    """
+    Build an INSERT ... ON CONFLICT DO UPDATE on the primary key for full rows.
+
+    The statement returns the row and an ``inserted`` flag. The flag is true
+    when the row was created and false when an existing row, active or
+    tombstoned, was replaced.
+
+    Args:
+        model: Mapped class with a sourced_id primary key
+        values: Row values keyed by mapped attribute name, or a list of
+            rows with distinct sourced_ids for a multi-row upsert
+    """
+    stmt = insert(model).values(values)
+    replaced = {
+        column.name: stmt.excluded[column.name]
+        for column in model.__table__.columns
+        if column.name not in PRESERVED_COLUMNS and column.computed is None
+    }
+    # Named, since a partitioned table's key also holds the partition key
+    inserted = INSERTED_PARTITIONED if is_partitioned(model) else INSERTED
+    return stmt.on_conflict_do_update(
+        constraint=f"{model.__tablename__}_pkey", set_=replaced
+    ).returning(model, inserted.label("inserted"))
@@ -8,15 +8,24 @@ from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
 
 from src.config.database import get_db
+from src.config.settings import settings
 from src.main import app
 from src.models.models import Category, LineItem, Result, ScoreStatusEnum, StatusEnum
+from src.services.collection_cache import collection_cache
+from src.services.resource_cache import resource_cache
+
+# Tests roll back instead of committing, so no change is ever announced;
+# test_change_listener.py runs its own listener.
+settings.cache_invalidation_listener_enabled = False
 
 # Test database URL (use a separate test database)
 TEST_DATABASE_URL = "postgresql://oneroster_user:oneroster_pass@db:5432/oneroster_gradebook"
 
 # Create test engine
 engine = create_engine(TEST_DATABASE_URL, isolation_level="READ COMMITTED")
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+TestingSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
+)
 
 
 @pytest.fixture(scope="function")
@@ -66,6 +75,11 @@ def client(db_session):
             pass
 
     app.dependency_overrides[get_db] = override_get_db
+    # Give every test its own token endpoint rate limit budget
+    app.state.limiter.reset()
+    # Rolled-back rows must not be served from the previous test's cache
+    resource_cache.clear()
+    collection_cache.clear()
 
     with TestClient(app) as test_client:
         yield test_client
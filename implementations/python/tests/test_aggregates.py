@@ -0,0 +1,103 @@
+"""
+Tests for incrementally maintained result aggregates.
+"""
+
+from src.models.models import Result, ScoreStatusEnum, StatusEnum
+from src.services.aggregate_service import AggregateService
+
+
+def test_line_item_aggregate_after_create(client, oauth_token, sample_result):
+    """Test that creating a result updates the line item aggregate."""
+    response = client.get(
+        f"/ims/oneroster/v1p2/lineItems/{sample_result.line_item_sourced_id}/aggregate",
+        headers={"Authorization": f"Bearer {oauth_token}"},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["count"] == 1
+    assert data["mean"] == 85.5
+    assert data["min"] == 85.5
+    assert data["max"] == 85.5
+
+
+def test_line_item_aggregate_tracks_updates_and_deletes(
+    client, oauth_token, db_session, sample_line_item
+):
+    """Test that updates and soft deletes are applied incrementally."""
+    for i, score in enumerate([70.0, 80.0, 90.0]):
+        db_session.add(
+            Result(
+                sourced_id=f"test-agg-{i}",
+                status=StatusEnum.active,
+                line_item_sourced_id=sample_line_item.sourced_id,
+                student_sourced_id=f"student-agg-{i}",
+                score_status=ScoreStatusEnum.earnedPartial,
+                score=score,
+            )
+        )
+    db_session.commit()
+
+    headers = {"Authorization": f"Bearer {oauth_token}"}
+    client.put("/ims/oneroster/v1p2/results/test-agg-0", headers=headers, json={"score": 100.0})
+    client.delete("/ims/oneroster/v1p2/results/test-agg-2", headers=headers)
+
+    response = client.get(
+        f"/ims/oneroster/v1p2/lineItems/{sample_line_item.sourced_id}/aggregate",
+        headers=headers,
+    )
+
+    data = response.json()
+    assert data["count"] == 2
+    assert data["sum"] == 180.0
+    assert data["min"] == 80.0
+    assert data["max"] == 100.0
+
+
+def test_line_item_aggregate_without_scores(client, oauth_token, sample_line_item):
+    """Test aggregate for a line item with no scored results."""
+    response = client.get(
+        f"/ims/oneroster/v1p2/lineItems/{sample_line_item.sourced_id}/aggregate",
+        headers={"Authorization": f"Bearer {oauth_token}"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["count"] == 0
+
+
+def test_line_item_aggregate_not_found(client, oauth_token):
+    """Test aggregate for a non-existent line item."""
+    response = client.get(
+        "/ims/oneroster/v1p2/lineItems/non-existent-id/aggregate",
+        headers={"Authorization": f"Bearer {oauth_token}"},
+    )
+
+    assert response.status_code == 404
+
+
+def test_student_aggregates(client, oauth_token, sample_result, sample_category):
+    """Test running per-category aggregates for a student."""
+    response = client.get(
+        f"/ims/oneroster/v1p2/students/{sample_result.student_sourced_id}/aggregates",
+        headers={"Authorization": f"Bearer {oauth_token}"},
+    )
+
+    assert response.status_code == 200
+    categories = {c["categorySourcedId"]: c for c in response.json()["categories"]}
+    assert categories[sample_category.sourced_id]["count"] == 1
+    assert categories[sample_category.sourced_id]["mean"] == 85.5
+
+
+def test_rebuild_aggregates(db_session, sample_result):
+    """Test that rebuild repairs drifted aggregates."""
+    service = AggregateService(db_session)
+    aggregate = service.get_line_item_aggregate(sample_result.line_item_sourced_id)
+    aggregate.score_count = 42
+    db_session.commit()
+
+    report = service.rebuild()
+
+    assert report["lineItemAggregates"] >= 1
+    db_session.expire_all()
+    aggregate = service.get_line_item_aggregate(sample_result.line_item_sourced_id)
+    assert aggregate.score_count == 1
@@ -0,0 +1,168 @@
+"""Tests for in-process cache utilities."""
+
+import asyncio
+import time
+
+from sqlalchemy import text
+
+from src.services.collection_cache import cached_collection, collection_cache
+from src.services.resource_cache import resource_cache
+from src.utils.cache import TTLCache
+from src.utils.singleflight import SingleFlight
+
+
+def test_cache_get_and_set():
+    """Test storing and reading a cached value."""
+    cache = TTLCache(max_entries=10, ttl_seconds=60)
+    cache.set("key", {"value": 1})
+
+    assert cache.get("key") == {"value": 1}
+    assert cache.get("missing") is None
+
+
+def test_cache_evicts_least_recently_used():
+    """Test that the cache stays bounded and evicts LRU entries."""
+    cache = TTLCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert len(cache) == 2
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+
+
+def test_cache_entries_expire():
+    """Test that entries expire after the TTL."""
+    cache = TTLCache(max_entries=10, ttl_seconds=0)
+    cache.set("key", 1)
+
+    assert cache.get("key") is None
+
+
+def test_cache_delete_and_clear():
+    """Test explicit invalidation."""
+    cache = TTLCache(max_entries=10, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    cache.delete("a")
+    assert cache.get("a") is None
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_cache_counts_hits_and_misses():
+    """Test hit/miss metrics."""
+    cache = TTLCache(max_entries=10, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("a")
+    cache.get("b")
+
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["entries"] == 1
+    assert stats["hitRate"] == round(2 / 3, 4)
+
+
+def test_resource_cache_is_invalidated_by_writes(client, oauth_token, sample_line_item):
+    """Test that a cached line item is served until a write replaces it."""
+    headers = {"Authorization": f"Bearer {oauth_token}"}
+    url = f"/ims/oneroster/v1p2/lineItems/{sample_line_item.sourced_id}"
+
+    client.get(url, headers=headers)
+    hits = resource_cache.hits
+    assert client.get(url, headers=headers).json()["title"] == sample_line_item.title
+    assert resource_cache.hits == hits + 1
+
+    client.put(url, headers=headers, json={"title": "Renamed"})
+    assert client.get(url, headers=headers).json()["title"] == "Renamed"
+
+    client.delete(url, headers=headers)
+    assert client.get(url, headers=headers).status_code == 404
+
+
+def test_collection_cache_serves_equivalent_queries(client, oauth_token, sample_line_item):
+    """Test that equivalent collection queries share an entry until a write."""
+    headers = {"Authorization": f"Bearer {oauth_token}"}
+    url = "/ims/oneroster/v1p2/lineItems"
+    class_filter = f"classSourcedId='class-001' AND title='{sample_line_item.title}'"
+    reordered = f"title = '{sample_line_item.title}' AND classSourcedId = 'class-001'"
+
+    first = client.get(url, headers=headers, params={"filter": class_filter})
+    hits = collection_cache.hits
+    second = client.get(url, headers=headers, params={"filter": reordered})
+
+    assert collection_cache.hits == hits + 1
+    assert second.content == first.content
+
+    client.post(
+        url,
+        headers=headers,
+        json={
+            "sourcedId": "test-li-cached",
+            "title": sample_line_item.title,
+            "classSourcedId": "class-001",
+            "assignDate": "2024-01-01T00:00:00Z",
+            "dueDate": "2024-01-08T00:00:00Z",
+        },
+    )
+    third = client.get(url, headers=headers, params={"filter": class_filter})
+
+    assert third.json()["total"] == first.json()["total"] + 1
+
+
+def test_singleflight_shares_concurrent_calls():
+    """Test that concurrent calls with one key run the function once."""
+    flights = SingleFlight()
+    executions = []
+
+    def slow_query():
+        executions.append(1)
+        time.sleep(0.05)
+        return b"page"
+
+    async def run():
+        return await asyncio.gather(*(flights.run("key", slow_query) for _ in range(30)))
+
+    assert asyncio.run(run()) == [b"page"] * 30
+    assert len(executions) == 1
+    assert flights.shared == 29
+
+
+def test_singleflight_shares_errors():
+    """Test that every caller of a failed shared call sees the error."""
+    flights = SingleFlight()
+
+    def failing_query():
+        time.sleep(0.05)
+        raise ValueError("boom")
+
+    async def run():
+        return await asyncio.gather(
+            *(flights.run("key", failing_query) for _ in range(3)), return_exceptions=True
+        )
+
+    assert all(isinstance(outcome, ValueError) for outcome in asyncio.run(run()))
+    assert flights.calls == 1
+
+
+def test_shared_collection_build_outlives_request_session(db_session):
+    """Test that the shared build runs on its own session with the request's timeout."""
+    db_session.info["statement_timeout_ms"] = 1234
+    sessions = []
+
+    def build(session):
+        sessions.append(session)
+        # The request that started the build went away
+        db_session.close()
+        return {"timeout": session.execute(text("SHOW statement_timeout")).scalar()}
+
+    response = asyncio.run(cached_collection(db_session, ("test-own-session",), (), build))
+
+    assert response.body == b'{"timeout":"1234ms"}'
+    assert sessions[0] is not db_session
@@ -200,6 +200,17 @@ def test_get_categories_with_filter(client, oauth_token, db_session):
     assert any("Math" in cat["title"] for cat in data["data"])
 
 
+def test_get_categories_with_short_contains_filter(client, oauth_token):
+    """Test that a contains filter too short for the trigram index is a 400."""
+    response = client.get(
+        "/ims/oneroster/v1p2/categories?filter=title~'M'",
+        headers={"Authorization": f"Bearer {oauth_token}"},
+    )
+
+    assert response.status_code == 400
+    assert response.json()["imsx_codeMinor"] == "invalid_filter_field"
+
+
 def test_get_categories_with_sort(client, oauth_token, db_session):
     """Test sorting categories."""
     # Create categories with different weights
@@ -235,7 +246,7 @@ def test_get_categories_with_sort(client, oauth_token, db_session):
 
 
 def test_update_nonexistent_category(client, oauth_token):
-    """Test updating a category that doesn't exist."""
+    """Test that a partial PUT of a category that doesn't exist is 404."""
     token_response = client.post(
         "/oauth/token",
         data={
@@ -250,12 +261,107 @@ def test_update_nonexistent_category(client, oauth_token):
     response = client.put(
         "/ims/oneroster/v1p2/categories/nonexistent-id",
         headers={"Authorization": f"Bearer {token}"},
-        json={"title": "Updated Title"},
+        json={"weight": 0.5},
     )
 
     assert response.status_code == 404
 
 
+def test_put_creates_then_replaces_category(client, oauth_token):
+    """Test that PUT with a full category creates it (201) and then replaces it (200)."""
+    token_response = client.post(
+        "/oauth/token",
+        data={
+            "grant_type": "client_credentials",
+            "client_id": "test_client",
+            "client_secret": "test_secret",
+            "scope": "https://purl.imsglobal.org/spec/or/v1p2/scope/results.createput",
+        },
+    )
+    headers = {"Authorization": f"Bearer {token_response.json()['access_token']}"}
+
+    created = client.put(
+        "/ims/oneroster/v1p2/categories/test-put-category",
+        headers=headers,
+        json={"sourcedId": "test-put-category", "title": "Created by PUT", "weight": 0.4},
+    )
+    replaced = client.put(
+        "/ims/oneroster/v1p2/categories/test-put-category",
+        headers=headers,
+        json={"sourcedId": "test-put-category", "title": "Replaced by PUT"},
+    )
+
+    assert created.status_code == 201
+    assert created.json()["sourcedId"] == "test-put-category"
+    assert replaced.status_code == 200
+    assert replaced.json()["title"] == "Replaced by PUT"
+    assert replaced.json()["weight"] is None
+
+
+def test_put_without_sourced_id_is_partial_update(client, oauth_token, sample_category):
+    """Test that a title-only PUT updates the title and keeps the other fields."""
+    token_response = client.post(
+        "/oauth/token",
+        data={
+            "grant_type": "client_credentials",
+            "client_id": "test_client",
+            "client_secret": "test_secret",
+            "scope": "https://purl.imsglobal.org/spec/or/v1p2/scope/results.createput",
+        },
+    )
+    headers = {"Authorization": f"Bearer {token_response.json()['access_token']}"}
+
+    response = client.put(
+        f"/ims/oneroster/v1p2/categories/{sample_category.sourced_id}",
+        headers=headers,
+        json={"title": "Renamed Category"},
+    )
+    mistyped = client.put(
+        f"/ims/oneroster/v1p2/categories/{sample_category.sourced_id}-typo",
+        headers=headers,
+        json={"title": "Renamed Category"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["title"] == "Renamed Category"
+    assert response.json()["weight"] == 0.5
+    assert mistyped.status_code == 404
+
+
+def test_partial_put_rejects_status(client, oauth_token, sample_category):
+    """Test that a partial PUT naming status is rejected rather than ignored."""
+    response = client.put(
+        f"/ims/oneroster/v1p2/categories/{sample_category.sourced_id}",
+        headers={"Authorization": f"Bearer {oauth_token}"},
+        json={"title": "Renamed Category", "status": "tobedeleted"},
+    )
+
+    assert response.status_code == 400
+    assert "status" in response.json()["imsx_description"]
+
+
+def test_put_sourced_id_must_match_path(client, oauth_token, sample_category):
+    """Test that a full PUT whose sourcedId differs from the path is rejected."""
+    token_response = client.post(
+        "/oauth/token",
+        data={
+            "grant_type": "client_credentials",
+            "client_id": "test_client",
+            "client_secret": "test_secret",
+            "scope": "https://purl.imsglobal.org/spec/or/v1p2/scope/results.createput",
+        },
+    )
+    headers = {"Authorization": f"Bearer {token_response.json()['access_token']}"}
+
+    response = client.put(
+        f"/ims/oneroster/v1p2/categories/{sample_category.sourced_id}",
+        headers=headers,
+        json={"sourcedId": "another-category", "title": "Replaced by PUT"},
+    )
+
+    assert response.status_code == 422
+
+
 def test_delete_nonexistent_category(client, oauth_token):
     """Test deleting a category that doesn't exist."""
     token_response = client.post(
@@ -0,0 +1,55 @@
+"""
+Tests for cross-worker cache invalidation via LISTEN/NOTIFY.
+"""
+
+import json
+import time
+
+from sqlalchemy import text
+
+from src.services.change_listener import CHANNEL, ChangeListener, apply_change
+from src.services.resource_cache import resource_cache, table_version
+from src.services.statistics_service import statistics_cache
+from tests.conftest import TEST_DATABASE_URL, engine
+
+
+def _payload(table: str, sourced_id: str, line_item_sourced_id: str = None) -> str:
+    return json.dumps(
+        {"table": table, "sourcedId": sourced_id, "lineItemSourcedId": line_item_sourced_id}
+    )
+
+
+def test_apply_change_invalidates_caches():
+    """Test that a result change drops the result and its line item's statistics."""
+    resource_cache.set(("results", "test-notify-result"), ({}, None))
+    statistics_cache.set("test-notify-li", {10: {}})
+    version = table_version("results")
+
+    apply_change(_payload("results", "test-notify-result", "test-notify-li"))
+
+    assert resource_cache.get(("results", "test-notify-result")) is None
+    assert statistics_cache.get("test-notify-li") is None
+    assert table_version("results") > version
+
+
+def test_listener_applies_notifications():
+    """Test that a notification committed by another connection reaches the listener."""
+    listener = ChangeListener(dsn=TEST_DATABASE_URL)
+    listener.start()
+    try:
+        assert listener.listening.wait(timeout=5)
+        resource_cache.set(("lineItems", "test-notify-li"), ({}, None))
+
+        with engine.connect() as connection:
+            connection.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": CHANNEL, "payload": _payload("line_items", "test-notify-li")},
+            )
+            connection.commit()
+
+        deadline = time.monotonic() + 5
+        while resource_cache.get(("lineItems", "test-notify-li")) is not None:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+    finally:
+        listener.stop()
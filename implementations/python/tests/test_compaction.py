@@ -0,0 +1,106 @@
+"""
+Tests for tombstone compaction into the archive tables.
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import text
+
+from src.models.models import Category, LineItem, Result, ScoreStatusEnum, StatusEnum
+from src.services.compaction_service import CompactionService
+
+OLD = datetime(2001, 1, 1, tzinfo=timezone.utc)
+
+
+def _exists(db_session, table: str, sourced_id: str) -> bool:
+    return bool(
+        db_session.execute(
+            text(f"SELECT COUNT(*) FROM {table} WHERE sourced_id = :id"), {"id": sourced_id}
+        ).scalar()
+    )
+
+
+@pytest.fixture
+def tombstones(db_session):
+    """Create an old tombstoned line item with a tombstoned result, plus a recent tombstone."""
+    line_item = LineItem(
+        sourced_id="test-compact-li",
+        status=StatusEnum.tobedeleted,
+        date_last_modified=OLD,
+        title="Compacted Line Item",
+        assign_date=OLD,
+        due_date=OLD,
+        class_sourced_id="class-001",
+    )
+    db_session.add(line_item)
+    db_session.flush()
+    db_session.add_all(
+        [
+            Result(
+                sourced_id="test-compact-result",
+                status=StatusEnum.tobedeleted,
+                date_last_modified=OLD,
+                line_item_sourced_id=line_item.sourced_id,
+                student_sourced_id="student-001",
+                score_status=ScoreStatusEnum.earnedFull,
+                score=50,
+                score_date=OLD,
+            ),
+            Category(
+                sourced_id="test-compact-recent",
+                status=StatusEnum.tobedeleted,
+                title="Recently Deleted",
+            ),
+        ]
+    )
+    db_session.commit()
+
+
+def test_compact_moves_old_tombstones(db_session, tombstones):
+    """Test that old tombstones move to the archive in dependency order."""
+    report = CompactionService(db_session).compact(retention_days=30, batch_size=1)
+
+    assert report["archived"]["results"] >= 1
+    assert report["archived"]["line_items"] >= 1
+    assert not _exists(db_session, "results", "test-compact-result")
+    assert not _exists(db_session, "line_items", "test-compact-li")
+    assert _exists(db_session, "results_archive", "test-compact-result")
+    assert _exists(db_session, "line_items_archive", "test-compact-li")
+    # Within the retention window
+    assert _exists(db_session, "categories", "test-compact-recent")
+
+
+def test_compact_keeps_line_item_with_active_results(db_session, sample_result):
+    """Test that a tombstoned line item is kept while results still reference it."""
+    db_session.execute(
+        text(
+            "UPDATE line_items SET status = 'tobedeleted' WHERE sourced_id = :id;"
+            "ALTER TABLE line_items DISABLE TRIGGER update_line_items_modtime;"
+            "UPDATE line_items SET date_last_modified = :old WHERE sourced_id = :id;"
+            "ALTER TABLE line_items ENABLE TRIGGER update_line_items_modtime"
+        ),
+        {"id": sample_result.line_item_sourced_id, "old": OLD},
+    )
+    db_session.commit()
+
+    CompactionService(db_session).compact(retention_days=30)
+
+    assert _exists(db_session, "line_items", sample_result.line_item_sourced_id)
+    assert _exists(db_session, "results", sample_result.sourced_id)
+
+
+def test_delta_sync_before_horizon_is_gone(client, oauth_token, db_session, tombstones):
+    """Test that delta sync rejects watermarks older than the last compaction."""
+    report = CompactionService(db_session).compact(retention_days=30)
+    headers = {"Authorization": f"Bearer {oauth_token}"}
+
+    stale = client.get(
+        "/ims/oneroster/v1p2/results?changedSince=2000-01-01T00:00:00Z", headers=headers
+    )
+    fresh = client.get(
+        f"/ims/oneroster/v1p2/results?changedSince={report['cutoff']}", headers=headers
+    )
+
+    assert stale.status_code == 410
+    assert fresh.status_code == 200
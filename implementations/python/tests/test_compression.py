@@ -0,0 +1,63 @@
+"""
+Tests for response compression.
+"""
+
+from src.config.settings import settings
+from src.middleware.compression import negotiate
+from src.services.collection_cache import collection_cache
+
+
+def test_negotiate_encoding():
+    """Test Accept-Encoding negotiation with q-values."""
+    assert negotiate("gzip, deflate") == "gzip"
+    assert negotiate("deflate, gzip;q=0.5") == "gzip"
+    assert negotiate("gzip;q=0") is None
+    assert negotiate("identity") is None
+    assert negotiate("*") is not None
+    assert negotiate(None) is None
+
+
+def test_cached_collection_reuses_compressed_body(client, oauth_token, sample_result, monkeypatch):
+    """Test that a cached collection is compressed once and reused."""
+    monkeypatch.setattr(settings, "compression_min_size", 1)
+    headers = {"Authorization": f"Bearer {oauth_token}", "Accept-Encoding": "gzip"}
+
+    first = client.get("/ims/oneroster/v1p2/results", headers=headers)
+    second = client.get("/ims/oneroster/v1p2/results", headers=headers)
+    identity = client.get(
+        "/ims/oneroster/v1p2/results", headers={**headers, "Accept-Encoding": "identity"}
+    )
+
+    assert first.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in first.headers["vary"]
+    assert second.json() == first.json()
+    assert "content-encoding" not in identity.headers
+    assert identity.json() == first.json()
+    (body,) = [entry for _, entry in collection_cache._entries.values()]
+    assert set(body.variants) == {"gzip"}
+
+
+def test_streamed_export_is_compressed(client, oauth_token):
+    """Test that a streamed delta sync page is compressed on the fly."""
+    response = client.get(
+        "/ims/oneroster/v1p2/results",
+        headers={"Authorization": f"Bearer {oauth_token}", "Accept-Encoding": "gzip"},
+        params={"changedSince": "2000-01-01T00:00:00Z"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert "data" in response.json()
+
+
+def test_small_responses_are_not_compressed(client, oauth_token, sample_category):
+    """Test that bodies below the threshold are sent uncompressed."""
+    response = client.get(
+        f"/ims/oneroster/v1p2/categories/{sample_category.sourced_id}",
+        headers={"Authorization": f"Bearer {oauth_token}", "Accept-Encoding": "gzip"},
+    )
+
+    assert "content-encoding" not in response.headers
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.headers["etag"].startswith('"')
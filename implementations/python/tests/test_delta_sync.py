@@ -0,0 +1,110 @@
+"""
+Tests for delta sync (changedSince / cursor) collection mode.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.config.settings import settings
+from src.models.models import Category, StatusEnum
+from src.utils.delta_sync import decode_cursor, encode_cursor, parse_changed_since
+
+
+@pytest.fixture(autouse=True)
+def no_safety_lag(monkeypatch):
+    """Serve rows immediately; the lag only matters with concurrent writers."""
+    monkeypatch.setattr(settings, "delta_sync_safety_lag_seconds", 0)
+
+
+@pytest.fixture
+def sync_categories(db_session):
+    """Create categories with known modification times."""
+    base = datetime(2030, 1, 1, tzinfo=timezone.utc)
+    categories = []
+    for i in range(3):
+        category = Category(
+            sourced_id=f"test-sync-{i}",
+            status=StatusEnum.active if i < 2 else StatusEnum.tobedeleted,
+            date_last_modified=base + timedelta(minutes=i),
+            title=f"Sync Category {i}",
+        )
+        db_session.add(category)
+        categories.append(category)
+    db_session.commit()
+    return categories
+
+
+def test_cursor_round_trip():
+    """Test that cursors encode and decode the watermark losslessly."""
+    watermark = (datetime(2030, 1, 1, 12, 0, 0, 123456, tzinfo=timezone.utc), "cat-1")
+
+    assert decode_cursor(encode_cursor(watermark)) == watermark
+
+
+def test_parse_changed_since_defaults_to_utc():
+    """Test that naive changedSince timestamps are taken as UTC."""
+    since, sourced_id = parse_changed_since("2030-01-01T00:00:00")
+
+    assert since.tzinfo is not None
+    assert sourced_id == ""
+
+
+def test_changed_since_includes_tombstones(client, oauth_token, sync_categories):
+    """Test that delta sync returns tombstones in watermark order."""
+    response = client.get(
+        "/ims/oneroster/v1p2/categories?changedSince=2030-01-01T00:00:00Z",
+        headers={"Authorization": f"Bearer {oauth_token}"},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [c["sourcedId"] for c in data["data"]] == ["test-sync-0", "test-sync-1", "test-sync-2"]
+    assert data["data"][2]["status"] == "tobedeleted"
+    assert data["hasMore"] is False
+
+
+def test_cursor_resumes_after_last_row(client, oauth_token, sync_categories):
+    """Test paging through changes with nextCursor."""
+    headers = {"Authorization": f"Bearer {oauth_token}"}
+    first = client.get(
+        "/ims/oneroster/v1p2/categories?changedSince=2030-01-01T00:00:00Z&limit=2",
+        headers=headers,
+    ).json()
+    assert [c["sourcedId"] for c in first["data"]] == ["test-sync-0", "test-sync-1"]
+    assert first["hasMore"] is True
+
+    second = client.get(
+        f"/ims/oneroster/v1p2/categories?cursor={first['nextCursor']}&limit=2",
+        headers=headers,
+    ).json()
+    assert [c["sourcedId"] for c in second["data"]] == ["test-sync-2"]
+
+    third = client.get(
+        f"/ims/oneroster/v1p2/categories?cursor={second['nextCursor']}",
+        headers=headers,
+    ).json()
+    assert third["data"] == []
+    assert third["nextCursor"] == second["nextCursor"]
+
+
+def test_changed_since_on_results(client, oauth_token, sample_result):
+    """Test that results collections support delta sync too."""
+    response = client.get(
+        "/ims/oneroster/v1p2/results?changedSince=2000-01-01T00:00:00Z"
+        f"&filter=sourcedId='{sample_result.sourced_id}'",
+        headers={"Authorization": f"Bearer {oauth_token}"},
+    )
+
+    assert response.status_code == 200
+    assert [r["sourcedId"] for r in response.json()["data"]] == [sample_result.sourced_id]
+
+
+def test_invalid_cursor(client, oauth_token):
+    """Test that a malformed cursor is rejected."""
+    response = client.get(
+        "/ims/oneroster/v1p2/lineItems?cursor=not-a-cursor",
+        headers={"Authorization": f"Bearer {oauth_token}"},
+    )
+
+    assert response.status_code == 400
@@ -0,0 +1,100 @@
+"""
+Tests for ETag / If-Match optimistic concurrency on single resources.
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from src.utils.etag import etag_matches, make_etag, parse_etag, parse_if_match
+
+
+@pytest.fixture
+def headers(oauth_token):
+    """Authorization headers with all gradebook scopes."""
+    return {"Authorization": f"Bearer {oauth_token}"}
+
+
+def test_etag_round_trip():
+    """Test that an ETag maps back to the exact dateLastModified."""
+    modified = datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+
+    assert parse_etag(make_etag(modified)) == modified
+    assert parse_etag("W/" + make_etag(modified)) == modified
+    assert etag_matches(f'"1", {make_etag(modified)}', make_etag(modified))
+    assert etag_matches("*", make_etag(modified))
+    assert parse_if_match("*") is None
+    with pytest.raises(ValueError):
+        parse_if_match('"1", "2"')
+
+
+def test_out_of_range_etag_is_malformed(client, headers, sample_category):
+    """Test that an ETag beyond the datetime range fails the precondition instead of a 500."""
+    url = f"/ims/oneroster/v1p2/categories/{sample_category.sourced_id}"
+    huge = {**headers, "If-Match": '"99999999999999999999999"'}
+
+    with pytest.raises(ValueError):
+        parse_etag('"-99999999999999999999999"')
+    put = client.put(url, headers=huge, json={"title": "Lost update"})
+    delete = client.delete(url, headers=huge)
+
+    assert put.status_code == 412
+    assert delete.status_code == 412
+
+
+def test_get_returns_etag_and_304(client, headers, sample_result):
+    """Test that a GET carries an ETag and revalidates with 304."""
+    url = f"/ims/oneroster/v1p2/results/{sample_result.sourced_id}"
+
+    first = client.get(url, headers=headers)
+    etag = first.headers["ETag"]
+    revalidated = client.get(url, headers={**headers, "If-None-Match": etag})
+    stale = client.get(url, headers={**headers, "If-None-Match": '"1"'})
+
+    assert first.status_code == 200
+    assert revalidated.status_code == 304
+    assert revalidated.headers["ETag"] == etag
+    assert revalidated.content == b""
+    assert stale.status_code == 200
+
+
+def test_put_with_matching_if_match(client, headers, sample_line_item):
+    """Test that a PUT naming the current version is applied."""
+    url = f"/ims/oneroster/v1p2/lineItems/{sample_line_item.sourced_id}"
+    etag = client.get(url, headers=headers).headers["ETag"]
+
+    response = client.put(url, headers={**headers, "If-Match": etag}, json={"title": "Renamed"})
+
+    assert response.status_code == 200
+    assert response.json()["title"] == "Renamed"
+    assert "ETag" in response.headers
+
+
+def test_stale_if_match_is_rejected(client, headers, sample_category):
+    """Test that writes naming an old version fail with 412 and change nothing."""
+    url = f"/ims/oneroster/v1p2/categories/{sample_category.sourced_id}"
+    stale = {**headers, "If-Match": '"1"'}
+
+    put = client.put(url, headers=stale, json={"title": "Lost update"})
+    delete = client.delete(url, headers=stale)
+    malformed = client.delete(url, headers={**headers, "If-Match": "not-an-etag"})
+
+    assert put.status_code == 412
+    assert delete.status_code == 412
+    assert malformed.status_code == 412
+    assert client.get(url, headers=headers).json()["title"] == sample_category.title
+
+
+def test_if_match_on_missing_resource(client, headers):
+    """Test that a conditional write to a missing resource fails and creates nothing."""
+    url = "/ims/oneroster/v1p2/categories/test-etag-missing"
+
+    put = client.put(url, headers={**headers, "If-Match": "*"}, json={"title": "New"})
+    delete_any = client.delete(url, headers={**headers, "If-Match": "*"})
+    delete = client.delete(url, headers={**headers, "If-Match": '"1"'})
+
+    # If-Match: * requires a current representation (RFC 9110 13.1.1)
+    assert put.status_code == 412
+    assert delete_any.status_code == 412
+    assert delete.status_code == 404
+    assert client.get(url, headers=headers).status_code == 404
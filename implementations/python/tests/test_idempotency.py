@@ -0,0 +1,166 @@
+"""
+Tests for Idempotency-Key handling of write requests.
+"""
+
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from starlette.responses import JSONResponse
+
+from src.middleware.idempotency import (
+    CLAIMED,
+    IN_PROGRESS,
+    MISMATCH,
+    REPLAY,
+    IdempotencyMiddleware,
+    MemoryIdempotencyStore,
+    PostgresIdempotencyStore,
+)
+from src.models.models import Result
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture
+def createput_headers(client):
+    """Authorization headers with the results.createput scope."""
+    token_response = client.post(
+        "/oauth/token",
+        data={
+            "grant_type": "client_credentials",
+            "client_id": "test_client",
+            "client_secret": "test_secret",
+            "scope": "https://purl.imsglobal.org/spec/or/v1p2/scope/results.createput",
+        },
+    )
+    return {"Authorization": f"Bearer {token_response.json()['access_token']}"}
+
+
+def _result_body(line_item_sourced_id: str, sourced_id: str = "test-idem-result") -> dict:
+    return {
+        "sourcedId": sourced_id,
+        "lineItemSourcedId": line_item_sourced_id,
+        "studentSourcedId": "test-idem-student",
+        "scoreStatus": "earnedFull",
+        "score": 88.0,
+    }
+
+
+def test_retried_post_replays_response(client, db_session, createput_headers, sample_line_item):
+    """Test that a retried POST replays the first response without writing again."""
+    headers = {**createput_headers, "Idempotency-Key": str(uuid.uuid4())}
+    body = _result_body(sample_line_item.sourced_id)
+
+    first = client.post("/ims/oneroster/v1p2/results", headers=headers, json=body)
+    retry = client.post("/ims/oneroster/v1p2/results", headers=headers, json=body)
+
+    assert first.status_code == 201
+    assert retry.status_code == 201
+    assert retry.json() == first.json()
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert "idempotent-replayed" not in first.headers
+    assert db_session.query(Result).filter(Result.sourced_id == "test-idem-result").count() == 1
+
+
+def test_reused_key_with_different_body(client, createput_headers, sample_line_item):
+    """Test that reusing a key for a different request is rejected."""
+    headers = {**createput_headers, "Idempotency-Key": str(uuid.uuid4())}
+
+    client.post(
+        "/ims/oneroster/v1p2/results",
+        headers=headers,
+        json=_result_body(sample_line_item.sourced_id),
+    )
+    response = client.post(
+        "/ims/oneroster/v1p2/results",
+        headers=headers,
+        json=_result_body(sample_line_item.sourced_id, "test-idem-other"),
+    )
+
+    assert response.status_code == 422
+
+
+def test_duplicate_post_without_key_conflicts(client, createput_headers, sample_line_item):
+    """Test that a duplicate POST without a key is a 409, not a server error."""
+    body = _result_body(sample_line_item.sourced_id)
+
+    client.post("/ims/oneroster/v1p2/results", headers=createput_headers, json=body)
+    response = client.post("/ims/oneroster/v1p2/results", headers=createput_headers, json=body)
+
+    assert response.status_code == 409
+
+
+def test_memory_store_claim_states():
+    """Test claim outcomes of the in-memory store."""
+    store = MemoryIdempotencyStore()
+
+    state, lease = store.claim("client", "key", "fp")
+    assert state == CLAIMED
+    assert store.claim("client", "key", "fp")[0] == IN_PROGRESS
+    assert store.claim("other-client", "key", "fp")[0] == CLAIMED
+
+    response = {"fingerprint": "fp", "status_code": 201, "headers": [], "body": b"{}"}
+    assert not store.complete("client", "key", response, object())
+    assert store.complete("client", "key", response, lease)
+
+    assert store.claim("client", "key", "fp")[0] == REPLAY
+    assert store.claim("client", "key", "different")[0] == MISMATCH
+
+
+def test_postgres_store_round_trip(db_session):
+    """Test claiming, completing and replaying through the idempotency_keys table."""
+    connection = db_session.connection()
+    store = PostgresIdempotencyStore(
+        session_factory=lambda: TestingSessionLocal(
+            bind=connection, join_transaction_mode="create_savepoint"
+        )
+    )
+    response = {
+        "fingerprint": "a" * 64,
+        "status_code": 201,
+        "headers": [["content-type", "application/json"]],
+        "body": b'{"ok": true}',
+    }
+
+    state, lease = store.claim("test-client", "test-key", "a" * 64)
+    assert state == CLAIMED
+    assert store.claim("test-client", "test-key", "a" * 64)[0] == IN_PROGRESS
+    assert store.complete("test-client", "test-key", response, lease)
+
+    state, stored = store.claim("test-client", "test-key", "a" * 64)
+    assert state == REPLAY
+    assert stored["body"] == b'{"ok": true}'
+    assert store.claim("test-client", "test-key", "b" * 64)[0] == MISMATCH
+
+
+def test_completion_after_lost_lease_is_a_conflict(client, db_session, createput_headers):
+    """Test that a request outliving its lease neither stores its response nor sends it."""
+    connection = db_session.connection()
+    store = PostgresIdempotencyStore(
+        session_factory=lambda: TestingSessionLocal(
+            bind=connection, join_transaction_mode="create_savepoint"
+        )
+    )
+    key = str(uuid.uuid4())
+    claims = []
+
+    async def slow_write(scope, receive, send):
+        # The lease runs out while the write runs, and a retry claims the key
+        connection.execute(
+            text("UPDATE idempotency_keys SET expires_at = NOW() - INTERVAL '1 second'")
+        )
+        claims.append(store.claim("test_client", key, "r" * 64))
+        await JSONResponse({"ok": True}, status_code=201)(scope, receive, send)
+
+    response = TestClient(IdempotencyMiddleware(slow_write, store=store)).post(
+        "/ims/oneroster/v1p2/results",
+        headers={**createput_headers, "Idempotency-Key": key},
+        json={},
+    )
+
+    assert response.status_code == 409
+    assert claims[0][0] == CLAIMED
+    # The retry's claim is untouched and completes normally
+    assert store.claim("test_client", key, "r" * 64)[0] == IN_PROGRESS
+    assert store.complete("test_client", key, None, claims[0][1])
@@ -2,6 +2,11 @@
 Tests for Line Items API endpoints.
 """
 
+import pytest
+from sqlalchemy.exc import InvalidRequestError
+
+from src.models.models import LineItem, StatusEnum
+
 
 def test_get_line_items_collection(client, oauth_token, sample_line_item):
     """Test getting collection of line items."""
@@ -221,6 +226,39 @@ def test_get_line_items_with_filter(client, oauth_token, db_session, sample_cate
     assert any("Math" in li["title"] for li in data["data"])
 
 
+def test_get_line_items_with_search(client, oauth_token, db_session, sample_category):
+    """Test ranked full-text search over line item titles and descriptions."""
+    from src.models.models import LineItem, StatusEnum
+
+    for sourced_id, title, description in [
+        ("test-search-1", "Chapter review", "Adding fractions with unlike denominators"),
+        ("test-search-2", "Fractions quiz", "Short quiz"),
+        ("test-search-3", "Essay draft", "Persuasive writing"),
+    ]:
+        db_session.add(
+            LineItem(
+                sourced_id=sourced_id,
+                status=StatusEnum.active,
+                title=title,
+                description=description,
+                class_sourced_id="class-001",
+                category_sourced_id=sample_category.sourced_id,
+            )
+        )
+    db_session.commit()
+
+    response = client.get(
+        "/ims/oneroster/v1p2/lineItems?search=fraction",
+        headers={"Authorization": f"Bearer {oauth_token}"},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 2
+    # Title matches outrank description matches
+    assert [li["sourcedId"] for li in data["data"]] == ["test-search-2", "test-search-1"]
+
+
 def test_get_line_items_with_sort(client, oauth_token, db_session, sample_category):
     """Test sorting line items."""
     # Create line items with different due dates
@@ -318,6 +356,34 @@ def test_delete_nonexistent_line_item(client, oauth_token):
     assert response.status_code == 404
 
 
+def test_put_title_only_keeps_line_item_fields(client, oauth_token, sample_line_item):
+    """Test that a PUT without sourcedId is a partial update, not a replace."""
+    token_response = client.post(
+        "/oauth/token",
+        data={
+            "grant_type": "client_credentials",
+            "client_id": "test_client",
+            "client_secret": "test_secret",
+            "scope": "https://purl.imsglobal.org/spec/or/v1p2/scope/results.createput",
+        },
+    )
+    token = token_response.json()["access_token"]
+
+    response = client.put(
+        f"/ims/oneroster/v1p2/lineItems/{sample_line_item.sourced_id}",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"title": "Renamed Assignment"},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["title"] == "Renamed Assignment"
+    assert data["description"] == "Test assignment description"
+    assert data["class"]["sourcedId"] == "class-001"
+    assert data["category"]["sourcedId"] == sample_line_item.category_sourced_id
+    assert data["resultValueMax"] == 100.0
+
+
 def test_update_line_item_all_fields(client, oauth_token, sample_line_item, sample_category):
     """Test updating all fields of a line item."""
     from datetime import datetime
@@ -416,3 +482,65 @@ def test_update_line_item_individual_fields(client, oauth_token, sample_line_ite
         json={"categorySourcedId": sample_category.sourced_id},
     )
     assert response.status_code == 200
+
+
+def test_get_line_items_with_include(client, oauth_token, db_session, sample_result):
+    """Test that include= returns the page's category and active results, loaded eagerly."""
+    headers = {"Authorization": f"Bearer {oauth_token}"}
+    line_item_id = sample_result.line_item_sourced_id
+    url = f"/ims/oneroster/v1p2/lineItems?filter=sourcedId='{line_item_id}'"
+
+    response = client.get(f"{url}&include=results,category", headers=headers)
+    client.delete(f"/ims/oneroster/v1p2/results/{sample_result.sourced_id}", headers=headers)
+    db_session.expire_all()  # the test client shares this session between requests
+    after_delete = client.get(f"{url}&include=category,results", headers=headers)
+    unknown = client.get(f"{url}&include=student", headers=headers)
+
+    included = response.json()["included"]
+    assert [category["sourcedId"] for category in included["category"]] == [
+        response.json()["data"][0]["category"]["sourcedId"]
+    ]
+    assert [result["sourcedId"] for result in included["results"]] == [sample_result.sourced_id]
+    assert after_delete.json()["included"]["results"] == []
+    assert unknown.status_code == 400
+
+
+def test_include_leaves_out_tombstoned_category(
+    client, oauth_token, db_session, sample_line_item, sample_category
+):
+    """Test that a joined related resource is not included once tombstoned."""
+    headers = {"Authorization": f"Bearer {oauth_token}"}
+    sample_category.status = StatusEnum.tobedeleted
+    db_session.commit()
+
+    response = client.get(
+        f"/ims/oneroster/v1p2/lineItems?filter=sourcedId='{sample_line_item.sourced_id}'"
+        "&include=category",
+        headers=headers,
+    )
+
+    assert response.status_code == 200
+    assert response.json()["included"]["category"] == []
+
+
+def test_include_results_caps_page_limit(client, oauth_token, sample_line_item):
+    """Test that including results caps the page at INCLUDE_COLLECTION_MAX_LIMIT."""
+    headers = {"Authorization": f"Bearer {oauth_token}"}
+
+    response = client.get(
+        "/ims/oneroster/v1p2/lineItems?limit=500&include=results", headers=headers
+    )
+    category_only = client.get(
+        "/ims/oneroster/v1p2/lineItems?limit=500&include=category", headers=headers
+    )
+
+    assert response.json()["limit"] == 50
+    assert category_only.json()["limit"] == 500
+
+
+def test_relationships_raise_on_lazy_load(db_session, sample_line_item):
+    """Test that relationships are not lazy loaded (tests run in production mode)."""
+    line_item = db_session.get(LineItem, sample_line_item.sourced_id)
+
+    with pytest.raises(InvalidRequestError):
+        _ = line_item.results
@@ -0,0 +1,157 @@
+"""
+Tests for the academic session partition key of results.
+"""
+
+import re
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+
+from src.config.settings import settings
+from src.models.models import LineItem, Result, StatusEnum
+from src.services.partition_service import PartitionService
+from src.utils.partitioning import prune_by_line_item
+
+
+@pytest.fixture
+def headers(oauth_token):
+    """Authorization headers with all gradebook scopes."""
+    return {"Authorization": f"Bearer {oauth_token}"}
+
+
+@pytest.fixture
+def partitioned(monkeypatch):
+    """Run with RESULTS_PARTITIONED=true (the test table itself is not partitioned)."""
+    monkeypatch.setattr(settings, "results_partitioned", True)
+
+
+def test_results_follow_line_item_session(client, headers, db_session, sample_line_item):
+    """Test that results copy their line item's academic session, and follow it when it moves."""
+    url = f"/ims/oneroster/v1p2/lineItems/{sample_line_item.sourced_id}"
+    body = {"title": "Termed", "classSourcedId": "class-001", "academicSessionSourcedId": "term-1"}
+
+    termed = client.put(url, headers=headers, json=body)
+    client.post(
+        "/ims/oneroster/v1p2/results",
+        headers=headers,
+        json={
+            "sourcedId": "test-part-result",
+            "lineItemSourcedId": sample_line_item.sourced_id,
+            "studentSourcedId": "student-001",
+            "scoreStatus": "earnedFull",
+        },
+    )
+    first = db_session.get(Result, "test-part-result").academic_session_sourced_id
+    client.put(url, headers=headers, json={**body, "academicSessionSourcedId": "term-2"})
+    db_session.expire_all()
+
+    assert termed.json()["academicSession"]["sourcedId"] == "term-1"
+    assert first == "term-1"
+    assert db_session.get(Result, "test-part-result").academic_session_sourced_id == "term-2"
+
+
+def test_line_item_filter_adds_partition_key(db_session, partitioned, monkeypatch):
+    """Test that line-item-scoped result queries name the partition key only when partitioned."""
+    query = db_session.query(Result)
+
+    pruned = str(prune_by_line_item(query, Result, "lineItemSourcedId='li-1' AND score>5"))
+    unscoped = str(prune_by_line_item(query, Result, "studentSourcedId='s-1'"))
+    monkeypatch.setattr(settings, "results_partitioned", False)
+    plain = str(prune_by_line_item(query, Result, "lineItemSourcedId='li-1'"))
+
+    assert "results.academic_session_sourced_id = (SELECT" in pruned
+    assert "academic_session_sourced_id =" not in unscoped
+    assert "academic_session_sourced_id =" not in plain
+
+
+def test_partitioned_writes(client, headers, db_session, partitioned, sample_line_item):
+    """Test that PUT still reports create vs replace with the partitioned upsert."""
+    # As in the partitioned layout; rolled back with the test transaction
+    db_session.execute(
+        text("ALTER TABLE results ALTER COLUMN created_at SET DEFAULT statement_timestamp()")
+    )
+    url = "/ims/oneroster/v1p2/results/test-part-put"
+    body = {
+        "sourcedId": "test-part-put",
+        "lineItemSourcedId": sample_line_item.sourced_id,
+        "studentSourcedId": "test-part-student",
+        "scoreStatus": "earnedFull",
+        "score": 70.0,
+    }
+
+    created = client.put(url, headers=headers, json=body)
+    replaced = client.put(url, headers=headers, json={**body, "score": 75.0})
+    page = client.get(
+        "/ims/oneroster/v1p2/results" f"?filter=lineItemSourcedId='{sample_line_item.sourced_id}'",
+        headers=headers,
+    )
+
+    assert created.status_code == 201
+    assert replaced.status_code == 200
+    assert [result["score"] for result in page.json()["data"]] == [75.0]
+
+
+def test_partitioned_put_moves_result_between_sessions(
+    client, headers, db_session, partitioned, sample_line_item
+):
+    """Test that a replace naming a line item of another session moves the result."""
+    # The partitioned layout's sourcedId trigger and created_at default, on
+    # the plain test table; rolled back with the test transaction
+    migration = Path(__file__).parents[3] / "shared/database/migrations/012_partition_results.sql"
+    check_function = re.search(
+        r"CREATE OR REPLACE FUNCTION check_result_sourced_id\(\).*?LANGUAGE plpgsql;",
+        migration.read_text(),
+        re.DOTALL,
+    ).group(0)
+    db_session.execute(text(check_function))
+    db_session.execute(
+        text(
+            "CREATE TRIGGER unique_results_sourced_id BEFORE INSERT ON results "
+            "FOR EACH ROW EXECUTE FUNCTION check_result_sourced_id()"
+        )
+    )
+    db_session.execute(
+        text("ALTER TABLE results ALTER COLUMN created_at SET DEFAULT statement_timestamp()")
+    )
+    next_term = LineItem(
+        sourced_id=f"{sample_line_item.sourced_id}-next",
+        status=StatusEnum.active,
+        title="Next term",
+        class_sourced_id="class-001",
+        academic_session_sourced_id="term-2",
+    )
+    db_session.add(next_term)
+    db_session.commit()
+    url = "/ims/oneroster/v1p2/results/test-part-move"
+    body = {
+        "sourcedId": "test-part-move",
+        "lineItemSourcedId": sample_line_item.sourced_id,
+        "studentSourcedId": "test-part-student",
+        "scoreStatus": "earnedFull",
+        "score": 70.0,
+    }
+
+    created = client.put(url, headers=headers, json=body)
+    moved = client.put(
+        url, headers=headers, json={**body, "lineItemSourcedId": next_term.sourced_id}
+    )
+    rows = db_session.execute(
+        text(
+            "SELECT line_item_sourced_id, academic_session_sourced_id FROM results "
+            "WHERE sourced_id = 'test-part-move'"
+        )
+    ).all()
+
+    assert created.status_code == 201
+    assert moved.status_code == 200
+    assert moved.json()["lineItem"]["sourcedId"] == next_term.sourced_id
+    assert [tuple(row) for row in rows] == [(next_term.sourced_id, "term-2")]
+
+
+def test_partition_jobs_require_partitioned_table(db_session):
+    """Test that the partition jobs refuse to run on the plain results table."""
+    with pytest.raises(ValueError):
+        PartitionService(db_session).create_partitions()
+    with pytest.raises(ValueError):
+        PartitionService(db_session).detach("term-1")
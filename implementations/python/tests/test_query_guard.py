@@ -0,0 +1,123 @@
+"""
+Tests for the collection query guard and per-route statement timeouts.
+"""
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from src.config.settings import settings
+from src.models.models import Result
+from src.services.result_service import ResultService
+from src.utils.query_guard import guard_query, index_map
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture
+def guarded(monkeypatch):
+    """Guard every table, whatever its size."""
+    monkeypatch.setattr(settings, "query_guard_min_rows", 0)
+
+
+def test_index_map_from_declared_indexes():
+    """Test that the index map follows the model's declared indexes."""
+    indexes = index_map(Result)
+
+    assert {"sourced_id", "line_item_sourced_id", "student_sourced_id"} <= indexes.btree
+    assert "comment" in indexes.trigram
+    assert "comment" not in indexes.btree
+
+
+def test_unindexed_sort_is_rejected(client, oauth_token, guarded):
+    """Test that an unindexed sort over the whole table is a 400."""
+    headers = {"Authorization": f"Bearer {oauth_token}"}
+
+    rejected = client.get(
+        "/ims/oneroster/v1p2/results?filter=comment~'great'&sort=comment DESC", headers=headers
+    )
+    narrowed = client.get(
+        "/ims/oneroster/v1p2/results?filter=lineItemSourcedId='test-li'&sort=comment DESC",
+        headers=headers,
+    )
+
+    assert rejected.status_code == 400
+    assert rejected.json()["imsx_codeMinor"] == "invalid_sort_field"
+    assert narrowed.status_code == 200
+
+
+def test_unindexed_filter_is_rejected(db_session, guarded, monkeypatch):
+    """Test that unindexed filters are rejected, and sorts dropped in downgrade mode."""
+    monkeypatch.setattr(settings, "query_guard_mode", "downgrade")
+
+    assert guard_query(db_session, Result, None, "comment DESC,sourcedId") == "sourcedId"
+    with pytest.raises(ValueError):
+        guard_query(db_session, Result, "score>90", None)
+
+
+def test_low_cardinality_equality_does_not_narrow(db_session, guarded):
+    """Test that an indexed equality on scoreStatus or status does not skip the guard."""
+    with pytest.raises(ValueError):
+        guard_query(
+            db_session, Result, "scoreStatus='fully graded' AND comment~'abc'", "comment DESC"
+        )
+    with pytest.raises(ValueError):
+        guard_query(db_session, Result, "status='active' AND score>90", None)
+    assert (
+        guard_query(db_session, Result, "studentSourcedId='s-1' AND comment~'abc'", "comment DESC")
+        == "comment DESC"
+    )
+
+
+def test_negation_is_not_index_backed(db_session, guarded):
+    """Test that != only passes when a selective clause narrows the query."""
+    with pytest.raises(ValueError):
+        guard_query(db_session, Result, "studentSourcedId!='s-1'", None)
+    assert guard_query(db_session, Result, "lineItemSourcedId='li-1' AND score!=0", None) is None
+
+
+def test_brin_columns_back_filters_not_sorts(db_session, guarded, monkeypatch):
+    """Test that with RESULTS_BRIN_INDEXES timestamp ranges pass but sorts on them do not."""
+    monkeypatch.setattr(settings, "results_brin_indexes", True)
+    indexes = index_map(Result)
+
+    assert {"date_last_modified", "score_date"} <= indexes.brin
+    assert guard_query(db_session, Result, "scoreDate>='2024-09-01'", None) is None
+    with pytest.raises(ValueError):
+        guard_query(db_session, Result, None, "dateLastModified")
+    monkeypatch.setattr(settings, "results_brin_indexes", False)
+    assert "date_last_modified" in index_map(Result).btree
+
+
+def test_statement_timeout_answers_503(client, oauth_token, monkeypatch):
+    """Test that a statement cancelled by its timeout becomes a 503 with Retry-After."""
+
+    def slow_query(self, **kwargs):
+        session = TestingSessionLocal()
+        session.info["statement_timeout_ms"] = 50
+        try:
+            session.execute(text("SELECT pg_sleep(1)"))
+        finally:
+            session.close()
+
+    monkeypatch.setattr(ResultService, "get_all", slow_query)
+
+    response = client.get(
+        "/ims/oneroster/v1p2/results", headers={"Authorization": f"Bearer {oauth_token}"}
+    )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(settings.statement_timeout_retry_after_seconds)
+
+
+def test_statement_timeout_is_per_transaction():
+    """Test that SET LOCAL statement_timeout is applied to each new transaction."""
+    session = TestingSessionLocal()
+    session.info["statement_timeout_ms"] = 50
+    try:
+        assert session.execute(text("SHOW statement_timeout")).scalar() == "50ms"
+        session.commit()
+        assert session.execute(text("SHOW statement_timeout")).scalar() == "50ms"
+        with pytest.raises(OperationalError):
+            session.execute(text("SELECT pg_sleep(1)"))
+    finally:
+        session.close()
@@ -1,8 +1,15 @@
 """Tests for query parser utility."""
 import pytest
 
-from src.models.models import Category
-from src.utils.query_parser import parse_filter, parse_sort
+from src.config.settings import settings
+from src.models.models import Category, StatusEnum
+from src.utils.query_parser import (
+    InvalidFilterError,
+    normalize_filter,
+    normalize_sort,
+    parse_filter,
+    parse_sort,
+)
 
 
 def test_parse_filter_with_equals(db_session):
@@ -64,6 +71,88 @@ def test_parse_filter_with_contains(db_session):
     assert len(conditions) == 1
 
 
+def test_parse_filter_contains_guard(db_session):
+    """Test that contains filters need a text field and a minimum length."""
+    with pytest.raises(InvalidFilterError):
+        parse_filter("title~'Ma'", Category)
+    with pytest.raises(InvalidFilterError):
+        parse_filter("weight~'0.5'", Category)
+    with pytest.raises(InvalidFilterError):
+        parse_filter("status~'active'", Category)
+
+
+def test_parse_filter_contains_matches_wildcards_literally(db_session):
+    """Test that % and _ in a contains value are not LIKE wildcards."""
+    db_session.add_all(
+        [
+            Category(sourced_id="test-trgm-1", status=StatusEnum.active, title="Quiz 100% A"),
+            Category(sourced_id="test-trgm-2", status=StatusEnum.active, title="Quiz 1000 A"),
+        ]
+    )
+    db_session.flush()
+
+    matches = db_session.query(Category).filter(*parse_filter("title~'100%'", Category)).all()
+
+    assert [category.sourced_id for category in matches] == ["test-trgm-1"]
+
+
+def test_parse_filter_with_in(db_session, monkeypatch):
+    """Test IN lists: one array parameter, combined with other clauses, capped in length."""
+    db_session.add_all(
+        [
+            Category(sourced_id=f"test-in-{i}", status=StatusEnum.active, title=f"In {i}")
+            for i in range(3)
+        ]
+    )
+    db_session.flush()
+
+    conditions = parse_filter("sourcedId IN ('test-in-0', 'test-in-2') AND title!='In 2'", Category)
+    matches = db_session.query(Category).filter(*conditions).order_by(Category.sourced_id).all()
+
+    assert "= ANY" in str(conditions[0])
+    assert [category.sourced_id for category in matches] == ["test-in-0"]
+    monkeypatch.setattr(settings, "filter_in_max_values", 1)
+    with pytest.raises(InvalidFilterError):
+        parse_filter("sourcedId IN ('a','b')", Category)
+
+
+def test_parse_filter_on_metadata(db_session, monkeypatch):
+    """Test metadata.<path> filters: containment, nested keys, JSON comparisons."""
+    monkeypatch.setattr(settings, "metadata_filter_keys", "vendorId,vendor.region,level")
+    db_session.add_all(
+        [
+            Category(
+                sourced_id="test-meta-1",
+                status=StatusEnum.active,
+                title="One",
+                metadata_={"vendorId": "v1", "vendor": {"region": "eu"}, "level": 3},
+            ),
+            Category(
+                sourced_id="test-meta-2",
+                status=StatusEnum.active,
+                title="Two",
+                metadata_={"vendorId": "v2", "level": 10},
+            ),
+        ]
+    )
+    db_session.flush()
+
+    def matching(filter_expr):
+        query = db_session.query(Category).filter(
+            Category.sourced_id.like("test-meta-%"), *parse_filter(filter_expr, Category)
+        )
+        return sorted(category.sourced_id for category in query)
+
+    assert matching("metadata.vendorId='v1'") == ["test-meta-1"]
+    assert matching("metadata.vendor.region='eu'") == ["test-meta-1"]
+    assert matching("metadata.level>5") == ["test-meta-2"]
+    assert matching("metadata.level='10'") == []  # a JSON string is not the number 10
+    assert matching("metadata.vendorId!='v1'") == ["test-meta-2"]
+    with pytest.raises(InvalidFilterError):
+        parse_filter("metadata.secret='x'", Category)
+    assert normalize_filter("metadata.vendorId='v1'") == (("metadata.vendorId", "=", "'v1'"),)
+
+
 def test_parse_filter_with_multiple_conditions(db_session):
     """Test parsing multiple filter conditions."""
     filter_str = "title='Test' AND weight>5"
@@ -140,3 +229,14 @@ def test_parse_filter_with_integer_value(db_session):
     conditions = parse_filter(filter_str, Category)
     
     assert len(conditions) == 1
+
+
+def test_normalize_filter_and_sort():
+    """Test that equivalent expressions normalize to the same cache key."""
+    assert normalize_filter("classSourcedId='X' AND weight>2") == normalize_filter(
+        "weight > 2 AND classSourcedId = 'X'"
+    )
+    assert normalize_filter("title='A'") != normalize_filter("title='B'")
+    assert normalize_filter("sourcedId IN ('b','a','b')") == (("sourced_id", "IN", "'a','b'"),)
+    assert normalize_filter("sourcedId IN ('a')") != normalize_filter("sourcedId IN ('b')")
+    assert normalize_sort("dueDate, title desc") == (("due_date", "ASC"), ("title", "DESC"))
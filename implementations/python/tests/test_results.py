@@ -119,6 +119,35 @@ def test_update_result(client, oauth_token, sample_result):
     assert data["comment"] == "Excellent improvement"
 
 
+def test_update_result_aliased_fields(client, oauth_token, sample_result):
+    """Test that camelCase fields such as scoreStatus and scoreDate are applied on PUT."""
+    token_response = client.post(
+        "/oauth/token",
+        data={
+            "grant_type": "client_credentials",
+            "client_id": "test_client",
+            "client_secret": "test_secret",
+            "scope": "https://purl.imsglobal.org/spec/or/v1p2/scope/results.createput",
+        },
+    )
+    token = token_response.json()["access_token"]
+
+    response = client.put(
+        f"/ims/oneroster/v1p2/results/{sample_result.sourced_id}",
+        headers={"Authorization": f"Bearer {token}"},
+        json={
+            "score": 40.0,
+            "scoreStatus": "earnedPartial",
+            "scoreDate": "2030-06-01T10:00:00Z",
+        },
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["scoreStatus"] == "earnedPartial"
+    assert data["scoreDate"].startswith("2030-06-01")
+
+
 def test_delete_result(client, oauth_token, sample_result):
     """Test soft deleting a result."""
     # Get token with delete scope
@@ -208,6 +237,33 @@ def test_get_results_with_filter(client, oauth_token, db_session, sample_line_it
     assert any(res.get("score", 0) > 90 for res in data["data"])
 
 
+def test_get_results_with_search(client, oauth_token, db_session, sample_line_item):
+    """Test full-text search over result comments."""
+    from src.models.models import Result, ScoreStatusEnum, StatusEnum
+
+    for i, comment in enumerate(["Great work on the proofs", "Proofs need more work", None]):
+        db_session.add(
+            Result(
+                sourced_id=f"test-search-res-{i}",
+                status=StatusEnum.active,
+                line_item_sourced_id=sample_line_item.sourced_id,
+                student_sourced_id=f"student-search-{i}",
+                score_status=ScoreStatusEnum.earnedFull,
+                score=90.0,
+                comment=comment,
+            )
+        )
+    db_session.commit()
+
+    response = client.get(
+        "/ims/oneroster/v1p2/results?search=proof -great",
+        headers={"Authorization": f"Bearer {oauth_token}"},
+    )
+
+    assert response.status_code == 200
+    assert [res["sourcedId"] for res in response.json()["data"]] == ["test-search-res-1"]
+
+
 def test_get_results_with_sort(client, oauth_token, db_session, sample_line_item):
     """Test sorting results."""
     # Create results with different scores
@@ -348,6 +404,48 @@ def test_update_nonexistent_result(client, oauth_token):
     assert response.status_code == 404
 
 
+def test_put_upserts_result(client, oauth_token, sample_result, sample_line_item):
+    """Test PUT create-or-replace: 201 on create, 200 on replace, 409 on a duplicate pair."""
+    token_response = client.post(
+        "/oauth/token",
+        data={
+            "grant_type": "client_credentials",
+            "client_id": "test_client",
+            "client_secret": "test_secret",
+            "scope": "https://purl.imsglobal.org/spec/or/v1p2/scope/results.createput",
+        },
+    )
+    headers = {"Authorization": f"Bearer {token_response.json()['access_token']}"}
+    body = {
+        "sourcedId": "test-put-result",
+        "lineItemSourcedId": sample_line_item.sourced_id,
+        "studentSourcedId": "test-put-student",
+        "scoreStatus": "earnedPartial",
+        "score": 70.0,
+    }
+
+    created = client.put("/ims/oneroster/v1p2/results/test-put-result", headers=headers, json=body)
+    replaced = client.put(
+        "/ims/oneroster/v1p2/results/test-put-result",
+        headers=headers,
+        json={**body, "score": 80.0},
+    )
+    duplicate = client.put(
+        "/ims/oneroster/v1p2/results/test-put-duplicate",
+        headers=headers,
+        json={
+            **body,
+            "sourcedId": "test-put-duplicate",
+            "studentSourcedId": sample_result.student_sourced_id,
+        },
+    )
+
+    assert created.status_code == 201
+    assert replaced.status_code == 200
+    assert replaced.json()["score"] == 80.0
+    assert duplicate.status_code == 409
+
+
 def test_delete_nonexistent_result(client, oauth_token):
     """Test deleting a result that doesn't exist."""
     token_response = client.post(
@@ -472,3 +570,182 @@ def test_update_result_individual_fields(client, oauth_token, sample_result):
         json={"comment": "Well done!"},
     )
     assert response.status_code == 200
+
+
+def test_result_class_follows_line_item(client, oauth_token, db_session, sample_line_item):
+    """Test that results carry their line item's class and can be filtered by it."""
+    headers = {"Authorization": f"Bearer {oauth_token}"}
+    created = client.post(
+        "/ims/oneroster/v1p2/results",
+        headers=headers,
+        json={
+            "sourcedId": "res-class-001",
+            "lineItemSourcedId": sample_line_item.sourced_id,
+            "studentSourcedId": "student-001",
+            "scoreStatus": "earnedFull",
+        },
+    )
+    moved = client.put(
+        f"/ims/oneroster/v1p2/lineItems/{sample_line_item.sourced_id}",
+        headers=headers,
+        json={"title": "Moved", "classSourcedId": "class-moved"},
+    )
+    filtered = client.get(
+        "/ims/oneroster/v1p2/results?filter=classSourcedId='class-moved'", headers=headers
+    )
+
+    assert created.json()["class"]["sourcedId"] == "class-001"
+    assert moved.status_code == 200
+    assert [result["sourcedId"] for result in filtered.json()["data"]] == ["res-class-001"]
+    assert filtered.json()["data"][0]["class"]["sourcedId"] == "class-moved"
+
+
+def test_cached_result_follows_line_item_move(client, oauth_token, sample_line_item):
+    """Test that moving a line item to another class drops its cached results."""
+    headers = {"Authorization": f"Bearer {oauth_token}"}
+    client.post(
+        "/ims/oneroster/v1p2/results",
+        headers=headers,
+        json={
+            "sourcedId": "res-class-cached",
+            "lineItemSourcedId": sample_line_item.sourced_id,
+            "studentSourcedId": "student-001",
+            "scoreStatus": "earnedFull",
+        },
+    )
+    before = client.get("/ims/oneroster/v1p2/results/res-class-cached", headers=headers)
+    moved = client.put(
+        f"/ims/oneroster/v1p2/lineItems/{sample_line_item.sourced_id}",
+        headers=headers,
+        json={
+            "sourcedId": sample_line_item.sourced_id,
+            "title": "Moved",
+            "classSourcedId": "class-NEW",
+        },
+    )
+    after = client.get("/ims/oneroster/v1p2/results/res-class-cached", headers=headers)
+
+    assert before.json()["class"]["sourcedId"] == "class-001"
+    assert moved.status_code == 200
+    assert after.json()["class"]["sourcedId"] == "class-NEW"
+    assert after.headers["ETag"] != before.headers["ETag"]
+
+
+def test_partial_update_moves_result(client, oauth_token, sample_result, sample_line_item):
+    """Test that a partial PUT moves a result to another line item and student."""
+    headers = {"Authorization": f"Bearer {oauth_token}"}
+    client.put(
+        "/ims/oneroster/v1p2/lineItems/li-move-target",
+        headers=headers,
+        json={
+            "sourcedId": "li-move-target",
+            "title": "Target",
+            "classSourcedId": "class-target",
+            "categorySourcedId": sample_line_item.category_sourced_id,
+        },
+    )
+    old_stats = f"/ims/oneroster/v1p2/lineItems/{sample_line_item.sourced_id}/statistics"
+    assert client.get(old_stats, headers=headers).json()["resultCount"] == 1
+
+    response = client.put(
+        f"/ims/oneroster/v1p2/results/{sample_result.sourced_id}",
+        headers=headers,
+        json={"lineItemSourcedId": "li-move-target", "studentSourcedId": "student-2", "score": 5},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["lineItem"]["sourcedId"] == "li-move-target"
+    assert data["student"]["sourcedId"] == "student-2"
+    assert data["class"]["sourcedId"] == "class-target"
+    assert data["score"] == 5
+    assert client.get(old_stats, headers=headers).json()["resultCount"] == 0
+    new_stats = client.get(
+        "/ims/oneroster/v1p2/lineItems/li-move-target/statistics", headers=headers
+    ).json()
+    assert new_stats["resultCount"] == 1
+
+
+def test_partial_update_move_conflict(client, oauth_token, sample_result, sample_line_item):
+    """Test that moving a result onto a student's existing result is a 409."""
+    headers = {"Authorization": f"Bearer {oauth_token}"}
+    client.post(
+        "/ims/oneroster/v1p2/results",
+        headers=headers,
+        json={
+            "sourcedId": "res-move-other",
+            "lineItemSourcedId": sample_line_item.sourced_id,
+            "studentSourcedId": "student-2",
+            "scoreStatus": "earnedFull",
+        },
+    )
+
+    response = client.put(
+        "/ims/oneroster/v1p2/results/res-move-other",
+        headers=headers,
+        json={"studentSourcedId": sample_result.student_sourced_id},
+    )
+
+    assert response.status_code == 409
+
+
+def test_partial_update_rejects_unsupported_fields(client, oauth_token, sample_result):
+    """Test that a partial PUT naming a field it cannot change is a 400, not ignored."""
+    headers = {"Authorization": f"Bearer {oauth_token}"}
+    url = f"/ims/oneroster/v1p2/results/{sample_result.sourced_id}"
+
+    response = client.put(url, headers=headers, json={"status": "tobedeleted", "score": 5})
+
+    assert response.status_code == 400
+    assert "status" in response.json()["imsx_description"]
+    assert client.get(url, headers=headers).json()["score"] == 85.5
+
+
+def test_backfill_result_classes(db_session, sample_result):
+    """Test that the backfill copies the class onto results written without it."""
+    from sqlalchemy import text
+
+    from src.services.result_service import ResultService
+
+    db_session.execute(text("UPDATE results SET class_sourced_id = NULL"))
+    db_session.commit()
+
+    report = ResultService(db_session).backfill_classes(batch_size=1)
+    db_session.refresh(sample_result)
+
+    assert report["resultsUpdated"] >= 1
+    assert report["resultsChecked"] == report["resultsUpdated"]
+    assert sample_result.class_sourced_id == "class-001"
+    assert ResultService(db_session).backfill_classes()["resultsUpdated"] == 0
+
+
+def test_batch_get_results(client, oauth_token, sample_result, monkeypatch):
+    """Test that batchGet returns active results in request order and lists the rest."""
+    from src.config.settings import settings
+
+    url = "/ims/oneroster/v1p2/results/batchGet"
+    headers = {"Authorization": f"Bearer {oauth_token}"}
+    client.delete(f"/ims/oneroster/v1p2/results/{sample_result.sourced_id}", headers=headers)
+    client.post(
+        "/ims/oneroster/v1p2/results",
+        headers=headers,
+        json={
+            "sourcedId": "test-batch-result",
+            "lineItemSourcedId": sample_result.line_item_sourced_id,
+            "studentSourcedId": "student-batch",
+            "scoreStatus": "earnedFull",
+        },
+    )
+
+    response = client.post(
+        url,
+        headers=headers,
+        json={"sourcedIds": ["no-such-result", "test-batch-result", sample_result.sourced_id]},
+    )
+    monkeypatch.setattr(settings, "filter_in_max_values", 2)
+    too_many = client.post(url, headers=headers, json={"sourcedIds": ["a", "b", "c"]})
+
+    assert response.status_code == 200
+    assert [result["sourcedId"] for result in response.json()["data"]] == ["test-batch-result"]
+    assert response.json()["notFound"] == ["no-such-result", sample_result.sourced_id]
+    assert too_many.status_code == 400
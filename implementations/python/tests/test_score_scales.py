@@ -0,0 +1,144 @@
+"""
+Tests for ScoreScales API endpoints and score label mapping.
+"""
+
+import pytest
+
+from src.utils.score_scale import compile_score_scale
+
+LETTER_BANDS = [
+    {"label": "A", "min": 90, "max": 100},
+    {"label": "B", "min": 80, "max": 89},
+    {"label": "C", "min": 70, "max": 79},
+    {"label": "F", "min": 0, "max": 69},
+]
+
+
+@pytest.fixture
+def sample_score_scale(client, oauth_token):
+    """Create a sample score scale through the API."""
+    response = client.post(
+        "/ims/oneroster/v1p2/scoreScales",
+        headers={"Authorization": f"Bearer {oauth_token}"},
+        json={
+            "sourcedId": "test-scale-letters",
+            "title": "Letter Grades",
+            "type": "letter",
+            "classSourcedId": "class-001",
+            "scoreScaleValue": LETTER_BANDS,
+        },
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+def test_compile_score_scale_lookup():
+    """Test bisect lookups, including gaps between bands and out-of-range scores."""
+    scale = compile_score_scale("scale", LETTER_BANDS)
+
+    assert scale.label_for(95) == "A"
+    assert scale.label_for(90) == "A"
+    assert scale.label_for(89.5) == "B"
+    assert scale.label_for(0) == "F"
+    assert scale.label_for(-1) is None
+    assert scale.label_for(101) is None
+    assert scale.label_for(None) is None
+
+
+def test_compile_score_scale_rejects_duplicate_bounds():
+    """Test that bands sharing a lower bound are rejected."""
+    with pytest.raises(ValueError):
+        compile_score_scale("scale", [{"label": "A", "min": 0}, {"label": "B", "min": 0}])
+
+
+def test_create_and_get_score_scale(client, oauth_token, sample_score_scale):
+    """Test creating and reading a score scale."""
+    response = client.get(
+        "/ims/oneroster/v1p2/scoreScales/test-scale-letters",
+        headers={"Authorization": f"Bearer {oauth_token}"},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["title"] == "Letter Grades"
+    assert data["class"]["sourcedId"] == "class-001"
+    assert len(data["scoreScaleValue"]) == 4
+
+
+def test_create_score_scale_with_invalid_bands(client, oauth_token):
+    """Test that malformed bands are rejected."""
+    response = client.post(
+        "/ims/oneroster/v1p2/scoreScales",
+        headers={"Authorization": f"Bearer {oauth_token}"},
+        json={
+            "sourcedId": "test-scale-invalid",
+            "title": "Invalid",
+            "scoreScaleValue": [{"label": "A", "min": 50}, {"label": "B", "min": 50}],
+        },
+    )
+
+    assert response.status_code == 422
+
+
+def test_get_score_scales_collection(client, oauth_token, sample_score_scale):
+    """Test getting collection of score scales."""
+    response = client.get(
+        "/ims/oneroster/v1p2/scoreScales",
+        headers={"Authorization": f"Bearer {oauth_token}"},
+    )
+
+    assert response.status_code == 200
+    assert any(s["sourcedId"] == "test-scale-letters" for s in response.json()["data"])
+
+
+def test_results_collection_with_score_scale(
+    client, oauth_token, sample_result, sample_score_scale
+):
+    """Test that results collections add the mapped textScore label."""
+    response = client.get(
+        "/ims/oneroster/v1p2/results?scoreScale=test-scale-letters"
+        f"&filter=sourcedId='{sample_result.sourced_id}'",
+        headers={"Authorization": f"Bearer {oauth_token}"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["data"][0]["textScore"] == "B"
+
+
+def test_score_scale_update_recompiles(client, oauth_token, sample_result, sample_score_scale):
+    """Test that updating bands invalidates the compiled scale."""
+    headers = {"Authorization": f"Bearer {oauth_token}"}
+    url = (
+        "/ims/oneroster/v1p2/results?scoreScale=test-scale-letters"
+        f"&filter=sourcedId='{sample_result.sourced_id}'"
+    )
+    assert client.get(url, headers=headers).json()["data"][0]["textScore"] == "B"
+
+    response = client.put(
+        "/ims/oneroster/v1p2/scoreScales/test-scale-letters",
+        headers=headers,
+        json={"scoreScaleValue": [{"label": "Pass", "min": 50}, {"label": "Fail", "min": 0}]},
+    )
+    assert response.status_code == 200
+
+    assert client.get(url, headers=headers).json()["data"][0]["textScore"] == "Pass"
+
+
+def test_results_collection_with_unknown_score_scale(client, oauth_token):
+    """Test results collection with a non-existent score scale."""
+    response = client.get(
+        "/ims/oneroster/v1p2/results?scoreScale=non-existent-id",
+        headers={"Authorization": f"Bearer {oauth_token}"},
+    )
+
+    assert response.status_code == 404
+
+
+def test_delete_score_scale(client, oauth_token, sample_score_scale):
+    """Test soft deleting a score scale."""
+    headers = {"Authorization": f"Bearer {oauth_token}"}
+    response = client.delete("/ims/oneroster/v1p2/scoreScales/test-scale-letters", headers=headers)
+    assert response.status_code == 204
+
+    response = client.get("/ims/oneroster/v1p2/scoreScales/test-scale-letters", headers=headers)
+    assert response.status_code == 404
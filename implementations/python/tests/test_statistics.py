@@ -0,0 +1,138 @@
+"""
+Tests for line item score statistics.
+"""
+
+from src.models.models import Result, ScoreStatusEnum, StatusEnum
+from src.services.statistics_service import StatisticsService, statistics_cache
+
+
+def _add_results(db_session, line_item, scores):
+    for i, (score_status, score) in enumerate(scores):
+        db_session.add(
+            Result(
+                sourced_id=f"test-stats-{i}",
+                status=StatusEnum.active,
+                line_item_sourced_id=line_item.sourced_id,
+                student_sourced_id=f"student-stats-{i}",
+                score_status=score_status,
+                score=score,
+            )
+        )
+    db_session.commit()
+
+
+def test_line_item_statistics(client, oauth_token, db_session, sample_line_item):
+    """Test mean, median, histogram and scoreStatus counts."""
+    _add_results(
+        db_session,
+        sample_line_item,
+        [
+            (ScoreStatusEnum.earnedPartial, 55.0),
+            (ScoreStatusEnum.earnedPartial, 75.0),
+            (ScoreStatusEnum.earnedFull, 100.0),
+            (ScoreStatusEnum.notSubmitted, None),
+        ],
+    )
+
+    response = client.get(
+        f"/ims/oneroster/v1p2/lineItems/{sample_line_item.sourced_id}/statistics?buckets=4",
+        headers={"Authorization": f"Bearer {oauth_token}"},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["resultCount"] == 4
+    assert data["scoreCount"] == 3
+    assert round(data["mean"], 2) == 76.67
+    assert data["median"] == 75.0
+    assert data["min"] == 55.0
+    assert data["max"] == 100.0
+    assert data["percentiles"]["p50"] == 75.0
+    assert data["scoreStatusCounts"] == {"earnedPartial": 2, "earnedFull": 1, "notSubmitted": 1}
+    assert [bucket["count"] for bucket in data["histogram"]] == [0, 0, 1, 2]
+
+
+def test_line_item_statistics_invalidated_on_result_write(
+    client, oauth_token, db_session, sample_line_item
+):
+    """Test that cached statistics are dropped when a result changes."""
+    _add_results(db_session, sample_line_item, [(ScoreStatusEnum.earnedPartial, 50.0)])
+    headers = {"Authorization": f"Bearer {oauth_token}"}
+    url = f"/ims/oneroster/v1p2/lineItems/{sample_line_item.sourced_id}/statistics"
+
+    assert client.get(url, headers=headers).json()["mean"] == 50.0
+
+    client.put("/ims/oneroster/v1p2/results/test-stats-0", headers=headers, json={"score": 80.0})
+
+    assert client.get(url, headers=headers).json()["mean"] == 80.0
+
+
+def test_line_item_statistics_without_results(client, oauth_token, sample_line_item):
+    """Test statistics for a line item with no results."""
+    response = client.get(
+        f"/ims/oneroster/v1p2/lineItems/{sample_line_item.sourced_id}/statistics",
+        headers={"Authorization": f"Bearer {oauth_token}"},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["resultCount"] == 0
+    assert len(data["histogram"]) == 10
+
+
+def test_line_item_statistics_not_found(client, oauth_token):
+    """Test statistics for a non-existent line item."""
+    response = client.get(
+        "/ims/oneroster/v1p2/lineItems/non-existent-id/statistics",
+        headers={"Authorization": f"Bearer {oauth_token}"},
+    )
+
+    assert response.status_code == 404
+
+
+def test_line_item_statistics_without_value_range(db_session, sample_line_item):
+    """Test that a line item whose min equals its max gets no histogram instead of an error."""
+    _add_results(db_session, sample_line_item, [(ScoreStatusEnum.earnedFull, 50.0)])
+    # Only possible where chk_result_values is missing; not flushed here
+    sample_line_item.result_value_min = 50.0
+    sample_line_item.result_value_max = 50.0
+
+    stats = StatisticsService(db_session).get_line_item_statistics(sample_line_item)
+
+    assert stats["mean"] == 50.0
+    assert stats["histogram"] == []
+
+
+def test_partial_update_keeps_value_range(client, oauth_token, sample_line_item):
+    """Test that a partial PUT cannot leave resultValueMax at or below resultValueMin."""
+    headers = {"Authorization": f"Bearer {oauth_token}"}
+    url = f"/ims/oneroster/v1p2/lineItems/{sample_line_item.sourced_id}"
+
+    max_only = client.put(url, headers=headers, json={"resultValueMax": 0})
+    min_only = client.put(url, headers=headers, json={"resultValueMin": 100})
+    both = client.put(url, headers=headers, json={"resultValueMin": 10, "resultValueMax": 5})
+    valid = client.put(url, headers=headers, json={"resultValueMax": 50})
+
+    assert max_only.status_code == 422
+    assert min_only.status_code == 422
+    assert both.status_code == 422
+    assert valid.status_code == 200
+    assert valid.json()["resultValueMax"] == 50.0
+
+
+def test_statistics_computed_across_invalidation_not_cached(
+    db_session, sample_line_item, monkeypatch
+):
+    """Test that statistics computed while a write invalidated them are not cached."""
+    service = StatisticsService(db_session)
+    compute = service._compute
+
+    def compute_during_write(line_item, buckets):
+        stats = compute(line_item, buckets)
+        StatisticsService.invalidate(line_item.sourced_id)
+        return stats
+
+    monkeypatch.setattr(service, "_compute", compute_during_write)
+    service.get_line_item_statistics(sample_line_item)
+
+    assert statistics_cache.get(sample_line_item.sourced_id) is None
@@ -0,0 +1,198 @@
+"""
+Tests for the result write coalescer.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from psycopg2.errors import DeadlockDetected
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from src.config.settings import settings
+from src.models.models import LineItem, StatusEnum
+from src.services.result_service import ResultService
+from src.services.write_coalescer import ResultWriteCoalescer, result_write_coalescer
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture
+def coalescer(db_session):
+    """Coalescer whose batches run in savepoints of the test transaction."""
+    connection = db_session.connection()
+    return ResultWriteCoalescer(
+        session_factory=lambda: TestingSessionLocal(
+            bind=connection, join_transaction_mode="create_savepoint"
+        ),
+        delay_ms=20,
+    )
+
+
+@pytest.fixture
+def headers(oauth_token):
+    """Authorization headers with all gradebook scopes."""
+    return {"Authorization": f"Bearer {oauth_token}"}
+
+
+def _body(line_item_sourced_id: str, student: str, score: float) -> dict:
+    return {
+        "lineItemSourcedId": line_item_sourced_id,
+        "studentSourcedId": student,
+        "scoreStatus": "earnedPartial",
+        "score": score,
+    }
+
+
+def _run_concurrently(coalescer, writes):
+    async def run():
+        return await asyncio.gather(
+            *(coalescer.upsert(sourced_id, body) for sourced_id, body in writes),
+            return_exceptions=True,
+        )
+
+    return asyncio.run(run())
+
+
+def test_concurrent_writes_share_one_batch(coalescer, sample_line_item):
+    """Test that concurrent upserts are committed as a single batch."""
+    writes = [
+        (f"test-coalesce-{i}", _body(sample_line_item.sourced_id, f"test-student-{i}", 50 + i))
+        for i in range(5)
+    ]
+
+    outcomes = _run_concurrently(coalescer, writes)
+
+    assert [created for _, created, _ in outcomes] == [True] * 5
+    assert [body["sourcedId"] for body, _, _ in outcomes] == [w[0] for w in writes]
+    assert coalescer.batches == 1
+    assert coalescer.writes == 5
+
+
+def test_repeated_writes_apply_in_order(coalescer, sample_line_item):
+    """Test that two writes of the same result in one batch apply in arrival order."""
+    writes = [
+        ("test-coalesce-same", _body(sample_line_item.sourced_id, "test-student-same", 10)),
+        ("test-coalesce-same", _body(sample_line_item.sourced_id, "test-student-same", 20)),
+    ]
+
+    (first, first_created, _), (second, second_created, _) = _run_concurrently(coalescer, writes)
+
+    assert first_created is True
+    assert second_created is False
+    assert second["score"] == 20
+    assert coalescer.batches == 1
+
+
+def test_conflicting_write_fails_alone(coalescer, sample_line_item):
+    """Test that an integrity error only fails the offending write."""
+    writes = [
+        ("test-coalesce-a", _body(sample_line_item.sourced_id, "test-student-dup", 10)),
+        ("test-coalesce-b", _body(sample_line_item.sourced_id, "test-student-dup", 20)),
+        ("test-coalesce-c", _body(sample_line_item.sourced_id, "test-student-other", 30)),
+    ]
+
+    outcomes = _run_concurrently(coalescer, writes)
+
+    assert outcomes[0][0]["sourcedId"] == "test-coalesce-a"
+    assert isinstance(outcomes[1], IntegrityError)
+    assert outcomes[2][0]["sourcedId"] == "test-coalesce-c"
+
+
+def test_deadlocked_batch_is_retried(coalescer, sample_line_item, monkeypatch):
+    """Test that a batch chosen as a deadlock victim is retried whole."""
+    upsert_all = coalescer._upsert_all
+    calls = []
+
+    def deadlock_once(session, rows):
+        calls.append(len(rows))
+        if len(calls) == 1:
+            raise OperationalError("INSERT INTO results", {}, DeadlockDetected())
+        return upsert_all(session, rows)
+
+    monkeypatch.setattr(coalescer, "_upsert_all", deadlock_once)
+    writes = [
+        (f"test-coalesce-retry-{i}", _body(sample_line_item.sourced_id, f"test-student-{i}", i))
+        for i in range(3)
+    ]
+
+    outcomes = _run_concurrently(coalescer, writes)
+
+    assert calls == [3, 3]
+    assert [created for _, created, _ in outcomes] == [True] * 3
+
+
+def test_overlapping_batches_do_not_deadlock():
+    """Test that two workers' concurrent batches over the same results both commit."""
+    # Separate connections and real commits, as two workers would use. One
+    # line item per result, so the line item aggregates do not serialize
+    # the batches before their row locks can cross.
+    prefix = "test-coalesce-overlap-"
+    numbers = range(2000)
+    session = TestingSessionLocal()
+    session.add_all(
+        LineItem(
+            sourced_id=f"{prefix}li-{n:04}",
+            status=StatusEnum.active,
+            title="Overlapping batches",
+            class_sourced_id=f"{prefix}class",
+        )
+        for n in numbers
+    )
+    session.commit()
+
+    def rows(order):
+        return [
+            ResultService._to_row(
+                {
+                    **_body(f"{prefix}li-{n:04}", f"{prefix}student-{n:04}", n),
+                    "sourcedId": f"{prefix}{n:04}",
+                }
+            )
+            for n in order
+        ]
+
+    # The same results, arriving in opposite orders
+    batches = [rows(numbers), rows(reversed(numbers))]
+    # Both batches start together
+    barrier = threading.Barrier(2)
+
+    def session_factory():
+        barrier.wait(timeout=10)
+        return TestingSessionLocal()
+
+    coalescer = ResultWriteCoalescer(session_factory=session_factory, max_attempts=1)
+    try:
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            outcomes = list(pool.map(coalescer._write, batches))
+
+        assert all(not isinstance(outcome, Exception) for batch in outcomes for outcome in batch)
+        assert coalescer.batches == 2
+    finally:
+        session.rollback()
+        session.execute(
+            text("DELETE FROM line_items WHERE sourced_id LIKE :prefix"), {"prefix": f"{prefix}%"}
+        )
+        session.commit()
+        session.close()
+
+
+def test_coalesced_put_returns_etag(client, headers, coalescer, sample_line_item, monkeypatch):
+    """Test that a coalesced PUT answers with the ETag of the written result."""
+    monkeypatch.setattr(settings, "result_write_coalescing_enabled", True)
+    monkeypatch.setattr(result_write_coalescer, "session_factory", coalescer.session_factory)
+    url = "/ims/oneroster/v1p2/results/test-coalesce-etag"
+
+    response = client.put(
+        url,
+        headers=headers,
+        json={
+            **_body(sample_line_item.sourced_id, "test-student-etag", 60),
+            "sourcedId": "test-coalesce-etag",
+        },
+    )
+    fetched = client.get(url, headers=headers)
+
+    assert response.status_code == 201
+    assert response.headers["ETag"] == fetched.headers["ETag"]
@@ -0,0 +1,264 @@
+-- ================================================================
+-- Migration 001: Incrementally maintained result aggregates
+-- Applies to databases created from schema.sql before this change.
+-- ================================================================
+
+BEGIN;
+
+-- ================================================================
+-- Result Aggregates (incrementally maintained)
+-- ================================================================
+-- Running count/sum/sum of squares/min/max of active, scored results,
+-- kept per line item and per student+category by the results trigger
+-- below so statistics and running grades never rescan results.
+-- Uncategorized line items aggregate under category_sourced_id = ''.
+-- Run rebuild_result_aggregates() to repair any drift.
+
+CREATE TABLE line_item_aggregates (
+    line_item_sourced_id VARCHAR(255) PRIMARY KEY,
+    score_count BIGINT NOT NULL DEFAULT 0,
+    score_sum NUMERIC NOT NULL DEFAULT 0,
+    score_sum_squares NUMERIC NOT NULL DEFAULT 0,
+    score_min NUMERIC(10, 2),
+    score_max NUMERIC(10, 2),
+    date_last_modified TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE student_category_aggregates (
+    student_sourced_id VARCHAR(255) NOT NULL,
+    category_sourced_id VARCHAR(255) NOT NULL DEFAULT '',
+    score_count BIGINT NOT NULL DEFAULT 0,
+    score_sum NUMERIC NOT NULL DEFAULT 0,
+    score_sum_squares NUMERIC NOT NULL DEFAULT 0,
+    score_min NUMERIC(10, 2),
+    score_max NUMERIC(10, 2),
+    date_last_modified TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+
+    CONSTRAINT pk_student_category_aggregates
+        PRIMARY KEY (student_sourced_id, category_sourced_id)
+);
+
+-- Recompute one line item aggregate from the results table
+CREATE OR REPLACE FUNCTION refresh_line_item_aggregate(p_line_item VARCHAR)
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM line_item_aggregates WHERE line_item_sourced_id = p_line_item;
+
+    INSERT INTO line_item_aggregates (
+        line_item_sourced_id, score_count, score_sum, score_sum_squares, score_min, score_max
+    )
+    SELECT line_item_sourced_id, COUNT(*), SUM(score), SUM(score * score), MIN(score), MAX(score)
+    FROM results
+    WHERE line_item_sourced_id = p_line_item
+    AND status = 'active'
+    AND score IS NOT NULL
+    GROUP BY line_item_sourced_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Recompute one student+category aggregate from the results table
+CREATE OR REPLACE FUNCTION refresh_student_category_aggregate(p_student VARCHAR, p_category VARCHAR)
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM student_category_aggregates
+    WHERE student_sourced_id = p_student AND category_sourced_id = p_category;
+
+    INSERT INTO student_category_aggregates (
+        student_sourced_id, category_sourced_id,
+        score_count, score_sum, score_sum_squares, score_min, score_max
+    )
+    SELECT r.student_sourced_id, p_category,
+           COUNT(*), SUM(r.score), SUM(r.score * r.score), MIN(r.score), MAX(r.score)
+    FROM results r
+    INNER JOIN line_items li ON r.line_item_sourced_id = li.sourced_id
+    WHERE r.student_sourced_id = p_student
+    AND COALESCE(li.category_sourced_id, '') = p_category
+    AND r.status = 'active'
+    AND r.score IS NOT NULL
+    GROUP BY r.student_sourced_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Add (p_sign = 1) or remove (p_sign = -1) one score from the aggregates.
+-- Count and sums are exact deltas. Removing the current min/max re-reads
+-- them from the (already final) results rows; a following add in the same
+-- UPDATE is then a no-op for LEAST/GREATEST, so nothing is counted twice.
+CREATE OR REPLACE FUNCTION apply_result_aggregate_delta(
+    p_line_item VARCHAR, p_student VARCHAR, p_score NUMERIC, p_sign INTEGER
+)
+RETURNS VOID AS $$
+DECLARE
+    v_category VARCHAR(255);
+    v_agg RECORD;
+BEGIN
+    SELECT COALESCE(category_sourced_id, '') INTO v_category
+    FROM line_items WHERE sourced_id = p_line_item;
+    v_category := COALESCE(v_category, '');
+
+    IF p_sign > 0 THEN
+        INSERT INTO line_item_aggregates AS a (
+            line_item_sourced_id, score_count, score_sum, score_sum_squares, score_min, score_max
+        )
+        VALUES (p_line_item, 1, p_score, p_score * p_score, p_score, p_score)
+        ON CONFLICT (line_item_sourced_id) DO UPDATE SET
+            score_count = a.score_count + 1,
+            score_sum = a.score_sum + EXCLUDED.score_sum,
+            score_sum_squares = a.score_sum_squares + EXCLUDED.score_sum_squares,
+            score_min = LEAST(a.score_min, EXCLUDED.score_min),
+            score_max = GREATEST(a.score_max, EXCLUDED.score_max),
+            date_last_modified = NOW();
+
+        INSERT INTO student_category_aggregates AS a (
+            student_sourced_id, category_sourced_id,
+            score_count, score_sum, score_sum_squares, score_min, score_max
+        )
+        VALUES (p_student, v_category, 1, p_score, p_score * p_score, p_score, p_score)
+        ON CONFLICT (student_sourced_id, category_sourced_id) DO UPDATE SET
+            score_count = a.score_count + 1,
+            score_sum = a.score_sum + EXCLUDED.score_sum,
+            score_sum_squares = a.score_sum_squares + EXCLUDED.score_sum_squares,
+            score_min = LEAST(a.score_min, EXCLUDED.score_min),
+            score_max = GREATEST(a.score_max, EXCLUDED.score_max),
+            date_last_modified = NOW();
+        RETURN;
+    END IF;
+
+    UPDATE line_item_aggregates SET
+        score_count = score_count - 1,
+        score_sum = score_sum - p_score,
+        score_sum_squares = score_sum_squares - p_score * p_score,
+        date_last_modified = NOW()
+    WHERE line_item_sourced_id = p_line_item
+    RETURNING * INTO v_agg;
+
+    IF v_agg.score_count <= 0 THEN
+        DELETE FROM line_item_aggregates WHERE line_item_sourced_id = p_line_item;
+    ELSIF p_score <= v_agg.score_min OR p_score >= v_agg.score_max THEN
+        UPDATE line_item_aggregates a SET score_min = s.score_min, score_max = s.score_max
+        FROM (
+            SELECT MIN(score) AS score_min, MAX(score) AS score_max
+            FROM results
+            WHERE line_item_sourced_id = p_line_item AND status = 'active' AND score IS NOT NULL
+        ) s
+        WHERE a.line_item_sourced_id = p_line_item;
+    END IF;
+
+    UPDATE student_category_aggregates SET
+        score_count = score_count - 1,
+        score_sum = score_sum - p_score,
+        score_sum_squares = score_sum_squares - p_score * p_score,
+        date_last_modified = NOW()
+    WHERE student_sourced_id = p_student AND category_sourced_id = v_category
+    RETURNING * INTO v_agg;
+
+    IF v_agg.score_count <= 0 THEN
+        DELETE FROM student_category_aggregates
+        WHERE student_sourced_id = p_student AND category_sourced_id = v_category;
+    ELSIF p_score <= v_agg.score_min OR p_score >= v_agg.score_max THEN
+        UPDATE student_category_aggregates a SET score_min = s.score_min, score_max = s.score_max
+        FROM (
+            SELECT MIN(r.score) AS score_min, MAX(r.score) AS score_max
+            FROM results r
+            INNER JOIN line_items li ON r.line_item_sourced_id = li.sourced_id
+            WHERE r.student_sourced_id = p_student
+            AND COALESCE(li.category_sourced_id, '') = v_category
+            AND r.status = 'active' AND r.score IS NOT NULL
+        ) s
+        WHERE a.student_sourced_id = p_student AND a.category_sourced_id = v_category;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Row trigger: only active results with a numeric score contribute
+CREATE OR REPLACE FUNCTION maintain_result_aggregates()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.status = 'active' AND OLD.score IS NOT NULL THEN
+        IF TG_OP = 'UPDATE' AND NEW.status = 'active' AND NEW.score IS NOT DISTINCT FROM OLD.score
+            AND NEW.line_item_sourced_id = OLD.line_item_sourced_id
+            AND NEW.student_sourced_id = OLD.student_sourced_id THEN
+            RETURN NULL;
+        END IF;
+        PERFORM apply_result_aggregate_delta(
+            OLD.line_item_sourced_id, OLD.student_sourced_id, OLD.score, -1
+        );
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.status = 'active' AND NEW.score IS NOT NULL THEN
+        PERFORM apply_result_aggregate_delta(
+            NEW.line_item_sourced_id, NEW.student_sourced_id, NEW.score, 1
+        );
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER maintain_results_aggregates
+    AFTER INSERT OR UPDATE OR DELETE ON results
+    FOR EACH ROW EXECUTE FUNCTION maintain_result_aggregates();
+
+-- Moving a line item to another category moves its students' scores
+CREATE OR REPLACE FUNCTION maintain_line_item_category_aggregates()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_student VARCHAR(255);
+BEGIN
+    FOR v_student IN
+        SELECT DISTINCT student_sourced_id FROM results
+        WHERE line_item_sourced_id = NEW.sourced_id
+    LOOP
+        PERFORM refresh_student_category_aggregate(v_student, COALESCE(OLD.category_sourced_id, ''));
+        PERFORM refresh_student_category_aggregate(v_student, COALESCE(NEW.category_sourced_id, ''));
+    END LOOP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER maintain_line_items_category_aggregates
+    AFTER UPDATE OF category_sourced_id ON line_items
+    FOR EACH ROW
+    WHEN (OLD.category_sourced_id IS DISTINCT FROM NEW.category_sourced_id)
+    EXECUTE FUNCTION maintain_line_item_category_aggregates();
+
+-- Drift repair: rebuild every aggregate from the results table.
+-- Blocks result writes for the duration so no delta is lost.
+CREATE OR REPLACE FUNCTION rebuild_result_aggregates()
+RETURNS TABLE (line_item_rows BIGINT, student_category_rows BIGINT) AS $$
+BEGIN
+    LOCK TABLE results IN SHARE MODE;
+
+    DELETE FROM line_item_aggregates;
+    INSERT INTO line_item_aggregates (
+        line_item_sourced_id, score_count, score_sum, score_sum_squares, score_min, score_max
+    )
+    SELECT line_item_sourced_id, COUNT(*), SUM(score), SUM(score * score), MIN(score), MAX(score)
+    FROM results
+    WHERE status = 'active' AND score IS NOT NULL
+    GROUP BY line_item_sourced_id;
+    GET DIAGNOSTICS line_item_rows = ROW_COUNT;
+
+    DELETE FROM student_category_aggregates;
+    INSERT INTO student_category_aggregates (
+        student_sourced_id, category_sourced_id,
+        score_count, score_sum, score_sum_squares, score_min, score_max
+    )
+    SELECT r.student_sourced_id, COALESCE(li.category_sourced_id, ''),
+           COUNT(*), SUM(r.score), SUM(r.score * r.score), MIN(r.score), MAX(r.score)
+    FROM results r
+    INNER JOIN line_items li ON r.line_item_sourced_id = li.sourced_id
+    WHERE r.status = 'active' AND r.score IS NOT NULL
+    GROUP BY r.student_sourced_id, COALESCE(li.category_sourced_id, '');
+    GET DIAGNOSTICS student_category_rows = ROW_COUNT;
+
+    RETURN NEXT;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON TABLE line_item_aggregates IS 'Incrementally maintained score aggregates per line item';
+COMMENT ON TABLE student_category_aggregates IS 'Incrementally maintained score aggregates per student and category';
+
+-- Backfill from existing results
+SELECT * FROM rebuild_result_aggregates();
+
+COMMIT;
@@ -0,0 +1,26 @@
+-- ================================================================
+-- Migration 002: Delta sync keyset indexes
+-- Delta sync pages through (date_last_modified, sourced_id); extend the
+-- single-column modification indexes so the keyset is index-ordered.
+-- Run outside a transaction (CREATE INDEX CONCURRENTLY).
+-- ================================================================
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_categories_modified_keyset
+    ON categories(date_last_modified, sourced_id);
+DROP INDEX CONCURRENTLY IF EXISTS idx_categories_modified;
+ALTER INDEX idx_categories_modified_keyset RENAME TO idx_categories_modified;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_line_items_modified_keyset
+    ON line_items(date_last_modified, sourced_id);
+DROP INDEX CONCURRENTLY IF EXISTS idx_line_items_modified;
+ALTER INDEX idx_line_items_modified_keyset RENAME TO idx_line_items_modified;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_results_modified_keyset
+    ON results(date_last_modified, sourced_id);
+DROP INDEX CONCURRENTLY IF EXISTS idx_results_modified;
+ALTER INDEX idx_results_modified_keyset RENAME TO idx_results_modified;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_score_scales_modified_keyset
+    ON score_scales(date_last_modified, sourced_id);
+DROP INDEX CONCURRENTLY IF EXISTS idx_score_scales_modified;
+ALTER INDEX idx_score_scales_modified_keyset RENAME TO idx_score_scales_modified;
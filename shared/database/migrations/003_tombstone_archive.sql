@@ -0,0 +1,105 @@
+-- ================================================================
+-- Migration 003: Tombstone archive tables and compaction
+-- Applies to databases created from schema.sql before this change.
+-- ================================================================
+
+BEGIN;
+
+-- ================================================================
+-- Tombstone Archive
+-- ================================================================
+-- compact_tombstones_batch() moves tobedeleted rows older than a cutoff
+-- from a hot table into its *_archive table, one batch per call, so the
+-- caller can commit between batches and hold row locks only briefly.
+-- Line items are only moved once none of their results remain, and
+-- categories once no line item references them.
+-- compaction_watermarks records the newest cutoff per table; delta sync
+-- watermarks older than it can no longer see every deletion.
+
+CREATE TABLE categories_archive (
+    LIKE categories INCLUDING DEFAULTS,
+    archived_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE line_items_archive (
+    LIKE line_items INCLUDING DEFAULTS,
+    archived_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE results_archive (
+    LIKE results INCLUDING DEFAULTS,
+    archived_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE score_scales_archive (
+    LIKE score_scales INCLUDING DEFAULTS,
+    archived_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX idx_categories_archive_sourced_id ON categories_archive(sourced_id);
+CREATE INDEX idx_line_items_archive_sourced_id ON line_items_archive(sourced_id);
+CREATE INDEX idx_results_archive_sourced_id ON results_archive(sourced_id);
+CREATE INDEX idx_score_scales_archive_sourced_id ON score_scales_archive(sourced_id);
+
+CREATE TABLE compaction_watermarks (
+    table_name VARCHAR(63) PRIMARY KEY,
+    horizon TIMESTAMP WITH TIME ZONE NOT NULL,
+    rows_archived BIGINT NOT NULL DEFAULT 0,
+    last_run_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+CREATE OR REPLACE FUNCTION compact_tombstones_batch(
+    p_table TEXT,
+    p_cutoff TIMESTAMP WITH TIME ZONE,
+    p_batch_size INTEGER
+)
+RETURNS INTEGER AS $$
+DECLARE
+    moved_count INTEGER;
+    guard TEXT;
+BEGIN
+    guard := CASE p_table
+        WHEN 'results' THEN ''
+        WHEN 'score_scales' THEN ''
+        WHEN 'line_items' THEN
+            'AND NOT EXISTS (SELECT 1 FROM results r WHERE r.line_item_sourced_id = t.sourced_id)'
+        WHEN 'categories' THEN
+            'AND NOT EXISTS (SELECT 1 FROM line_items li WHERE li.category_sourced_id = t.sourced_id)'
+    END;
+    IF guard IS NULL THEN
+        RAISE EXCEPTION 'Unsupported table for compaction: %', p_table;
+    END IF;
+
+    EXECUTE format(
+        'WITH doomed AS (
+             SELECT t.sourced_id FROM %1$I t
+             WHERE t.status = ''tobedeleted'' AND t.date_last_modified < $1 %2$s
+             ORDER BY t.date_last_modified, t.sourced_id
+             LIMIT $2
+             FOR UPDATE SKIP LOCKED
+         ), moved AS (
+             DELETE FROM %1$I t USING doomed
+             WHERE t.sourced_id = doomed.sourced_id
+             RETURNING t.*
+         )
+         INSERT INTO %3$I SELECT moved.*, NOW() FROM moved',
+        p_table, guard, p_table || '_archive'
+    ) USING p_cutoff, p_batch_size;
+    GET DIAGNOSTICS moved_count = ROW_COUNT;
+
+    IF moved_count > 0 THEN
+        INSERT INTO compaction_watermarks (table_name, horizon, rows_archived)
+        VALUES (p_table, p_cutoff, moved_count)
+        ON CONFLICT (table_name) DO UPDATE
+        SET horizon = GREATEST(compaction_watermarks.horizon, EXCLUDED.horizon),
+            rows_archived = compaction_watermarks.rows_archived + EXCLUDED.rows_archived,
+            last_run_at = NOW();
+    END IF;
+
+    RETURN moved_count;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON TABLE compaction_watermarks IS 'Newest tombstone compaction cutoff per table (delta sync horizon)';
+
+COMMIT;
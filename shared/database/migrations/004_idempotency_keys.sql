@@ -0,0 +1,32 @@
+-- ================================================================
+-- Migration 004: Idempotency keys
+-- Applies to databases created from schema.sql before this change.
+-- ================================================================
+
+BEGIN;
+
+-- ================================================================
+-- Idempotency Keys (IDEMPOTENCY_STORE=postgres)
+-- ================================================================
+-- Stored responses for write requests carrying an Idempotency-Key,
+-- scoped per OAuth client. A row without a status code is a request in
+-- flight; its expires_at is a short lease until the response is stored.
+
+CREATE TABLE idempotency_keys (
+    client_id VARCHAR(255) NOT NULL,
+    idempotency_key VARCHAR(255) NOT NULL,
+    fingerprint CHAR(64) NOT NULL,
+    status_code INTEGER,
+    response_headers JSONB,
+    response_body BYTEA,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+
+    CONSTRAINT pk_idempotency_keys PRIMARY KEY (client_id, idempotency_key)
+);
+
+CREATE INDEX idx_idempotency_keys_expires ON idempotency_keys(expires_at);
+
+COMMENT ON TABLE idempotency_keys IS 'Stored responses for Idempotency-Key write requests';
+
+COMMIT;
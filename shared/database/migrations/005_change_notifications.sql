@@ -0,0 +1,51 @@
+-- ================================================================
+-- Migration 005: Change notifications for cache invalidation
+-- Applies to databases created from schema.sql before this change.
+-- ================================================================
+
+BEGIN;
+
+-- ================================================================
+-- Change Notifications (cross-worker cache invalidation)
+-- ================================================================
+-- Every committed row change is announced on the 'oneroster_changes'
+-- channel so each API worker can drop its cached copy. Postgres delivers
+-- notifications on commit and folds identical payloads within a
+-- transaction. Results also name their line item, whose statistics
+-- depend on them.
+
+CREATE OR REPLACE FUNCTION notify_entity_change()
+RETURNS TRIGGER AS $$
+DECLARE
+    changed JSONB;
+BEGIN
+    changed := to_jsonb(CASE WHEN TG_OP = 'DELETE' THEN OLD ELSE NEW END);
+    PERFORM pg_notify(
+        'oneroster_changes',
+        json_build_object(
+            'table', TG_TABLE_NAME,
+            'sourcedId', changed->>'sourced_id',
+            'lineItemSourcedId', changed->>'line_item_sourced_id'
+        )::text
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER notify_categories_change
+    AFTER INSERT OR UPDATE OR DELETE ON categories
+    FOR EACH ROW EXECUTE FUNCTION notify_entity_change();
+
+CREATE TRIGGER notify_line_items_change
+    AFTER INSERT OR UPDATE OR DELETE ON line_items
+    FOR EACH ROW EXECUTE FUNCTION notify_entity_change();
+
+CREATE TRIGGER notify_results_change
+    AFTER INSERT OR UPDATE OR DELETE ON results
+    FOR EACH ROW EXECUTE FUNCTION notify_entity_change();
+
+CREATE TRIGGER notify_score_scales_change
+    AFTER INSERT OR UPDATE OR DELETE ON score_scales
+    FOR EACH ROW EXECUTE FUNCTION notify_entity_change();
+
+COMMIT;
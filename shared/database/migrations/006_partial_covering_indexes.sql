@@ -0,0 +1,35 @@
+-- ================================================================
+-- Migration 006: Partial and covering collection indexes
+-- Replaces the full-table status and single-column lookup indexes on
+-- line_items and results with partial (status = 'active') indexes shaped
+-- like the collection queries.
+-- Run outside a transaction (CREATE INDEX CONCURRENTLY).
+-- ================================================================
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_line_items_active_class
+    ON line_items(class_sourced_id, due_date, sourced_id)
+    WHERE status = 'active';
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_line_items_active_due_date
+    ON line_items(due_date, sourced_id)
+    WHERE status = 'active';
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_results_active_line_item
+    ON results(line_item_sourced_id, sourced_id)
+    INCLUDE (score_status, score)
+    WHERE status = 'active';
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_results_active_student
+    ON results(student_sourced_id, sourced_id)
+    INCLUDE (line_item_sourced_id, score_status, score)
+    WHERE status = 'active';
+
+-- Superseded: the partial indexes above, or uk_result_student_lineitem
+-- for line item lookups across all statuses
+DROP INDEX CONCURRENTLY IF EXISTS idx_line_items_status;
+DROP INDEX CONCURRENTLY IF EXISTS idx_line_items_class;
+DROP INDEX CONCURRENTLY IF EXISTS idx_line_items_due_date;
+DROP INDEX CONCURRENTLY IF EXISTS idx_results_status;
+DROP INDEX CONCURRENTLY IF EXISTS idx_results_lineitem;
+DROP INDEX CONCURRENTLY IF EXISTS idx_results_student;
+
+ANALYZE line_items;
+ANALYZE results;
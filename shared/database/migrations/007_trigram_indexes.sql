@@ -0,0 +1,21 @@
+-- ================================================================
+-- Migration 007: Trigram indexes for contains filters
+-- Contains (~) filters become ILIKE '%value%'; pg_trgm GIN indexes on
+-- the searchable text columns let them avoid sequential scans.
+-- Run outside a transaction (CREATE INDEX CONCURRENTLY).
+-- ================================================================
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_categories_active_title_trgm
+    ON categories USING gin (title gin_trgm_ops)
+    WHERE status = 'active';
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_line_items_active_title_trgm
+    ON line_items USING gin (title gin_trgm_ops)
+    WHERE status = 'active';
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_line_items_active_description_trgm
+    ON line_items USING gin (description gin_trgm_ops)
+    WHERE status = 'active';
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_results_active_comment_trgm
+    ON results USING gin (comment gin_trgm_ops)
+    WHERE status = 'active';
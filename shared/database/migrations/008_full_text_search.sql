@@ -0,0 +1,87 @@
+-- ================================================================
+-- Migration 008: Full-text search vectors
+-- Adds generated tsvector columns with GIN indexes for the search=
+-- parameter on line items (title, description) and results (comment).
+-- Adding a stored generated column rewrites the table under an exclusive
+-- lock; run it in a maintenance window on large installations.
+-- ================================================================
+
+BEGIN;
+
+ALTER TABLE line_items ADD COLUMN search_vector TSVECTOR GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(description, '')), 'B')
+) STORED;
+
+ALTER TABLE results ADD COLUMN search_vector TSVECTOR GENERATED ALWAYS AS (
+    to_tsvector('english', coalesce(comment, ''))
+) STORED;
+
+CREATE INDEX idx_line_items_active_search ON line_items USING gin (search_vector)
+    WHERE status = 'active';
+CREATE INDEX idx_results_active_search ON results USING gin (search_vector)
+    WHERE status = 'active';
+
+-- The archive tables predate the new columns, so compaction now copies
+-- rows by the archive's column names instead of by position.
+CREATE OR REPLACE FUNCTION compact_tombstones_batch(
+    p_table TEXT,
+    p_cutoff TIMESTAMP WITH TIME ZONE,
+    p_batch_size INTEGER
+)
+RETURNS INTEGER AS $$
+DECLARE
+    moved_count INTEGER;
+    guard TEXT;
+    archived_columns TEXT;
+BEGIN
+    guard := CASE p_table
+        WHEN 'results' THEN ''
+        WHEN 'score_scales' THEN ''
+        WHEN 'line_items' THEN
+            'AND NOT EXISTS (SELECT 1 FROM results r WHERE r.line_item_sourced_id = t.sourced_id)'
+        WHEN 'categories' THEN
+            'AND NOT EXISTS (SELECT 1 FROM line_items li WHERE li.category_sourced_id = t.sourced_id)'
+    END;
+    IF guard IS NULL THEN
+        RAISE EXCEPTION 'Unsupported table for compaction: %', p_table;
+    END IF;
+
+    -- Archive columns by name: columns added to the hot table later (e.g.
+    -- generated search vectors) need not exist in the archive
+    SELECT string_agg(quote_ident(attname), ', ' ORDER BY attnum) INTO archived_columns
+    FROM pg_attribute
+    WHERE attrelid = (p_table || '_archive')::regclass
+      AND attnum > 0 AND NOT attisdropped AND attname <> 'archived_at';
+
+    EXECUTE format(
+        'WITH doomed AS (
+             SELECT t.sourced_id FROM %1$I t
+             WHERE t.status = ''tobedeleted'' AND t.date_last_modified < $1 %2$s
+             ORDER BY t.date_last_modified, t.sourced_id
+             LIMIT $2
+             FOR UPDATE SKIP LOCKED
+         ), moved AS (
+             DELETE FROM %1$I t USING doomed
+             WHERE t.sourced_id = doomed.sourced_id
+             RETURNING t.*
+         )
+         INSERT INTO %3$I (%4$s, archived_at) SELECT %4$s, NOW() FROM moved',
+        p_table, guard, p_table || '_archive', archived_columns
+    ) USING p_cutoff, p_batch_size;
+    GET DIAGNOSTICS moved_count = ROW_COUNT;
+
+    IF moved_count > 0 THEN
+        INSERT INTO compaction_watermarks (table_name, horizon, rows_archived)
+        VALUES (p_table, p_cutoff, moved_count)
+        ON CONFLICT (table_name) DO UPDATE
+        SET horizon = GREATEST(compaction_watermarks.horizon, EXCLUDED.horizon),
+            rows_archived = compaction_watermarks.rows_archived + EXCLUDED.rows_archived,
+            last_run_at = NOW();
+    END IF;
+
+    RETURN moved_count;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMIT;
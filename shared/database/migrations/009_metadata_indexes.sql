@@ -0,0 +1,16 @@
+-- ================================================================
+-- Migration 009: Metadata containment indexes
+-- metadata.<key>='value' filters become metadata @> '{"key": "value"}';
+-- jsonb_path_ops GIN indexes over active rows answer them.
+-- Run outside a transaction (CREATE INDEX CONCURRENTLY).
+-- ================================================================
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_categories_active_metadata
+    ON categories USING gin (metadata jsonb_path_ops)
+    WHERE status = 'active';
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_line_items_active_metadata
+    ON line_items USING gin (metadata jsonb_path_ops)
+    WHERE status = 'active';
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_results_active_metadata
+    ON results USING gin (metadata jsonb_path_ops)
+    WHERE status = 'active';
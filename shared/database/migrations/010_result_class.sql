@@ -0,0 +1,53 @@
+-- ================================================================
+-- Migration 010: Denormalized result class
+-- results.class_sourced_id is copied from the line item on insert (and
+-- when a result moves to another line item), and follows line item class
+-- changes. Existing rows are filled in afterwards, in batches, with
+-- `python -m src.cli backfill-result-classes`.
+-- The index statements run outside a transaction (CONCURRENTLY).
+-- ================================================================
+
+BEGIN;
+
+ALTER TABLE results ADD COLUMN IF NOT EXISTS class_sourced_id VARCHAR(255);
+
+COMMENT ON COLUMN results.class_sourced_id IS 'Class of the line item, kept in sync by set_results_class';
+
+CREATE OR REPLACE FUNCTION set_result_class()
+RETURNS TRIGGER AS $$
+BEGIN
+    SELECT class_sourced_id INTO NEW.class_sourced_id
+    FROM line_items WHERE sourced_id = NEW.line_item_sourced_id;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS set_results_class ON results;
+CREATE TRIGGER set_results_class
+    BEFORE INSERT OR UPDATE OF line_item_sourced_id ON results
+    FOR EACH ROW EXECUTE FUNCTION set_result_class();
+
+CREATE OR REPLACE FUNCTION propagate_line_item_class()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE results SET class_sourced_id = NEW.class_sourced_id
+    WHERE line_item_sourced_id = NEW.sourced_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS propagate_line_items_class ON line_items;
+CREATE TRIGGER propagate_line_items_class
+    AFTER UPDATE OF class_sourced_id ON line_items
+    FOR EACH ROW
+    WHEN (OLD.class_sourced_id IS DISTINCT FROM NEW.class_sourced_id)
+    EXECUTE FUNCTION propagate_line_item_class();
+
+COMMIT;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_results_active_class
+    ON results(class_sourced_id, sourced_id)
+    WHERE status = 'active';
+
+-- Superseded by idx_results_active_class
+DROP INDEX CONCURRENTLY IF EXISTS idx_results_class;
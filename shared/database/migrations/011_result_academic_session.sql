@@ -0,0 +1,57 @@
+-- ================================================================
+-- Migration 011: Denormalized result academic session
+-- results.academic_session_sourced_id is copied from the line item by the
+-- same triggers as class_sourced_id (which replace the ones from 010). It
+-- is the partition key of the optional partitioned layout (012). Existing
+-- rows are filled in with `python -m src.cli backfill-result-classes`.
+-- ================================================================
+
+BEGIN;
+
+-- NOT NULL with a constant default does not rewrite the table
+ALTER TABLE results
+    ADD COLUMN IF NOT EXISTS academic_session_sourced_id VARCHAR(255) NOT NULL DEFAULT '';
+
+COMMENT ON COLUMN results.class_sourced_id IS 'Class of the line item, kept in sync by trigger';
+COMMENT ON COLUMN results.academic_session_sourced_id IS 'Academic session of the line item (partition key), kept in sync by trigger';
+
+DROP TRIGGER IF EXISTS set_results_class ON results;
+DROP TRIGGER IF EXISTS propagate_line_items_class ON line_items;
+DROP FUNCTION IF EXISTS set_result_class();
+DROP FUNCTION IF EXISTS propagate_line_item_class();
+
+CREATE OR REPLACE FUNCTION set_result_line_item_columns()
+RETURNS TRIGGER AS $$
+BEGIN
+    SELECT class_sourced_id, COALESCE(academic_session_sourced_id, '')
+    INTO NEW.class_sourced_id, NEW.academic_session_sourced_id
+    FROM line_items WHERE sourced_id = NEW.line_item_sourced_id;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS set_results_line_item_columns ON results;
+CREATE TRIGGER set_results_line_item_columns
+    BEFORE INSERT OR UPDATE OF line_item_sourced_id ON results
+    FOR EACH ROW EXECUTE FUNCTION set_result_line_item_columns();
+
+CREATE OR REPLACE FUNCTION propagate_line_item_columns()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE results
+    SET class_sourced_id = NEW.class_sourced_id,
+        academic_session_sourced_id = COALESCE(NEW.academic_session_sourced_id, '')
+    WHERE line_item_sourced_id = NEW.sourced_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS propagate_line_items_columns ON line_items;
+CREATE TRIGGER propagate_line_items_columns
+    AFTER UPDATE OF class_sourced_id, academic_session_sourced_id ON line_items
+    FOR EACH ROW
+    WHEN (OLD.class_sourced_id IS DISTINCT FROM NEW.class_sourced_id
+          OR OLD.academic_session_sourced_id IS DISTINCT FROM NEW.academic_session_sourced_id)
+    EXECUTE FUNCTION propagate_line_item_columns();
+
+COMMIT;
@@ -0,0 +1,258 @@
+-- ================================================================
+-- Migration 012 (optional): Partition results by academic session
+-- Rebuilds results as a LIST-partitioned table on
+-- academic_session_sourced_id (from 011), with one partition per session
+-- found in line_items and a default partition for everything else, so
+-- old terms get their own heap and indexes and can be detached.
+--
+-- Requires 011 and a filled-in academic_session_sourced_id
+-- (backfill-result-classes). Copies every result under an exclusive lock:
+-- run it in a maintenance window, then set RESULTS_PARTITIONED=true.
+-- Afterwards:
+--   python -m src.cli create-result-partitions     (new sessions)
+--   python -m src.cli detach-result-partition --academic-session ID
+--
+-- Differences from the plain layout: the primary key and the
+-- one-result-per-student constraint include the partition key, and
+-- sourcedId uniqueness across sessions is checked by a trigger. A PUT
+-- that moves a result to a line item of another session deletes it from
+-- the old partition and inserts it into the new one: the change feed sees
+-- a delete and an insert, and created_at restarts.
+-- ================================================================
+
+BEGIN;
+
+LOCK TABLE results IN ACCESS EXCLUSIVE MODE;
+
+DROP VIEW IF EXISTS v_student_results;
+ALTER TABLE results RENAME TO results_unpartitioned;
+
+CREATE TABLE results (
+    sourced_id VARCHAR(255) NOT NULL,
+    status status_enum NOT NULL DEFAULT 'active',
+    date_last_modified TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    line_item_sourced_id VARCHAR(255) NOT NULL,
+    student_sourced_id VARCHAR(255) NOT NULL,
+    class_sourced_id VARCHAR(255),
+    academic_session_sourced_id VARCHAR(255) NOT NULL DEFAULT '',
+    score_status score_status_enum,
+    score DECIMAL(10, 2),
+    text_score VARCHAR(255),
+    score_date DATE,
+    comment TEXT,
+    score_scale_sourced_id VARCHAR(255),
+    learning_objective_set JSONB,
+    in_progress BOOLEAN DEFAULT FALSE,
+    incomplete BOOLEAN DEFAULT FALSE,
+    late BOOLEAN DEFAULT FALSE,
+    missing BOOLEAN DEFAULT FALSE,
+    metadata JSONB,
+    -- Per statement, so an upsert can tell its inserts from its replaces
+    -- (partitioned tables cannot return xmax)
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT statement_timestamp(),
+    search_vector TSVECTOR GENERATED ALWAYS AS (
+        to_tsvector('english', coalesce(comment, ''))
+    ) STORED
+) PARTITION BY LIST (academic_session_sourced_id);
+
+CREATE TABLE results_default PARTITION OF results DEFAULT;
+
+-- Partitions are named results_<md5 prefix of the session sourcedId>.
+-- A detached session is not recreated. Rows of the session already in the
+-- default partition are moved through the parent, so the aggregate
+-- triggers see a delete and an insert.
+CREATE OR REPLACE FUNCTION create_result_partition(p_session VARCHAR)
+RETURNS TEXT AS $$
+DECLARE
+    v_table TEXT := 'results_' || substr(md5(p_session), 1, 12);
+    v_columns TEXT;
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_inherits
+        WHERE inhparent = 'results'::regclass AND inhrelid = to_regclass(v_table)
+    ) THEN
+        RETURN v_table;
+    ELSIF to_regclass(v_table) IS NOT NULL THEN
+        RAISE EXCEPTION 'Table % for academic session % exists but is detached', v_table, p_session
+            USING ERRCODE = 'duplicate_table';
+    END IF;
+
+    SELECT string_agg(quote_ident(attname), ', ' ORDER BY attnum) INTO v_columns
+    FROM pg_attribute
+    WHERE attrelid = 'results'::regclass AND attnum > 0
+    AND NOT attisdropped AND attgenerated = '';
+
+    LOCK TABLE results_default IN EXCLUSIVE MODE;
+    CREATE TEMP TABLE moved_results (LIKE results) ON COMMIT DROP;
+    EXECUTE format(
+        'WITH moved AS ('
+        '    DELETE FROM results WHERE academic_session_sourced_id = $1 RETURNING %s'
+        ') INSERT INTO moved_results (%s) SELECT %s FROM moved',
+        v_columns, v_columns, v_columns
+    ) USING p_session;
+
+    EXECUTE format(
+        'CREATE TABLE %I PARTITION OF results FOR VALUES IN (%L)', v_table, p_session
+    );
+    EXECUTE format(
+        'INSERT INTO results (%s) SELECT %s FROM moved_results', v_columns, v_columns
+    );
+    DROP TABLE moved_results;
+    RETURN v_table;
+END;
+$$ LANGUAGE plpgsql;
+
+-- The detached table keeps the session's results (for dumps or archiving);
+-- they no longer count towards the score aggregates.
+CREATE OR REPLACE FUNCTION detach_result_partition(p_session VARCHAR)
+RETURNS TEXT AS $$
+DECLARE
+    v_table TEXT := 'results_' || substr(md5(p_session), 1, 12);
+    v_line_item VARCHAR(255);
+    v_student VARCHAR(255);
+    v_category VARCHAR(255);
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_inherits
+        WHERE inhparent = 'results'::regclass AND inhrelid = to_regclass(v_table)
+    ) THEN
+        RAISE EXCEPTION 'results has no partition for academic session %', p_session
+            USING ERRCODE = 'undefined_table';
+    END IF;
+
+    EXECUTE format('ALTER TABLE results DETACH PARTITION %I', v_table);
+
+    FOR v_line_item IN
+        EXECUTE format('SELECT DISTINCT line_item_sourced_id FROM %I', v_table)
+    LOOP
+        PERFORM refresh_line_item_aggregate(v_line_item);
+    END LOOP;
+    FOR v_student, v_category IN
+        EXECUTE format(
+            'SELECT DISTINCT r.student_sourced_id, COALESCE(li.category_sourced_id, '''') '
+            'FROM %I r JOIN line_items li ON li.sourced_id = r.line_item_sourced_id',
+            v_table
+        )
+    LOOP
+        PERFORM refresh_student_category_aggregate(v_student, v_category);
+    END LOOP;
+    RETURN v_table;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT create_result_partition(session)
+FROM (
+    SELECT DISTINCT academic_session_sourced_id AS session FROM line_items
+    WHERE academic_session_sourced_id IS NOT NULL AND academic_session_sourced_id <> ''
+) sessions;
+
+-- Copied before any trigger exists: the aggregates already count these rows
+INSERT INTO results (
+    sourced_id, status, date_last_modified, line_item_sourced_id, student_sourced_id,
+    class_sourced_id, academic_session_sourced_id, score_status, score, text_score,
+    score_date, comment, score_scale_sourced_id, learning_objective_set, in_progress,
+    incomplete, late, missing, metadata, created_at
+)
+SELECT
+    sourced_id, status, date_last_modified, line_item_sourced_id, student_sourced_id,
+    class_sourced_id, academic_session_sourced_id, score_status, score, text_score,
+    score_date, comment, score_scale_sourced_id, learning_objective_set, in_progress,
+    incomplete, late, missing, metadata, created_at
+FROM results_unpartitioned;
+
+DROP TABLE results_unpartitioned;
+
+ALTER TABLE results
+    ADD CONSTRAINT results_pkey PRIMARY KEY (sourced_id, academic_session_sourced_id),
+    ADD CONSTRAINT uk_result_student_lineitem
+        UNIQUE (line_item_sourced_id, student_sourced_id, academic_session_sourced_id),
+    ADD CONSTRAINT fk_result_lineitem
+        FOREIGN KEY (line_item_sourced_id)
+        REFERENCES line_items(sourced_id)
+        ON DELETE CASCADE,
+    ADD CONSTRAINT chk_score_types CHECK (
+        (score IS NULL OR text_score IS NULL) OR
+        (score IS NOT NULL OR text_score IS NOT NULL)
+    );
+
+-- The partition key is included so pruned statistics stay index-only
+CREATE INDEX idx_results_active_line_item ON results(line_item_sourced_id, sourced_id)
+    INCLUDE (score_status, score, academic_session_sourced_id)
+    WHERE status = 'active';
+CREATE INDEX idx_results_active_student ON results(student_sourced_id, sourced_id)
+    INCLUDE (line_item_sourced_id, score_status, score)
+    WHERE status = 'active';
+CREATE INDEX idx_results_active_class ON results(class_sourced_id, sourced_id)
+    WHERE status = 'active';
+CREATE INDEX idx_results_modified ON results(date_last_modified, sourced_id);
+CREATE INDEX idx_results_score_date ON results(score_date);
+CREATE INDEX idx_results_score_status ON results(score_status);
+CREATE INDEX idx_results_active_comment_trgm ON results USING gin (comment gin_trgm_ops)
+    WHERE status = 'active';
+CREATE INDEX idx_results_active_search ON results USING gin (search_vector)
+    WHERE status = 'active';
+CREATE INDEX idx_results_active_metadata ON results USING gin (metadata jsonb_path_ops)
+    WHERE status = 'active';
+
+-- A sourcedId names one result whatever its session. Runs after
+-- set_results_line_item_columns (triggers fire in name order). The
+-- advisory lock serializes writers of one sourcedId until they commit, so
+-- two transactions cannot both insert it into different sessions; PUT
+-- takes the same lock before moving a result.
+CREATE OR REPLACE FUNCTION check_result_sourced_id()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext(NEW.sourced_id));
+    IF EXISTS (
+        SELECT 1 FROM results
+        WHERE sourced_id = NEW.sourced_id
+        AND academic_session_sourced_id <> NEW.academic_session_sourced_id
+    ) THEN
+        RAISE EXCEPTION 'Result % exists in another academic session', NEW.sourced_id
+            USING ERRCODE = 'unique_violation';
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER update_results_modtime
+    BEFORE UPDATE ON results
+    FOR EACH ROW EXECUTE FUNCTION update_modified_column();
+
+CREATE TRIGGER set_results_line_item_columns
+    BEFORE INSERT OR UPDATE OF line_item_sourced_id ON results
+    FOR EACH ROW EXECUTE FUNCTION set_result_line_item_columns();
+
+CREATE TRIGGER unique_results_sourced_id
+    BEFORE INSERT ON results
+    FOR EACH ROW EXECUTE FUNCTION check_result_sourced_id();
+
+CREATE TRIGGER maintain_results_aggregates
+    AFTER INSERT OR UPDATE OR DELETE ON results
+    FOR EACH ROW EXECUTE FUNCTION maintain_result_aggregates();
+
+CREATE TRIGGER notify_results_change
+    AFTER INSERT OR UPDATE OR DELETE ON results
+    FOR EACH ROW EXECUTE FUNCTION notify_entity_change();
+
+CREATE VIEW v_student_results AS
+SELECT
+    r.student_sourced_id,
+    r.class_sourced_id,
+    li.title AS lineitem_title,
+    li.category_sourced_id,
+    c.title AS category_title,
+    r.score,
+    r.text_score,
+    r.score_status,
+    r.score_date,
+    r.late,
+    r.missing
+FROM results r
+INNER JOIN line_items li ON r.line_item_sourced_id = li.sourced_id
+LEFT JOIN categories c ON li.category_sourced_id = c.sourced_id
+WHERE r.status = 'active' AND li.status = 'active';
+
+ANALYZE results;
+
+COMMIT;
@@ -0,0 +1,43 @@
+-- ================================================================
+-- Migration 013 (optional): BRIN indexes on result timestamps
+-- Replaces the B-tree indexes on results.date_last_modified and
+-- results.score_date with BRIN indexes, for large installations where
+-- those B-trees dominate index size and write cost. Both columns follow
+-- insertion order closely (every update stamps date_last_modified, and
+-- new row versions mostly land in recently filled pages), so a block
+-- range summary is selective at a fraction of the size. Updates also
+-- regain HOT eligibility: every update changes date_last_modified, which
+-- rules HOT out under a B-tree but not under a BRIN index (PostgreSQL 16).
+--
+-- BRIN indexes serve range filters (dateLastModified or scoreDate
+-- comparisons) but not ordering: set RESULTS_BRIN_INDEXES=true afterwards
+-- so the query guard stops accepting unfiltered sorts on them.
+--
+-- Dropping idx_results_modified costs delta sync its keyset order. A
+-- changedSince or cursor page then reads and sorts every result modified
+-- after its watermark, so a page from an old watermark (a full resync, a
+-- long-idle client) costs O(rows since the watermark), not O(page), and
+-- delta sync is not checked by the query guard. Installations with such
+-- clients should keep idx_results_modified: skip its DROP below and lose
+-- HOT updates, or leave date_last_modified alone. `make bench-brin`
+-- compares the two layouts, delta sync from a recent and an old
+-- watermark included, before switching.
+--
+-- Run outside a transaction (CREATE INDEX CONCURRENTLY). On the
+-- partitioned layout (012) drop CONCURRENTLY, which partitioned tables
+-- do not support.
+-- ================================================================
+
+-- Smaller ranges than the default 128 pages keep delta sync pages
+-- selective; autosummarize summarizes newly filled ranges on autovacuum
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_results_modified_brin
+    ON results USING brin (date_last_modified)
+    WITH (pages_per_range = 32, autosummarize = on);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_results_score_date_brin
+    ON results USING brin (score_date)
+    WITH (pages_per_range = 32, autosummarize = on);
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_results_modified;
+DROP INDEX CONCURRENTLY IF EXISTS idx_results_score_date;
+
+ANALYZE results;
@@ -9,6 +9,7 @@
 -- Extensions
 -- ================================================================
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
 
 -- ================================================================
 -- Enums
@@ -58,7 +59,13 @@ CREATE TABLE categories (
 
 -- Indexes for categories
 CREATE INDEX idx_categories_status ON categories(status);
-CREATE INDEX idx_categories_modified ON categories(date_last_modified);
+CREATE INDEX idx_categories_modified ON categories(date_last_modified, sourced_id);
+-- Contains (~) filters: ILIKE '%value%' is answered by trigram indexes
+CREATE INDEX idx_categories_active_title_trgm ON categories USING gin (title gin_trgm_ops)
+    WHERE status = 'active';
+-- metadata.<key>='value' filters: containment (@>) on vendor metadata
+CREATE INDEX idx_categories_active_metadata ON categories USING gin (metadata jsonb_path_ops)
+    WHERE status = 'active';
 
 -- Trigger for categories
 CREATE TRIGGER update_categories_modtime
@@ -108,6 +115,12 @@ CREATE TABLE line_items (
     metadata JSONB,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     
+    -- Full-text search (search= parameter): title ranks above description
+    search_vector TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED,
+    
     -- Constraints
     CONSTRAINT fk_lineitem_category
         FOREIGN KEY (category_sourced_id)
@@ -126,14 +139,28 @@ CREATE TABLE line_items (
 );
 
 -- Indexes for line_items
-CREATE INDEX idx_line_items_status ON line_items(status);
-CREATE INDEX idx_line_items_class ON line_items(class_sourced_id);
+-- API reads only see active rows, so the collection indexes are partial:
+-- class pages sorted by due date, and due date pages, in index order.
+CREATE INDEX idx_line_items_active_class ON line_items(class_sourced_id, due_date, sourced_id)
+    WHERE status = 'active';
+CREATE INDEX idx_line_items_active_due_date ON line_items(due_date, sourced_id)
+    WHERE status = 'active';
 CREATE INDEX idx_line_items_category ON line_items(category_sourced_id);
 CREATE INDEX idx_line_items_grading_period ON line_items(grading_period_sourced_id);
 CREATE INDEX idx_line_items_academic_session ON line_items(academic_session_sourced_id);
 CREATE INDEX idx_line_items_school ON line_items(school_sourced_id);
-CREATE INDEX idx_line_items_modified ON line_items(date_last_modified);
-CREATE INDEX idx_line_items_due_date ON line_items(due_date);
+CREATE INDEX idx_line_items_modified ON line_items(date_last_modified, sourced_id);
+-- Contains (~) filters: ILIKE '%value%' is answered by trigram indexes
+CREATE INDEX idx_line_items_active_title_trgm ON line_items USING gin (title gin_trgm_ops)
+    WHERE status = 'active';
+CREATE INDEX idx_line_items_active_description_trgm
+    ON line_items USING gin (description gin_trgm_ops)
+    WHERE status = 'active';
+CREATE INDEX idx_line_items_active_search ON line_items USING gin (search_vector)
+    WHERE status = 'active';
+-- metadata.<key>='value' filters: containment (@>) on vendor metadata
+CREATE INDEX idx_line_items_active_metadata ON line_items USING gin (metadata jsonb_path_ops)
+    WHERE status = 'active';
 
 -- Trigger for line_items
 CREATE TRIGGER update_line_items_modtime
@@ -161,6 +188,8 @@ CREATE TABLE results (
     line_item_sourced_id VARCHAR(255) NOT NULL,
     student_sourced_id VARCHAR(255) NOT NULL,
     class_sourced_id VARCHAR(255),
+    -- Partition key when results is partitioned ('' = no academic session)
+    academic_session_sourced_id VARCHAR(255) NOT NULL DEFAULT '',
     
     -- Score information
     score_status score_status_enum,
@@ -183,6 +212,11 @@ CREATE TABLE results (
     metadata JSONB,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     
+    -- Full-text search (search= parameter)
+    search_vector TSVECTOR GENERATED ALWAYS AS (
+        to_tsvector('english', coalesce(comment, ''))
+    ) STORED,
+    
     -- Constraints
     CONSTRAINT fk_result_lineitem
         FOREIGN KEY (line_item_sourced_id)
@@ -200,24 +234,80 @@ CREATE TABLE results (
 );
 
 -- Indexes for results
-CREATE INDEX idx_results_status ON results(status);
-CREATE INDEX idx_results_lineitem ON results(line_item_sourced_id);
-CREATE INDEX idx_results_student ON results(student_sourced_id);
-CREATE INDEX idx_results_class ON results(class_sourced_id);
-CREATE INDEX idx_results_modified ON results(date_last_modified);
+-- Lookups by line item for any status use uk_result_student_lineitem.
+-- Active pages by line item or student are partial and keyed in sourcedId
+-- order; the INCLUDE columns make counts, score statistics and per-student
+-- score listings index-only scans.
+CREATE INDEX idx_results_active_line_item ON results(line_item_sourced_id, sourced_id)
+    INCLUDE (score_status, score)
+    WHERE status = 'active';
+CREATE INDEX idx_results_active_student ON results(student_sourced_id, sourced_id)
+    INCLUDE (line_item_sourced_id, score_status, score)
+    WHERE status = 'active';
+CREATE INDEX idx_results_active_class ON results(class_sourced_id, sourced_id)
+    WHERE status = 'active';
+-- Large installations can swap these two for BRIN indexes
+-- (migrations/013_brin_timestamp_indexes.sql, RESULTS_BRIN_INDEXES=true)
+CREATE INDEX idx_results_modified ON results(date_last_modified, sourced_id);
 CREATE INDEX idx_results_score_date ON results(score_date);
 CREATE INDEX idx_results_score_status ON results(score_status);
+-- Contains (~) filters: ILIKE '%value%' is answered by trigram indexes
+CREATE INDEX idx_results_active_comment_trgm ON results USING gin (comment gin_trgm_ops)
+    WHERE status = 'active';
+CREATE INDEX idx_results_active_search ON results USING gin (search_vector)
+    WHERE status = 'active';
+-- metadata.<key>='value' filters: containment (@>) on vendor metadata
+CREATE INDEX idx_results_active_metadata ON results USING gin (metadata jsonb_path_ops)
+    WHERE status = 'active';
 
 -- Trigger for results
 CREATE TRIGGER update_results_modtime
     BEFORE UPDATE ON results
     FOR EACH ROW EXECUTE FUNCTION update_modified_column();
 
+-- results.class_sourced_id and academic_session_sourced_id are denormalized
+-- from the line item, so class-level result queries are one index scan
+-- instead of a join through line_items, and a partitioned results table
+-- (migrations/012_partition_results.sql) can be pruned by session
+CREATE OR REPLACE FUNCTION set_result_line_item_columns()
+RETURNS TRIGGER AS $$
+BEGIN
+    SELECT class_sourced_id, COALESCE(academic_session_sourced_id, '')
+    INTO NEW.class_sourced_id, NEW.academic_session_sourced_id
+    FROM line_items WHERE sourced_id = NEW.line_item_sourced_id;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER set_results_line_item_columns
+    BEFORE INSERT OR UPDATE OF line_item_sourced_id ON results
+    FOR EACH ROW EXECUTE FUNCTION set_result_line_item_columns();
+
+CREATE OR REPLACE FUNCTION propagate_line_item_columns()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE results
+    SET class_sourced_id = NEW.class_sourced_id,
+        academic_session_sourced_id = COALESCE(NEW.academic_session_sourced_id, '')
+    WHERE line_item_sourced_id = NEW.sourced_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER propagate_line_items_columns
+    AFTER UPDATE OF class_sourced_id, academic_session_sourced_id ON line_items
+    FOR EACH ROW
+    WHEN (OLD.class_sourced_id IS DISTINCT FROM NEW.class_sourced_id
+          OR OLD.academic_session_sourced_id IS DISTINCT FROM NEW.academic_session_sourced_id)
+    EXECUTE FUNCTION propagate_line_item_columns();
+
 -- Comments for results
 COMMENT ON TABLE results IS 'OneRoster Gradebook Results - individual student scores for line items';
 COMMENT ON COLUMN results.sourced_id IS 'Unique identifier for the result';
 COMMENT ON COLUMN results.line_item_sourced_id IS 'Foreign key to line_items table';
 COMMENT ON COLUMN results.student_sourced_id IS 'Reference to User (student) in Rostering Service';
+COMMENT ON COLUMN results.class_sourced_id IS 'Class of the line item, kept in sync by trigger';
+COMMENT ON COLUMN results.academic_session_sourced_id IS 'Academic session of the line item (partition key), kept in sync by trigger';
 COMMENT ON COLUMN results.score IS 'Numeric score value';
 COMMENT ON COLUMN results.text_score IS 'Text-based score (e.g., letter grade, rubric level)';
 COMMENT ON COLUMN results.score_status IS 'Status of the submission/grading';
@@ -252,7 +342,7 @@ CREATE TABLE score_scales (
 CREATE INDEX idx_score_scales_status ON score_scales(status);
 CREATE INDEX idx_score_scales_class ON score_scales(class_sourced_id);
 CREATE INDEX idx_score_scales_course ON score_scales(course_sourced_id);
-CREATE INDEX idx_score_scales_modified ON score_scales(date_last_modified);
+CREATE INDEX idx_score_scales_modified ON score_scales(date_last_modified, sourced_id);
 
 -- Trigger for score_scales
 CREATE TRIGGER update_score_scales_modtime
@@ -265,6 +355,431 @@ COMMENT ON COLUMN score_scales.sourced_id IS 'Unique identifier for the score sc
 COMMENT ON COLUMN score_scales.title IS 'Name of the score scale (e.g., "Letter Grades A-F")';
 COMMENT ON COLUMN score_scales.score_scale_value IS 'JSON array defining scale values and thresholds';
 
+-- ================================================================
+-- Result Aggregates (incrementally maintained)
+-- ================================================================
+-- Running count/sum/sum of squares/min/max of active, scored results,
+-- kept per line item and per student+category by the results trigger
+-- below so statistics and running grades never rescan results.
+-- Uncategorized line items aggregate under category_sourced_id = ''.
+-- Run rebuild_result_aggregates() to repair any drift.
+
+CREATE TABLE line_item_aggregates (
+    line_item_sourced_id VARCHAR(255) PRIMARY KEY,
+    score_count BIGINT NOT NULL DEFAULT 0,
+    score_sum NUMERIC NOT NULL DEFAULT 0,
+    score_sum_squares NUMERIC NOT NULL DEFAULT 0,
+    score_min NUMERIC(10, 2),
+    score_max NUMERIC(10, 2),
+    date_last_modified TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE student_category_aggregates (
+    student_sourced_id VARCHAR(255) NOT NULL,
+    category_sourced_id VARCHAR(255) NOT NULL DEFAULT '',
+    score_count BIGINT NOT NULL DEFAULT 0,
+    score_sum NUMERIC NOT NULL DEFAULT 0,
+    score_sum_squares NUMERIC NOT NULL DEFAULT 0,
+    score_min NUMERIC(10, 2),
+    score_max NUMERIC(10, 2),
+    date_last_modified TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+
+    CONSTRAINT pk_student_category_aggregates
+        PRIMARY KEY (student_sourced_id, category_sourced_id)
+);
+
+-- Recompute one line item aggregate from the results table
+CREATE OR REPLACE FUNCTION refresh_line_item_aggregate(p_line_item VARCHAR)
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM line_item_aggregates WHERE line_item_sourced_id = p_line_item;
+
+    INSERT INTO line_item_aggregates (
+        line_item_sourced_id, score_count, score_sum, score_sum_squares, score_min, score_max
+    )
+    SELECT line_item_sourced_id, COUNT(*), SUM(score), SUM(score * score), MIN(score), MAX(score)
+    FROM results
+    WHERE line_item_sourced_id = p_line_item
+    AND status = 'active'
+    AND score IS NOT NULL
+    GROUP BY line_item_sourced_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Recompute one student+category aggregate from the results table
+CREATE OR REPLACE FUNCTION refresh_student_category_aggregate(p_student VARCHAR, p_category VARCHAR)
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM student_category_aggregates
+    WHERE student_sourced_id = p_student AND category_sourced_id = p_category;
+
+    INSERT INTO student_category_aggregates (
+        student_sourced_id, category_sourced_id,
+        score_count, score_sum, score_sum_squares, score_min, score_max
+    )
+    SELECT r.student_sourced_id, p_category,
+           COUNT(*), SUM(r.score), SUM(r.score * r.score), MIN(r.score), MAX(r.score)
+    FROM results r
+    INNER JOIN line_items li ON r.line_item_sourced_id = li.sourced_id
+    WHERE r.student_sourced_id = p_student
+    AND COALESCE(li.category_sourced_id, '') = p_category
+    AND r.status = 'active'
+    AND r.score IS NOT NULL
+    GROUP BY r.student_sourced_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Add (p_sign = 1) or remove (p_sign = -1) one score from the aggregates.
+-- Count and sums are exact deltas. Removing the current min/max re-reads
+-- them from the (already final) results rows; a following add in the same
+-- UPDATE is then a no-op for LEAST/GREATEST, so nothing is counted twice.
+CREATE OR REPLACE FUNCTION apply_result_aggregate_delta(
+    p_line_item VARCHAR, p_student VARCHAR, p_score NUMERIC, p_sign INTEGER
+)
+RETURNS VOID AS $$
+DECLARE
+    v_category VARCHAR(255);
+    v_agg RECORD;
+BEGIN
+    SELECT COALESCE(category_sourced_id, '') INTO v_category
+    FROM line_items WHERE sourced_id = p_line_item;
+    v_category := COALESCE(v_category, '');
+
+    IF p_sign > 0 THEN
+        INSERT INTO line_item_aggregates AS a (
+            line_item_sourced_id, score_count, score_sum, score_sum_squares, score_min, score_max
+        )
+        VALUES (p_line_item, 1, p_score, p_score * p_score, p_score, p_score)
+        ON CONFLICT (line_item_sourced_id) DO UPDATE SET
+            score_count = a.score_count + 1,
+            score_sum = a.score_sum + EXCLUDED.score_sum,
+            score_sum_squares = a.score_sum_squares + EXCLUDED.score_sum_squares,
+            score_min = LEAST(a.score_min, EXCLUDED.score_min),
+            score_max = GREATEST(a.score_max, EXCLUDED.score_max),
+            date_last_modified = NOW();
+
+        INSERT INTO student_category_aggregates AS a (
+            student_sourced_id, category_sourced_id,
+            score_count, score_sum, score_sum_squares, score_min, score_max
+        )
+        VALUES (p_student, v_category, 1, p_score, p_score * p_score, p_score, p_score)
+        ON CONFLICT (student_sourced_id, category_sourced_id) DO UPDATE SET
+            score_count = a.score_count + 1,
+            score_sum = a.score_sum + EXCLUDED.score_sum,
+            score_sum_squares = a.score_sum_squares + EXCLUDED.score_sum_squares,
+            score_min = LEAST(a.score_min, EXCLUDED.score_min),
+            score_max = GREATEST(a.score_max, EXCLUDED.score_max),
+            date_last_modified = NOW();
+        RETURN;
+    END IF;
+
+    UPDATE line_item_aggregates SET
+        score_count = score_count - 1,
+        score_sum = score_sum - p_score,
+        score_sum_squares = score_sum_squares - p_score * p_score,
+        date_last_modified = NOW()
+    WHERE line_item_sourced_id = p_line_item
+    RETURNING * INTO v_agg;
+
+    IF v_agg.score_count <= 0 THEN
+        DELETE FROM line_item_aggregates WHERE line_item_sourced_id = p_line_item;
+    ELSIF p_score <= v_agg.score_min OR p_score >= v_agg.score_max THEN
+        UPDATE line_item_aggregates a SET score_min = s.score_min, score_max = s.score_max
+        FROM (
+            SELECT MIN(score) AS score_min, MAX(score) AS score_max
+            FROM results
+            WHERE line_item_sourced_id = p_line_item AND status = 'active' AND score IS NOT NULL
+        ) s
+        WHERE a.line_item_sourced_id = p_line_item;
+    END IF;
+
+    UPDATE student_category_aggregates SET
+        score_count = score_count - 1,
+        score_sum = score_sum - p_score,
+        score_sum_squares = score_sum_squares - p_score * p_score,
+        date_last_modified = NOW()
+    WHERE student_sourced_id = p_student AND category_sourced_id = v_category
+    RETURNING * INTO v_agg;
+
+    IF v_agg.score_count <= 0 THEN
+        DELETE FROM student_category_aggregates
+        WHERE student_sourced_id = p_student AND category_sourced_id = v_category;
+    ELSIF p_score <= v_agg.score_min OR p_score >= v_agg.score_max THEN
+        UPDATE student_category_aggregates a SET score_min = s.score_min, score_max = s.score_max
+        FROM (
+            SELECT MIN(r.score) AS score_min, MAX(r.score) AS score_max
+            FROM results r
+            INNER JOIN line_items li ON r.line_item_sourced_id = li.sourced_id
+            WHERE r.student_sourced_id = p_student
+            AND COALESCE(li.category_sourced_id, '') = v_category
+            AND r.status = 'active' AND r.score IS NOT NULL
+        ) s
+        WHERE a.student_sourced_id = p_student AND a.category_sourced_id = v_category;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Row trigger: only active results with a numeric score contribute
+CREATE OR REPLACE FUNCTION maintain_result_aggregates()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.status = 'active' AND OLD.score IS NOT NULL THEN
+        IF TG_OP = 'UPDATE' AND NEW.status = 'active' AND NEW.score IS NOT DISTINCT FROM OLD.score
+            AND NEW.line_item_sourced_id = OLD.line_item_sourced_id
+            AND NEW.student_sourced_id = OLD.student_sourced_id THEN
+            RETURN NULL;
+        END IF;
+        PERFORM apply_result_aggregate_delta(
+            OLD.line_item_sourced_id, OLD.student_sourced_id, OLD.score, -1
+        );
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.status = 'active' AND NEW.score IS NOT NULL THEN
+        PERFORM apply_result_aggregate_delta(
+            NEW.line_item_sourced_id, NEW.student_sourced_id, NEW.score, 1
+        );
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER maintain_results_aggregates
+    AFTER INSERT OR UPDATE OR DELETE ON results
+    FOR EACH ROW EXECUTE FUNCTION maintain_result_aggregates();
+
+-- Moving a line item to another category moves its students' scores
+CREATE OR REPLACE FUNCTION maintain_line_item_category_aggregates()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_student VARCHAR(255);
+BEGIN
+    FOR v_student IN
+        SELECT DISTINCT student_sourced_id FROM results
+        WHERE line_item_sourced_id = NEW.sourced_id
+    LOOP
+        PERFORM refresh_student_category_aggregate(v_student, COALESCE(OLD.category_sourced_id, ''));
+        PERFORM refresh_student_category_aggregate(v_student, COALESCE(NEW.category_sourced_id, ''));
+    END LOOP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER maintain_line_items_category_aggregates
+    AFTER UPDATE OF category_sourced_id ON line_items
+    FOR EACH ROW
+    WHEN (OLD.category_sourced_id IS DISTINCT FROM NEW.category_sourced_id)
+    EXECUTE FUNCTION maintain_line_item_category_aggregates();
+
+-- Drift repair: rebuild every aggregate from the results table.
+-- Blocks result writes for the duration so no delta is lost.
+CREATE OR REPLACE FUNCTION rebuild_result_aggregates()
+RETURNS TABLE (line_item_rows BIGINT, student_category_rows BIGINT) AS $$
+BEGIN
+    LOCK TABLE results IN SHARE MODE;
+
+    DELETE FROM line_item_aggregates;
+    INSERT INTO line_item_aggregates (
+        line_item_sourced_id, score_count, score_sum, score_sum_squares, score_min, score_max
+    )
+    SELECT line_item_sourced_id, COUNT(*), SUM(score), SUM(score * score), MIN(score), MAX(score)
+    FROM results
+    WHERE status = 'active' AND score IS NOT NULL
+    GROUP BY line_item_sourced_id;
+    GET DIAGNOSTICS line_item_rows = ROW_COUNT;
+
+    DELETE FROM student_category_aggregates;
+    INSERT INTO student_category_aggregates (
+        student_sourced_id, category_sourced_id,
+        score_count, score_sum, score_sum_squares, score_min, score_max
+    )
+    SELECT r.student_sourced_id, COALESCE(li.category_sourced_id, ''),
+           COUNT(*), SUM(r.score), SUM(r.score * r.score), MIN(r.score), MAX(r.score)
+    FROM results r
+    INNER JOIN line_items li ON r.line_item_sourced_id = li.sourced_id
+    WHERE r.status = 'active' AND r.score IS NOT NULL
+    GROUP BY r.student_sourced_id, COALESCE(li.category_sourced_id, '');
+    GET DIAGNOSTICS student_category_rows = ROW_COUNT;
+
+    RETURN NEXT;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON TABLE line_item_aggregates IS 'Incrementally maintained score aggregates per line item';
+COMMENT ON TABLE student_category_aggregates IS 'Incrementally maintained score aggregates per student and category';
+
+-- ================================================================
+-- Tombstone Archive
+-- ================================================================
+-- compact_tombstones_batch() moves tobedeleted rows older than a cutoff
+-- from a hot table into its *_archive table, one batch per call, so the
+-- caller can commit between batches and hold row locks only briefly.
+-- Line items are only moved once none of their results remain, and
+-- categories once no line item references them.
+-- compaction_watermarks records the newest cutoff per table; delta sync
+-- watermarks older than it can no longer see every deletion.
+
+CREATE TABLE categories_archive (
+    LIKE categories INCLUDING DEFAULTS,
+    archived_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE line_items_archive (
+    LIKE line_items INCLUDING DEFAULTS,
+    archived_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE results_archive (
+    LIKE results INCLUDING DEFAULTS,
+    archived_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE score_scales_archive (
+    LIKE score_scales INCLUDING DEFAULTS,
+    archived_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX idx_categories_archive_sourced_id ON categories_archive(sourced_id);
+CREATE INDEX idx_line_items_archive_sourced_id ON line_items_archive(sourced_id);
+CREATE INDEX idx_results_archive_sourced_id ON results_archive(sourced_id);
+CREATE INDEX idx_score_scales_archive_sourced_id ON score_scales_archive(sourced_id);
+
+CREATE TABLE compaction_watermarks (
+    table_name VARCHAR(63) PRIMARY KEY,
+    horizon TIMESTAMP WITH TIME ZONE NOT NULL,
+    rows_archived BIGINT NOT NULL DEFAULT 0,
+    last_run_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+CREATE OR REPLACE FUNCTION compact_tombstones_batch(
+    p_table TEXT,
+    p_cutoff TIMESTAMP WITH TIME ZONE,
+    p_batch_size INTEGER
+)
+RETURNS INTEGER AS $$
+DECLARE
+    moved_count INTEGER;
+    guard TEXT;
+    archived_columns TEXT;
+BEGIN
+    guard := CASE p_table
+        WHEN 'results' THEN ''
+        WHEN 'score_scales' THEN ''
+        WHEN 'line_items' THEN
+            'AND NOT EXISTS (SELECT 1 FROM results r WHERE r.line_item_sourced_id = t.sourced_id)'
+        WHEN 'categories' THEN
+            'AND NOT EXISTS (SELECT 1 FROM line_items li WHERE li.category_sourced_id = t.sourced_id)'
+    END;
+    IF guard IS NULL THEN
+        RAISE EXCEPTION 'Unsupported table for compaction: %', p_table;
+    END IF;
+
+    -- Archive columns by name: columns added to the hot table later (e.g.
+    -- generated search vectors) need not exist in the archive
+    SELECT string_agg(quote_ident(attname), ', ' ORDER BY attnum) INTO archived_columns
+    FROM pg_attribute
+    WHERE attrelid = (p_table || '_archive')::regclass
+      AND attnum > 0 AND NOT attisdropped AND attname <> 'archived_at';
+
+    EXECUTE format(
+        'WITH doomed AS (
+             SELECT t.sourced_id FROM %1$I t
+             WHERE t.status = ''tobedeleted'' AND t.date_last_modified < $1 %2$s
+             ORDER BY t.date_last_modified, t.sourced_id
+             LIMIT $2
+             FOR UPDATE SKIP LOCKED
+         ), moved AS (
+             DELETE FROM %1$I t USING doomed
+             WHERE t.sourced_id = doomed.sourced_id
+             RETURNING t.*
+         )
+         INSERT INTO %3$I (%4$s, archived_at) SELECT %4$s, NOW() FROM moved',
+        p_table, guard, p_table || '_archive', archived_columns
+    ) USING p_cutoff, p_batch_size;
+    GET DIAGNOSTICS moved_count = ROW_COUNT;
+
+    IF moved_count > 0 THEN
+        INSERT INTO compaction_watermarks (table_name, horizon, rows_archived)
+        VALUES (p_table, p_cutoff, moved_count)
+        ON CONFLICT (table_name) DO UPDATE
+        SET horizon = GREATEST(compaction_watermarks.horizon, EXCLUDED.horizon),
+            rows_archived = compaction_watermarks.rows_archived + EXCLUDED.rows_archived,
+            last_run_at = NOW();
+    END IF;
+
+    RETURN moved_count;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON TABLE compaction_watermarks IS 'Newest tombstone compaction cutoff per table (delta sync horizon)';
+
+-- ================================================================
+-- Idempotency Keys (IDEMPOTENCY_STORE=postgres)
+-- ================================================================
+-- Stored responses for write requests carrying an Idempotency-Key,
+-- scoped per OAuth client. A row without a status code is a request in
+-- flight; its expires_at is a short lease until the response is stored.
+
+CREATE TABLE idempotency_keys (
+    client_id VARCHAR(255) NOT NULL,
+    idempotency_key VARCHAR(255) NOT NULL,
+    fingerprint CHAR(64) NOT NULL,
+    status_code INTEGER,
+    response_headers JSONB,
+    response_body BYTEA,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+
+    CONSTRAINT pk_idempotency_keys PRIMARY KEY (client_id, idempotency_key)
+);
+
+CREATE INDEX idx_idempotency_keys_expires ON idempotency_keys(expires_at);
+
+COMMENT ON TABLE idempotency_keys IS 'Stored responses for Idempotency-Key write requests';
+
+-- ================================================================
+-- Change Notifications (cross-worker cache invalidation)
+-- ================================================================
+-- Every committed row change is announced on the 'oneroster_changes'
+-- channel so each API worker can drop its cached copy. Postgres delivers
+-- notifications on commit and folds identical payloads within a
+-- transaction. Results also name their line item, whose statistics
+-- depend on them.
+
+CREATE OR REPLACE FUNCTION notify_entity_change()
+RETURNS TRIGGER AS $$
+DECLARE
+    changed JSONB;
+BEGIN
+    changed := to_jsonb(CASE WHEN TG_OP = 'DELETE' THEN OLD ELSE NEW END);
+    PERFORM pg_notify(
+        'oneroster_changes',
+        json_build_object(
+            'table', TG_TABLE_NAME,
+            'sourcedId', changed->>'sourced_id',
+            'lineItemSourcedId', changed->>'line_item_sourced_id'
+        )::text
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER notify_categories_change
+    AFTER INSERT OR UPDATE OR DELETE ON categories
+    FOR EACH ROW EXECUTE FUNCTION notify_entity_change();
+
+CREATE TRIGGER notify_line_items_change
+    AFTER INSERT OR UPDATE OR DELETE ON line_items
+    FOR EACH ROW EXECUTE FUNCTION notify_entity_change();
+
+CREATE TRIGGER notify_results_change
+    AFTER INSERT OR UPDATE OR DELETE ON results
+    FOR EACH ROW EXECUTE FUNCTION notify_entity_change();
+
+CREATE TRIGGER notify_score_scales_change
+    AFTER INSERT OR UPDATE OR DELETE ON score_scales
+    FOR EACH ROW EXECUTE FUNCTION notify_entity_change();
+
 -- ================================================================
 -- Sample Data (for development/testing)
 -- ================================================================